@@ -0,0 +1,277 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+End-to-end benchmark of the package. The scenarios of the Examples package
+are run against a local StubServer through the JobManager, measuring jobs per
+second, status polling overhead, download throughput and map file generation
+time. The per-phase figures are taken from the shared Metrics object, enabled
+while the benchmark runs.
+
+The jobs of a scenario are identical requests, so the result cache and request
+coalescing are disabled while the benchmark runs, each job then being executed
+by the server. Jobs are recorded in a job store in the temporary folder, and
+the process description and GML schema caches also point to it, leaving the
+stores of the installation untouched.
+'''
+
+import os, time, shutil, tempfile
+from WPSClient import WPSClient
+from WPSClient.JobManager import JobManager, Job
+from WPSClient.JobStore import JobStore
+from WPSClient.Metrics import getMetrics
+from WPSClient.ResultCache import getResultCache
+from WPSClient.Coalescer import getCoalescer
+from WPSClient.ProcessCache import getProcessCache
+from WPSClient.SchemaCache import getSchemaCache
+from StubServer import StubServer
+
+##########################################################
+
+class Benchmark:
+    """
+    Runs each scenario a number of times against a StubServer and collects
+    the measurements.
+
+    .. attribute:: jobs
+        Number of jobs submitted per scenario
+
+    .. attribute:: workers
+        Number of JobManager worker threads
+
+    .. attribute:: server
+        StubServer object answering the requests
+
+    .. attribute:: path
+        Temporary folder where outputs, map files and stores are written
+
+    .. attribute:: store
+        JobStore object recording the jobs in the temporary folder
+
+    .. attribute:: saved
+        List of (object, attribute, value) tuples with the attributes of the
+        shared objects changed by isolate and their original values
+    """
+
+    jobs    = 10
+    workers = 8
+    server  = None
+    path    = None
+    store   = None
+    saved   = None
+
+    # Scenario name: (process name, inputs, outputs), as in the Examples package
+    SCENARIOS = {
+        "BufferGML": ("buffer",
+            [("buffer_width", "5"),
+             ("vector", "http://services.iguess.tudor.lu/pywps/sampleData/testLines4326.gml")],
+            {"buffered_vector": "MyBuffer"}),
+        "SlopeAspect": ("slope_aspect",
+            [("dem", "http://maps.iguess.tudor.lu/pywps/sampleData/lb_dem_10m_small.tiff")],
+            {"slope": "Slope", "aspect": "Aspect"}),
+        "Rand": ("test_rand_map",
+            [("delay", "10")],
+            {"random": "RandomLayer", "region": "RegionLayer", "num": "Number"}),
+        "Dijkstra": ("dijkstra",
+            [("network", "Lux"), ("start_easting", "6.112"), ("start_northing", "49.515"),
+             ("target_easting", "6.129"), ("target_northing", "49.611")],
+            {"path": "ShortestPath"}),
+        "Sum": ("sum",
+            [("num", "50"), ("num", "37")],
+            {"result": "Number"}),
+        "SolarCadastre": ("solar_cadastre",
+            [("dsm", "http://services.iguess.tudor.lu/cgi-bin/mapserv?map=/var/www/MapFiles/RO_localOWS_test.map&amp;SERVICE=WCS&amp;VERSION=1.0.0&amp;REQUEST=GetCoverage&amp;IDENTIFIER=ro_dsm_mini&amp;FORMAT=image/tiff&amp;BBOX=92217,436688,92313,436772&amp;CRS=EPSG:28992&amp;RESX=1&amp;RESY=1"),
+             ("roof_training_area", "http://services.iguess.tudor.lu/cgi-bin/mapserv?map=/var/www/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;VERSION=1.1.0&amp;REQUEST=getfeature&amp;TYPENAME=RO_training_areas_mini&amp;srsName=EPSG:28992"),
+             ("roof_training_area_col", "type"),
+             ("building_footprints", "http://services.iguess.tudor.lu/cgi-bin/mapserv?map=/var/www/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;VERSION=1.1.0&amp;REQUEST=getfeature&amp;TYPENAME=RO_building_footprints_mini&amp;srsName=EPSG:28992"),
+             ("month", "7")],
+            {"solar_irradiation": "MySolarIrradiationMap"}),
+        "SolarIrradiation": ("solar_irradiation",
+            [("dsm", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WCS&amp;FORMAT=image/img&amp;CRS=EPSG:28992&amp;BBOX=92221,436692,92306,436769&amp;RESX=0.5&amp;RESY=0.5&amp;VERSION=1.0.0&amp;REQUEST=getCoverage&amp;COVERAGE=ro_dsm"),
+             ("roof_training_area", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;CRS=EPSG:28992&amp;VERSION=1.0.0&amp;REQUEST=getFeature&amp;TYPENAME=RO_training_areas_mini"),
+             ("octa", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;VERSION=1.0.0&amp;REQUEST=getFeature&amp;TYPENAME=RO_octa"),
+             ("building_footprints", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;CRS=EPSG:28992&amp;VERSION=1.0.0&amp;REQUEST=getFeature&amp;TYPENAME=RO_building_footprints_mini"),
+             ("ratio", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;VERSION=1.0.0&amp;REQUEST=getFeature&amp;TYPENAME=RO_ratio"),
+             ("region", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;VERSION=1.0.0&amp;REQUEST=getFeature&amp;TYPENAME=RO_clip_mini"),
+             ("linke", "http://maps.iguess.tudor.lu/cgi-bin/mapserv?map=/srv/mapserv/MapFiles/RO_localOWS_test.map&amp;SERVICE=WFS&amp;VERSION=1.0.0&amp;REQUEST=getFeature&amp;TYPENAME=RO_linke"),
+             ("roof_training_area_col", "type")],
+            {"potential_pv_area": "cb_roof", "solar_irradiation": "cb_solar"}),
+        "PVPotential": ("solar_potential",
+            [("solar_irradiation", "http://wps.iguess.tudor.lu/pywps/sampleData/ro_solar_irradiation.tif"),
+             ("potential_pv_area", "http://wps.iguess.tudor.lu/pywps/sampleData/ro_potential_pv_area.gml"),
+             ("building_footprints", "http://wps.iguess.tudor.lu/pywps/sampleData/ro_ground_old.gml"),
+             ("econ_lifetime", "20"), ("payback_price", "0.249")],
+            {"pv_potential": "pv_potential"}),
+    }
+
+    def __init__(self, jobs = None, workers = None, latency = None, duration = None,
+                 rasterSize = None, vectorFeatures = None, queueTime = None):
+
+        if jobs is not None:
+            self.jobs = jobs
+        if workers is not None:
+            self.workers = workers
+        self.server = StubServer(0, latency, duration, rasterSize, vectorFeatures, queueTime)
+
+    def run(self, names = None):
+        """
+        Runs the given scenarios, all of them by default.
+
+        :param names: list with the names of the scenarios to run
+        :returns: list of dictionaries with the measurements of each scenario
+        """
+
+        if names is None:
+            names = sorted(self.SCENARIOS)
+
+        self.path = tempfile.mkdtemp(prefix="WPSClientBenchmark")
+        try:
+            self.isolate()
+            self.server.start()
+            try:
+                return [self.runScenario(name) for name in names]
+            finally:
+                self.server.stop()
+        finally:
+            self.restore()
+            shutil.rmtree(self.path, True)
+
+    def isolate(self):
+        """
+        Disables the result cache and request coalescing, which would merge
+        the identical jobs of a scenario, enables the metrics, and points the
+        job store and the shared caches to the temporary folder. The metric
+        series and parsed process descriptions of the installation are set
+        aside, so the benchmark neither reads nor clears them.
+        """
+
+        changes = [
+            (getResultCache(), "enabled", False),
+            (getCoalescer(), "enabled", False),
+            (getMetrics(), "enabled", True),
+            (getMetrics(), "series", {}),
+            (getProcessCache(), "path", os.path.join(self.path, "processes")),
+            (getProcessCache(), "parsed", {}),
+            (getSchemaCache(), "path", os.path.join(self.path, "schemas")),
+        ]
+        self.saved = []
+        for target, name, value in changes:
+            self.saved.append((target, name, getattr(target, name)))
+            setattr(target, name, value)
+
+        self.store = JobStore(os.path.join(self.path, "jobs.db"))
+
+    def restore(self):
+        """
+        Undoes the changes made by isolate, in reverse order, and closes the
+        job store. Does nothing if isolate did not run.
+        """
+
+        if self.saved is not None:
+            for target, name, value in reversed(self.saved):
+                setattr(target, name, value)
+            self.saved = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def createClient(self, name):
+        """
+        :param name: string with the scenario name
+        :returns: WPSClient object ready to send the request of the scenario,
+        writing its outputs and map file to the temporary folder
+        """
+
+        processName, inputs, outputs = self.SCENARIOS[name]
+        client = WPSClient()
+        client.init(self.server.getURL(), processName, inputs, outputs)
+        client.pathFilesGML = self.path + os.sep
+        client.mapFilesPath = self.path + os.sep
+        return client
+
+    def runScenario(self, name):
+        """
+        Submits jobs of a scenario through a JobManager and waits for all of
+        them to be published.
+
+        :param name: string with the scenario name
+        :returns: dictionary with the measurements
+        """
+
+        metrics = getMetrics()
+        metrics.reset()
+        self.server.resetCounters()
+
+        manager = JobManager(self.workers, store = self.store)
+        manager.start()
+        start = time.time()
+        try:
+            for i in range(self.jobs):
+                manager.add(Job(self.createClient(name), Job.PENDING, "4326"))
+            manager.wait()
+        finally:
+            elapsed = time.time() - start
+            manager.stop()
+
+        jobs = manager.jobs
+        failed = [job for job in jobs if job.state == Job.ERROR]
+        polls = metrics.getTotals("poll")
+        downloads = metrics.getTotals("download")
+        mapFiles = metrics.getTotals("mapfile")
+
+        result = {
+            "scenario": name,
+            "jobs": len(jobs),
+            "failed": len(failed),
+            "seconds": elapsed,
+            "jobsPerSecond": len(jobs) / elapsed,
+            "meanJobTime": sum([job.finished - job.submitted for job in jobs]) / len(jobs),
+            "pollsPerJob": float(polls[0]) / len(jobs),
+            "meanPollTime": polls[1] / max(polls[0], 1),
+            "bytesDownloaded": self.server.bytesServed,
+            "downloadThroughput": self.server.bytesServed / max(downloads[1], 1e-6),
+            "meanMapFileTime": mapFiles[1] / max(mapFiles[0], 1),
+        }
+        for phase in ("submit", "queue", "dispatch", "inspection", "postprocess"):
+            totals = metrics.getTotals(phase)
+            result[phase] = totals[1] / max(totals[0], 1)
+        if len(failed) > 0:
+            result["error"] = failed[0].error
+        return result
+
+##########################################################
+
+def report(results):
+    """
+    :param results: list of dictionaries returned by Benchmark.run
+    :returns: string with a table of the measurements
+    """
+
+    header = "%-12s %5s %6s %8s %8s %8s %8s %9s %10s %9s %9s %9s %9s" % (
+        "scenario", "jobs", "failed", "jobs/s", "job (s)", "polls", "poll (s)",
+        "MB", "MB/s", "queue (s)", "wait (s)", "inspect", "map (s)")
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append("%-12s %5d %6d %8.3f %8.2f %8.2f %8.4f %9.2f %10.2f %9.4f %9.4f %9.4f %9.4f" % (
+            r["scenario"], r["jobs"], r["failed"], r["jobsPerSecond"], r["meanJobTime"],
+            r["pollsPerJob"], r["meanPollTime"], r["bytesDownloaded"] / 1048576.0,
+            r["downloadThroughput"] / 1048576.0, r["queue"], r["dispatch"],
+            r["inspection"], r["meanMapFileTime"]))
+    for r in results:
+        if "error" in r:
+            lines.append("%s: %s" % (r["scenario"], r["error"]))
+    return "\n".join(lines)
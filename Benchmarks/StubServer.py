@@ -0,0 +1,577 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Local stand-in for a remote WPS server, used by the benchmarks. It answers
+GetCapabilities, DescribeProcess and asynchronous Execute requests for the
+processes used in the Examples package. The status document of each
+execution progresses with time until the process succeeds, outputs are
+generated on the fly: GeoTIFF rasters, GML feature collections and literals.
+Response latency, process duration and output sizes are configurable.
+'''
+
+import time, uuid, struct, base64, hashlib, threading, urlparse
+import BaseHTTPServer, SocketServer
+import xml.etree.ElementTree as ElementTree
+
+OWS_NS = "http://www.opengis.net/ows/1.1"
+
+# Processes offered by the server: inputs as (identifier, dataType, minOccurs,
+# maxOccurs), dataType None for complex inputs; outputs as (identifier, kind),
+# kind one of raster, vector or literal.
+PROCESSES = {
+    "buffer": {
+        "inputs": [("buffer_width", "float", 1, 1), ("vector", None, 1, 1)],
+        "outputs": [("buffered_vector", "vector")]},
+    "slope_aspect": {
+        "inputs": [("dem", None, 1, 1)],
+        "outputs": [("slope", "raster"), ("aspect", "raster")]},
+    "test_rand_map": {
+        "inputs": [("delay", "integer", 0, 1)],
+        "outputs": [("random", "raster"), ("region", "vector"), ("num", "literal")]},
+    "dijkstra": {
+        "inputs": [("network", "string", 1, 1), ("start_easting", "float", 1, 1),
+                   ("start_northing", "float", 1, 1), ("target_easting", "float", 1, 1),
+                   ("target_northing", "float", 1, 1)],
+        "outputs": [("path", "vector")]},
+    "sum": {
+        "inputs": [("num", "integer", 2, 10)],
+        "outputs": [("result", "literal")]},
+    "solar_cadastre": {
+        "inputs": [("dsm", None, 1, 1), ("roof_training_area", None, 1, 1),
+                   ("roof_training_area_col", "string", 1, 1),
+                   ("building_footprints", None, 1, 1), ("month", "integer", 1, 1)],
+        "outputs": [("solar_irradiation", "raster")]},
+    "solar_irradiation": {
+        "inputs": [("dsm", None, 1, 1), ("roof_training_area", None, 1, 1),
+                   ("octa", None, 1, 1), ("building_footprints", None, 1, 1),
+                   ("ratio", None, 1, 1), ("region", None, 1, 1), ("linke", None, 1, 1),
+                   ("roof_training_area_col", "string", 1, 1)],
+        "outputs": [("potential_pv_area", "vector"), ("solar_irradiation", "raster")]},
+    "solar_potential": {
+        "inputs": [("solar_irradiation", None, 1, 1), ("potential_pv_area", None, 1, 1),
+                   ("building_footprints", None, 1, 1), ("econ_lifetime", "integer", 1, 1),
+                   ("payback_price", "float", 1, 1)],
+        "outputs": [("pv_potential", "vector")]},
+}
+
+CAPABILITIES = """<?xml version="1.0" encoding="utf-8"?>
+<wps:Capabilities service="WPS" version="1.0.0" xml:lang="en-US"
+    xmlns:wps="http://www.opengis.net/wps/1.0.0" xmlns:ows="http://www.opengis.net/ows/1.1"
+    xmlns:xlink="http://www.w3.org/1999/xlink">
+  <ows:ServiceIdentification>
+    <ows:Title>WPSClient benchmark stub</ows:Title>
+    <ows:ServiceType>WPS</ows:ServiceType>
+    <ows:ServiceTypeVersion>1.0.0</ows:ServiceTypeVersion>
+  </ows:ServiceIdentification>
+  <wps:ProcessOfferings>
+%s
+  </wps:ProcessOfferings>
+</wps:Capabilities>"""
+
+PROCESS_BRIEF = """    <wps:Process wps:processVersion="1.0">
+      <ows:Identifier>%s</ows:Identifier>
+      <ows:Title>%s</ows:Title>
+    </wps:Process>"""
+
+DESCRIPTION = """<?xml version="1.0" encoding="utf-8"?>
+<wps:ProcessDescriptions service="WPS" version="1.0.0" xml:lang="en-US"
+    xmlns:wps="http://www.opengis.net/wps/1.0.0" xmlns:ows="http://www.opengis.net/ows/1.1">
+  <ProcessDescription wps:processVersion="1.0" storeSupported="true" statusSupported="true">
+    <ows:Identifier>%s</ows:Identifier>
+    <ows:Title>%s</ows:Title>
+    <DataInputs>
+%s
+    </DataInputs>
+    <ProcessOutputs>
+%s
+    </ProcessOutputs>
+  </ProcessDescription>
+</wps:ProcessDescriptions>"""
+
+LITERAL_INPUT = """      <Input minOccurs="%d" maxOccurs="%d">
+        <ows:Identifier>%s</ows:Identifier>
+        <ows:Title>%s</ows:Title>
+        <LiteralData>
+          <ows:DataType ows:reference="http://www.w3.org/TR/xmlschema-2/#%s">%s</ows:DataType>
+          <ows:AnyValue/>
+        </LiteralData>
+      </Input>"""
+
+COMPLEX_INPUT = """      <Input minOccurs="%d" maxOccurs="%d">
+        <ows:Identifier>%s</ows:Identifier>
+        <ows:Title>%s</ows:Title>
+        <ComplexData>
+          <Default><Format><MimeType>text/xml</MimeType></Format></Default>
+          <Supported><Format><MimeType>text/xml</MimeType></Format>
+            <Format><MimeType>image/tiff</MimeType></Format></Supported>
+        </ComplexData>
+      </Input>"""
+
+COMPLEX_OUTPUT = """      <Output>
+        <ows:Identifier>%s</ows:Identifier>
+        <ows:Title>%s</ows:Title>
+        <ComplexOutput>
+          <Default><Format><MimeType>%s</MimeType></Format></Default>
+          <Supported><Format><MimeType>%s</MimeType></Format></Supported>
+        </ComplexOutput>
+      </Output>"""
+
+LITERAL_OUTPUT = """      <Output>
+        <ows:Identifier>%s</ows:Identifier>
+        <ows:Title>%s</ows:Title>
+        <LiteralOutput>
+          <ows:DataType ows:reference="http://www.w3.org/TR/xmlschema-2/#integer">integer</ows:DataType>
+        </LiteralOutput>
+      </Output>"""
+
+EXECUTE_RESPONSE = """<?xml version="1.0" encoding="utf-8"?>
+<wps:ExecuteResponse service="WPS" version="1.0.0" xml:lang="en-US"
+    serviceInstance="%s" statusLocation="%s"
+    xmlns:wps="http://www.opengis.net/wps/1.0.0" xmlns:ows="http://www.opengis.net/ows/1.1"
+    xmlns:xlink="http://www.w3.org/1999/xlink">
+  <wps:Process wps:processVersion="1.0">
+    <ows:Identifier>%s</ows:Identifier>
+    <ows:Title>%s</ows:Title>
+  </wps:Process>
+  <wps:Status creationTime="%s">
+    %s
+  </wps:Status>
+%s
+</wps:ExecuteResponse>"""
+
+REFERENCE_OUTPUT = """    <wps:Output>
+      <ows:Identifier>%s</ows:Identifier>
+      <ows:Title>%s</ows:Title>
+      <wps:Reference href="%s" mimeType="%s"/>
+    </wps:Output>"""
+
+DATA_OUTPUT = """    <wps:Output>
+      <ows:Identifier>%s</ows:Identifier>
+      <ows:Title>%s</ows:Title>
+      <wps:Data>
+        <wps:LiteralData dataType="integer">%d</wps:LiteralData>
+      </wps:Data>
+    </wps:Output>"""
+
+MIME_TYPES = {"raster": "image/tiff", "vector": "text/xml"}
+EXTENSIONS = {"raster": ".tif", "vector": ".gml"}
+
+# Bounding box of the generated outputs, in EPSG:4326
+BBOX = (5.9, 49.4, 6.5, 50.2)
+
+##########################################################
+
+class StubServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    HTTP server standing in for a remote WPS server.
+
+    .. attribute:: latency
+        Seconds added to every response
+
+    .. attribute:: duration
+        Seconds an execution takes to complete
+
+    .. attribute:: queueTime
+        Seconds an execution waits in the server queue, reported as accepted,
+        before it starts
+
+    .. attribute:: rasterSize
+        Width and height, in pixels, of the generated rasters
+
+    .. attribute:: vectorFeatures
+        Number of features of the generated feature collections
+
+    .. attribute:: executions
+        Dictionary mapping execution identifiers to tuples (process name,
+        start time)
+
+    .. attribute:: requests
+        Dictionary counting the requests received, by kind
+
+    .. attribute:: bytesServed
+        Number of output bytes sent
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    latency        = 0.0
+    duration       = 10.0
+    queueTime      = 0.0
+    rasterSize     = 512
+    vectorFeatures = 1000
+
+    executions  = None
+    requests    = None
+    bytesServed = 0
+
+    def __init__(self, port = 0, latency = None, duration = None,
+                 rasterSize = None, vectorFeatures = None, queueTime = None):
+
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", port), StubHandler)
+
+        if latency is not None:
+            self.latency = latency
+        if duration is not None:
+            self.duration = duration
+        if queueTime is not None:
+            self.queueTime = queueTime
+        if rasterSize is not None:
+            self.rasterSize = rasterSize
+        if vectorFeatures is not None:
+            self.vectorFeatures = vectorFeatures
+
+        self.executions = {}
+        self.requests = {}
+        self.outputs = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def getURL(self):
+        """
+        :returns: string with the address of the server, as used by WPSClient
+        """
+        return "http://127.0.0.1:%d/wps?" % self.server_address[1]
+
+    def start(self):
+        """
+        Serves requests from a background thread.
+        """
+
+        self.thread = threading.Thread(target=self.serve_forever, name="StubServer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops serving requests and closes the listening socket.
+        """
+
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def count(self, kind, size = 0):
+        """
+        Records a request served.
+
+        :param kind: string with the kind of request
+        :param size: number of output bytes sent
+        """
+
+        with self.lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            self.bytesServed += size
+
+    def resetCounters(self):
+        """
+        Clears the request counters, between two benchmark runs.
+        """
+
+        with self.lock:
+            self.requests = {}
+            self.bytesServed = 0
+
+    def getOutput(self, kind):
+        """
+        :param kind: raster or vector
+        :returns: string with the generated file, built once per kind
+        """
+
+        with self.lock:
+            content = self.outputs.get(kind)
+        if content is None:
+            if kind == "raster":
+                content = buildGeoTIFF(self.rasterSize)
+            else:
+                content = buildGML(self.vectorFeatures)
+            with self.lock:
+                self.outputs[kind] = content
+        return content
+
+##########################################################
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Answers the requests sent to the StubServer.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+
+        time.sleep(self.server.latency)
+        parts = urlparse.urlsplit(self.path)
+
+        if parts.path.startswith("/status/"):
+            self.sendStatus(parts.path.split("/")[2].split(".")[0])
+            return
+
+        if parts.path.startswith("/outputs/"):
+            self.sendOutput(parts.path.split("/")[-1])
+            return
+
+        query = dict((k.lower(), v) for k, v in urlparse.parse_qsl(parts.query))
+        request = query.get("request", "").lower()
+        if request == "getcapabilities":
+            self.server.count("GetCapabilities")
+            briefs = [PROCESS_BRIEF % (name, name) for name in sorted(PROCESSES)]
+            self.send(200, CAPABILITIES % "\n".join(briefs))
+        elif request == "describeprocess" and query.get("identifier") in PROCESSES:
+            self.server.count("DescribeProcess")
+            self.send(200, describe(query["identifier"]))
+        else:
+            self.send(400, "Unsupported request")
+
+    def do_POST(self):
+
+        time.sleep(self.server.latency)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.count("Execute")
+
+        try:
+            identifier = ElementTree.fromstring(body).find("{%s}Identifier" % OWS_NS).text
+        except Exception:
+            identifier = None
+        if identifier not in PROCESSES:
+            self.send(400, "Unknown process")
+            return
+
+        executionId = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.executions[executionId] = (identifier, time.time())
+
+        status = '<wps:ProcessAccepted>Process accepted</wps:ProcessAccepted>'
+        self.send(200, self.executeResponse(executionId, identifier, status, ""))
+
+    def sendStatus(self, executionId):
+        """
+        Sends the status document of an execution. The execution is reported
+        as accepted during the queue time, then its progress grows linearly
+        with the time elapsed, the outputs being listed once the duration of
+        the process is over. Unchanged documents are answered with 304 Not
+        Modified.
+        """
+
+        self.server.count("Status")
+        with self.server.lock:
+            execution = self.server.executions.get(executionId)
+        if execution is None:
+            self.send(404, "Unknown execution")
+            return
+
+        identifier, started = execution
+        elapsed = time.time() - started - self.server.queueTime
+        if elapsed < 0:
+            percent = -1
+        elif self.server.duration > 0:
+            percent = int(100 * elapsed / self.server.duration)
+        else:
+            percent = 100
+
+        etag = '"%s-%d"' % (executionId, min(percent, 100))
+        if self.headers.get("If-None-Match") == etag:
+            self.send(304, None, {"ETag": etag})
+            return
+
+        outputs = ""
+        if percent < 0:
+            status = '<wps:ProcessAccepted>Process accepted</wps:ProcessAccepted>'
+        elif percent < 100:
+            status = '<wps:ProcessStarted percentCompleted="%d">Running</wps:ProcessStarted>' % percent
+        else:
+            status = '<wps:ProcessSucceeded>Process finished</wps:ProcessSucceeded>'
+            host = "http://127.0.0.1:%d" % self.server.server_address[1]
+            elements = []
+            for name, kind in PROCESSES[identifier]["outputs"]:
+                if kind == "literal":
+                    elements.append(DATA_OUTPUT % (name, name, 42))
+                else:
+                    # Unique file names, the client names files after the URL
+                    href = "%s/outputs/%s-%s%s" % (host, name, executionId, EXTENSIONS[kind])
+                    elements.append(REFERENCE_OUTPUT % (name, name, href, MIME_TYPES[kind]))
+            outputs = "  <wps:ProcessOutputs>\n%s\n  </wps:ProcessOutputs>" % "\n".join(elements)
+
+        self.send(200, self.executeResponse(executionId, identifier, status, outputs), {"ETag": etag})
+
+    def sendOutput(self, fileName):
+        """
+        Sends a generated output file, honouring Range and conditional
+        requests.
+        """
+
+        kind = "raster" if fileName.endswith(EXTENSIONS["raster"]) else "vector"
+        content = self.server.getOutput(kind)
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count("OutputNotModified")
+            self.send(304, None, {"ETag": etag})
+            return
+        headers = {"Content-MD5": base64.b64encode(hashlib.md5(content).digest()), "ETag": etag}
+
+        code = 200
+        ranged = self.headers.get("Range")
+        if ranged is not None and ranged.startswith("bytes="):
+            offset = int(ranged[6:].split("-")[0])
+            headers["Content-Range"] = "bytes %d-%d/%d" % (offset, len(content) - 1, len(content))
+            content = content[offset:]
+            code = 206
+
+        self.server.count("Output", len(content))
+        self.send(code, content, headers, MIME_TYPES[kind])
+
+    def executeResponse(self, executionId, identifier, status, outputs):
+        """
+        :returns: string with an ExecuteResponse document
+        """
+
+        host = "http://127.0.0.1:%d" % self.server.server_address[1]
+        return EXECUTE_RESPONSE % (
+            self.server.getURL(),
+            "%s/status/%s.xml" % (host, executionId),
+            identifier, identifier,
+            time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            status, outputs)
+
+    def send(self, code, body, headers = None, contentType = "text/xml"):
+        """
+        Sends a complete response.
+        """
+
+        self.send_response(code)
+        if headers is not None:
+            for name, value in headers.items():
+                self.send_header(name, value)
+        if body is None:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_header("Content-Type", contentType)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+##########################################################
+
+def describe(identifier):
+    """
+    :param identifier: string with the process name
+    :returns: string with the DescribeProcess document of the process
+    """
+
+    process = PROCESSES[identifier]
+
+    inputs = []
+    for name, dataType, minOccurs, maxOccurs in process["inputs"]:
+        if dataType is None:
+            inputs.append(COMPLEX_INPUT % (minOccurs, maxOccurs, name, name))
+        else:
+            inputs.append(LITERAL_INPUT % (minOccurs, maxOccurs, name, name, dataType, dataType))
+
+    outputs = []
+    for name, kind in process["outputs"]:
+        if kind == "literal":
+            outputs.append(LITERAL_OUTPUT % (name, name))
+        else:
+            outputs.append(COMPLEX_OUTPUT % (name, name, MIME_TYPES[kind], MIME_TYPES[kind]))
+
+    return DESCRIPTION % (identifier, identifier, "\n".join(inputs), "\n".join(outputs))
+
+def buildGeoTIFF(size):
+    """
+    Encodes an uncompressed single band Byte GeoTIFF in EPSG:4326 covering
+    BBOX, filled with a gradient.
+
+    :param size: width and height in pixels
+    :returns: string with the file content
+    """
+
+    row = "".join([chr(i % 256) for i in range(size)])
+    data = "".join([row[i % size:] + row[:i % size] for i in range(size)])
+
+    scale = struct.pack("<3d", (BBOX[2] - BBOX[0]) / size, (BBOX[3] - BBOX[1]) / size, 0)
+    tiepoint = struct.pack("<6d", 0, 0, 0, BBOX[0], BBOX[3], 0)
+    # Geographic model, pixel is area, WGS 84
+    geokeys = struct.pack("<16H", 1, 1, 0, 3, 1024, 0, 1, 2, 1025, 0, 1, 1, 2048, 0, 1, 4326)
+
+    # Header, then the tag values too large to fit in the directory, then the
+    # pixels, then the directory
+    extra = scale + tiepoint + geokeys
+    dataOffset = 8 + len(extra)
+    ifdOffset = dataOffset + len(data)
+
+    tags = [
+        (256, 3, 1, struct.pack("<HH", size, 0)),           # ImageWidth
+        (257, 3, 1, struct.pack("<HH", size, 0)),           # ImageLength
+        (258, 3, 1, struct.pack("<HH", 8, 0)),              # BitsPerSample
+        (259, 3, 1, struct.pack("<HH", 1, 0)),              # Compression
+        (262, 3, 1, struct.pack("<HH", 1, 0)),              # Photometric
+        (273, 4, 1, struct.pack("<I", dataOffset)),         # StripOffsets
+        (277, 3, 1, struct.pack("<HH", 1, 0)),              # SamplesPerPixel
+        (278, 3, 1, struct.pack("<HH", size, 0)),           # RowsPerStrip
+        (279, 4, 1, struct.pack("<I", len(data))),          # StripByteCounts
+        (284, 3, 1, struct.pack("<HH", 1, 0)),              # PlanarConfiguration
+        (33550, 12, 3, struct.pack("<I", 8)),               # ModelPixelScale
+        (33922, 12, 6, struct.pack("<I", 8 + len(scale))),  # ModelTiepoint
+        (34735, 3, 16, struct.pack("<I", 8 + len(scale) + len(tiepoint))), # GeoKeyDirectory
+    ]
+
+    ifd = struct.pack("<H", len(tags))
+    for tag, fieldType, count, value in tags:
+        ifd += struct.pack("<HHI", tag, fieldType, count) + value
+    ifd += struct.pack("<I", 0)
+
+    return struct.pack("<2sHI", "II", 42, ifdOffset) + extra + data + ifd
+
+def buildGML(features):
+    """
+    Encodes a GML feature collection of square polygons in EPSG:4326
+    covering BBOX.
+
+    :param features: number of features
+    :returns: string with the file content
+    """
+
+    side = max(1, int(features ** 0.5))
+    width = (BBOX[2] - BBOX[0]) / side
+    height = (BBOX[3] - BBOX[1]) / side
+
+    members = []
+    for i in range(features):
+        x = BBOX[0] + (i % side) * width
+        y = BBOX[1] + ((i / side) % side) * height
+        ring = "%f,%f %f,%f %f,%f %f,%f %f,%f" % (
+            x, y, x + width, y, x + width, y + height, x, y + height, x, y)
+        members.append(
+            '<gml:featureMember><ogr:features fid="F%d">'
+            '<ogr:geometryProperty><gml:Polygon srsName="EPSG:4326"><gml:outerBoundaryIs>'
+            '<gml:LinearRing><gml:coordinates>%s</gml:coordinates></gml:LinearRing>'
+            '</gml:outerBoundaryIs></gml:Polygon></ogr:geometryProperty>'
+            '<ogr:value>%d</ogr:value></ogr:features></gml:featureMember>' % (i, ring, i))
+
+    return ('<?xml version="1.0" encoding="utf-8" ?>\n'
+        '<ogr:FeatureCollection xmlns:ogr="http://ogr.maptools.org/" '
+        'xmlns:gml="http://www.opengis.net/gml">\n'
+        '<gml:boundedBy><gml:Box><gml:coord><gml:X>%f</gml:X><gml:Y>%f</gml:Y></gml:coord>'
+        '<gml:coord><gml:X>%f</gml:X><gml:Y>%f</gml:Y></gml:coord></gml:Box></gml:boundedBy>\n'
+        '%s\n</ogr:FeatureCollection>\n') % (BBOX + ("\n".join(members),))
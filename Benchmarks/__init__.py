@@ -0,0 +1,24 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology. 
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+End-to-end benchmarks of the package, run against a local stand-in WPS
+server. See runBenchmarks.py.
+'''
+
+__all__ = ["Benchmark",
+           "StubServer"]
@@ -22,6 +22,7 @@ Created on Nov 21, 2013
 import sys
 import time
 import WPSClient
+from WPSClient.PollScheduler import PollScheduler
 
 class Example:
     
@@ -46,12 +47,16 @@ class Example:
             print "Sorry something went wrong with the request. Please check the log file"
             sys.exit()
         
+        elif self.iniCli.cachedMapFile is not None:
+            print "Result taken from the cache, map file:\n" + self.iniCli.generateMapFile()
+        
         else:
             
             self.iniCli = None
             statCli = WPSClient.WPSClient()
             
             statCli.initFromURL(url, self.outputs)
+            scheduler = PollScheduler()
         
             status = False
             while not status:
@@ -64,7 +69,7 @@ class Example:
                 print "Process still running"
                 print str(statCli.getPercentCompleted()) + "% completed"
                 print "Status message: " + str(statCli.getStatusMessage())
-                time.sleep(10)
+                time.sleep(scheduler.nextInterval(statCli.getPercentCompleted()))
                 
             if(statCli.status == statCli.ERROR):
                 print "There was an error, no map file was generated. Please check the log file."
@@ -0,0 +1,45 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module writing files atomically, through a temporary file renamed over the
+target, so that readers such as MapServer never see a partially written file.
+'''
+
+import os, threading
+
+##########################################################
+
+def writeAtomic(path, lines):
+    """
+    Writes a file through a temporary file renamed over it. The temporary file
+    is named after the process and thread, so that concurrent writers never
+    share it, and is removed if writing fails.
+
+    :param path: path to the file
+    :param lines: list with the lines of the file
+    """
+
+    temporary = "%s.%d.%d.tmp" % (path, os.getpid(), threading.current_thread().ident)
+    try:
+        with open(temporary, "w") as f:
+            f.writelines(lines)
+        os.rename(temporary, path)
+    except:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
@@ -0,0 +1,328 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module coalescing identical requests sent while a previous one is still
+running. A registry of the executions in flight, keyed by the request key of
+the result cache, lets a request attach to the status URL of an identical
+execution instead of starting a new one. Executions started by other
+processes are found through the request key recorded in the job store. An
+entry is dropped as soon as any client polling the execution sees it
+complete, finished executions are never reused through the registry.
+
+The outputs of a coalesced execution are published once: the client that
+sent the request publishes them, the clients attached to it wait for it and
+reuse its map file. Executions driven by a JobManager of another process are
+waited for through the job store.
+'''
+
+import os, time, threading, logging
+from Settings import getSettings, addReloadHook
+from JobStore import getJobStore
+
+##########################################################
+
+class Coalescer:
+    """
+    Registry of the executions in flight, by request key. An entry is
+    created by the first request with a given key, which sends it; identical
+    requests made meanwhile wait for its status URL and attach to it.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False every request starts its own execution
+
+    .. attribute:: maxAge
+        Seconds after which an entry is no longer used if no client saw the
+        execution running meanwhile, in case it was never seen complete
+
+    .. attribute:: publishTimeout
+        Seconds to wait for another client to publish the outputs of an
+        execution, after which the caller publishes them itself
+
+    .. attribute:: entries
+        Dictionary mapping request keys to lists with the status URL (None
+        while the request is being sent) and the time it was registered
+
+    .. attribute:: publications
+        Dictionary mapping status URLs to lists with a flag set once the
+        outputs are published, the map file path and the time of the claim,
+        kept for publishTimeout seconds
+    """
+
+    logger = None
+
+    #Configs
+    enabled        = True
+    maxAge         = 600
+    publishTimeout = 600
+
+    entries      = None
+    publications = None
+
+    # Seconds between two checks of the job store while waiting
+    STORE_INTERVAL = 1
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+        self.entries = {}
+        self.publications = {}
+        self.lock = threading.Condition()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('Coalescing', 'enabled', self.enabled)
+        self.maxAge = settings.getfloat('Coalescing', 'maxAge', self.maxAge)
+        self.publishTimeout = settings.getfloat('Coalescing', 'publishTimeout', self.publishTimeout)
+
+    def join(self, requestKey):
+        """
+        Looks for an execution in flight with the same request key. If an
+        identical request is being sent, waits until its status URL is known.
+        Otherwise the caller becomes responsible for sending the request, and
+        must call resolve or abandon afterwards.
+
+        :param requestKey: string with the request key, None if the request
+        cannot be keyed
+        :returns: string with the status URL to attach to, None if the caller
+        must send the request
+        """
+
+        if not self.enabled or requestKey is None:
+            return None
+
+        with self.lock:
+            while True:
+                entry = self.entries.get(requestKey)
+                if entry is None:
+                    self.entries[requestKey] = [None, time.time()]
+                    break
+                if entry[0] is None:
+                    # Being sent by another thread
+                    self.lock.wait()
+                elif entry[1] + self.maxAge < time.time():
+                    del self.entries[requestKey]
+                else:
+                    return entry[0]
+
+        # Executions started by other processes
+        store = getJobStore()
+        if store.enabled:
+            try:
+                record = store.findActive(requestKey)
+            except Exception:
+                self.abandon(requestKey)
+                raise
+            if record is not None:
+                self.resolve(requestKey, record["statusURL"])
+                return record["statusURL"]
+
+        return None
+
+    def resolve(self, requestKey, statusURL):
+        """
+        Records the status URL of a request sent, waking up the identical
+        requests waiting for it.
+
+        :param requestKey: string with the request key
+        :param statusURL: string with the status URL of the execution
+        """
+
+        if not self.enabled or requestKey is None:
+            return
+
+        with self.lock:
+            self.entries[requestKey] = [statusURL, time.time()]
+            self.lock.notifyAll()
+
+    def abandon(self, requestKey):
+        """
+        Removes the entry of a request that could not be sent, so that one of
+        the identical requests waiting sends it instead.
+
+        :param requestKey: string with the request key
+        """
+
+        if not self.enabled or requestKey is None:
+            return
+
+        with self.lock:
+            entry = self.entries.get(requestKey)
+            if entry is not None and entry[0] is None:
+                del self.entries[requestKey]
+            self.lock.notifyAll()
+
+    def touch(self, statusURL):
+        """
+        Records an execution as seen running, keeping its entry in use for
+        another maxAge seconds.
+
+        :param statusURL: string with the status URL of the execution
+        """
+
+        if not self.enabled or statusURL is None:
+            return
+
+        with self.lock:
+            for entry in self.entries.values():
+                if entry[0] == statusURL:
+                    entry[1] = time.time()
+
+    def release(self, statusURL):
+        """
+        Removes the entry of an execution that finished or failed, whichever
+        client saw it complete. Later identical requests are answered by the
+        result cache, or start a new execution.
+
+        :param statusURL: string with the status URL of the execution
+        """
+
+        if not self.enabled or statusURL is None:
+            return
+
+        with self.lock:
+            for key in [key for key, entry in self.entries.items()
+                        if entry[0] == statusURL]:
+                del self.entries[key]
+
+    def claimPublication(self, statusURL, owner = None, attached = False):
+        """
+        Decides which of the clients following an execution publishes its
+        outputs. A client that did not attach to the execution publishes
+        them again, unless another client of this process is publishing them
+        at that moment. A client attached to the execution waits while a
+        JobManager of another process holds it in the job store, then while
+        another client of this process publishes it, and publishes the
+        outputs itself only if nobody did. A caller told to publish must
+        call published afterwards.
+
+        :param statusURL: string with the status URL of the execution
+        :param owner: string identifying the JobManager of the caller, None
+        for clients used on their own
+        :param attached: True if the caller attached to an execution started
+        by another client
+        :returns: tuple with True and None if the caller must publish the
+        outputs, or with False and the path to the map file published by
+        another client (None if it had no spatial outputs)
+        """
+
+        if not self.enabled or statusURL is None:
+            return (True, None)
+
+        limit = time.time() + self.publishTimeout
+        if attached:
+            result = self.awaitStore(statusURL, owner, limit)
+            if result is not None:
+                return (False, result[0])
+
+        with self.lock:
+            now = time.time()
+            for key in [key for key, entry in self.publications.items()
+                        if entry[2] + self.publishTimeout < now]:
+                del self.publications[key]
+
+            waited = False
+            while True:
+                entry = self.publications.get(statusURL)
+                if entry is None or (entry[0] and entry[1] is not None and
+                                     not os.path.exists(entry[1])) or \
+                   (entry[0] and not attached and not waited):
+                    self.publications[statusURL] = [False, None, time.time()]
+                    return (True, None)
+                if entry[0]:
+                    return (False, entry[1])
+                waited = True
+                remaining = limit - time.time()
+                if remaining <= 0:
+                    return (True, None)
+                self.lock.wait(remaining)
+
+    def awaitStore(self, statusURL, owner, limit):
+        """
+        Waits for the JobManager of another process holding the lease of an
+        execution in the job store to publish its outputs.
+
+        :param statusURL: string with the status URL of the execution
+        :param owner: string identifying the JobManager of the caller
+        :param limit: time after which to stop waiting
+        :returns: tuple with the path to the map file published, None if no
+        other live JobManager published the outputs in time
+        """
+
+        store = getJobStore()
+        if not store.enabled:
+            return None
+
+        while True:
+            record = store.get(statusURL)
+            if record is None:
+                return None
+            if record["state"] == store.PUBLISHED:
+                return (record["mapFile"],)
+            if record["state"] == store.ERROR or record["owner"] is None or \
+               record["owner"] == owner or record["lease"] < time.time():
+                return None
+            if time.time() + self.STORE_INTERVAL > limit:
+                return None
+            time.sleep(self.STORE_INTERVAL)
+
+    def published(self, statusURL, mapFile, succeeded = True):
+        """
+        Records the outputs of an execution as published, waking up the
+        clients waiting for them. If publishing failed, one of them publishes
+        the outputs instead.
+
+        :param statusURL: string with the status URL of the execution
+        :param mapFile: path to the map file written, None if none
+        :param succeeded: False if publishing failed
+        """
+
+        if not self.enabled or statusURL is None:
+            return
+
+        with self.lock:
+            if succeeded:
+                self.publications[statusURL] = [True, mapFile, time.time()]
+            else:
+                self.publications.pop(statusURL, None)
+            self.lock.notifyAll()
+
+##########################################################
+
+coalescer = None
+coalescerLock = threading.Lock()
+
+def getCoalescer():
+    """
+    :returns: the Coalescer object shared by the whole process
+    """
+
+    global coalescer
+    with coalescerLock:
+        if coalescer is None:
+            coalescer = Coalescer()
+            addReloadHook(coalescer.loadConfigs)
+    return coalescer
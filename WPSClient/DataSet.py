@@ -24,9 +24,11 @@ in the disk. This code is inspired in the UMN module of the PyWPS project [1].
 [1] http://wiki.rsg.pml.ac.uk/pywps/Main_Page
 '''
 
+import os
+import re
 import logging
-import fileinput
 import mimetypes
+from functools import wraps
 
 gdal=False
 #try:
@@ -35,119 +37,430 @@ from osgeo import ogr
 from osgeo import osr
 #except Exception,e:
 #    gdal=False
+from MetadataCache import getMetadataCache
+from SchemaCache import getSchemaCache
 
 DEBUG = True
 
-class DataSet:
+logger = logging.getLogger(__name__)
+
+def memoized(method):
+	"""
+	Decorates a DataSet method without arguments so that it is evaluated on
+	first call only, its result being kept in the memo attribute.
+	"""
+	
+	name = method.__name__
+	
+	@wraps(method)
+	def wrapper(self):
+		if name not in self.memo:
+			self.memo[name] = method(self)
+		return self.memo[name]
+	
+	return wrapper
+
+
+class DataSet(object):
 	"""
 	Wraps spatial data sets stored in the disk. Provides methods to retrieve 
-	useful information on the data set. 
+	useful information on the data set. Metadata is computed on first access
+	and kept for later calls; when the sidecar metadata file of an unchanged
+	data set is found, it is read instead and the file is not opened unless
+	further metadata is needed.
 	
 	:param path: string with the path to the physical data set.
 		
 	.. attribute:: dataSet
-		GDAL object wrapping the spatial data set
+		GDAL object wrapping the spatial data set, opened on first access
+		
+	.. attribute:: handle
+		GDAL object wrapping the spatial data set, None while not opened
 			
 	.. attribute:: dataType
 		Data set type: "raster" or "vector"
 			
 	.. attribute:: spatialReference
-		EPSG code of the coordinate system used by data set 
+		Spatial reference system used by data set, loaded on first access
 		
 	.. attribute:: min
-		Minimum value (for raster datasets)
+		Minimum value (for raster datasets), computed on first access
 		
 	.. attribute:: max
-		Maximum value (for raster datasets)
+		Maximum value (for raster datasets), computed on first access
 				
 	.. attribute:: name
 		Maximum value (for raster datasets)
 				
 	.. attribute:: value
-		Stores the value for literal type data sets
+		Stores the value for literal type data sets, typed if taken from the
+		execute response
 				
 	.. attribute:: uniqueID
 		Stores the unique ID for this data set
 				
 	.. attribute:: path
 		Path to the data set in disk
+		
+	.. attribute:: mimeType
+		Mime type declared by the server for the data set, None if unknown
+		
+	.. attribute:: processName
+		Name of the process that produced the data set, used to share the
+		schema of GML outputs between executions; None if unknown
+		
+	.. attribute:: memo
+		Dictionary with the results of the methods already evaluated
+		
+	.. attribute:: record
+		Sidecar record the metadata was read from, None if the data set was
+		inspected
+		
+	.. attribute:: checksum
+		Digest of the file to record in the sidecar file, computed by
+		prepareMetadata
+		
+	.. attribute:: validators
+		Dictionary with the HTTP validators the file was downloaded with, 
+		recorded in the sidecar file; None if unknown
 	"""
 
-	dataSet=None
+	handle=None
 	dataType=None
-	spatialReference=None
-	min=None
-	max=None
 	
 	name=None
 	value=""
 	uniqueID=None
 	path=None
+	mimeType=None
+	processName=None
+	memo=None
+	record=None
+	checksum=None
+	validators=None
 	
 	TYPE_VECTOR  = "vector" 
 	TYPE_RASTER  = "raster"
 	TYPE_LITERAL = "literal"
+	
+	# Memoized results not recorded in the sidecar metadata file
+	NOT_RECORDED = ["getSpatialReference"]
+	
+	# Data set types and GDAL drivers of the mime types declared by servers
+	MIME_TYPES = {
+		"image/tiff":                          (TYPE_RASTER, ["GTiff", "COG"]),
+		"image/geotiff":                       (TYPE_RASTER, ["GTiff", "COG"]),
+		"image/tiff; application=geotiff":     (TYPE_RASTER, ["GTiff", "COG"]),
+		"application/geotiff":                 (TYPE_RASTER, ["GTiff", "COG"]),
+		"image/png":                           (TYPE_RASTER, ["PNG"]),
+		"image/jpeg":                          (TYPE_RASTER, ["JPEG"]),
+		"image/jp2":                           (TYPE_RASTER, ["JP2OpenJPEG", "JPEG2000"]),
+		"application/x-netcdf":                (TYPE_RASTER, ["netCDF"]),
+		"application/netcdf":                  (TYPE_RASTER, ["netCDF"]),
+		"application/x-ogc-aaigrid":           (TYPE_RASTER, ["AAIGrid"]),
+		"application/gml+xml":                 (TYPE_VECTOR, ["GML"]),
+		"application/vnd.geo+json":            (TYPE_VECTOR, ["GeoJSON"]),
+		"application/geo+json":                (TYPE_VECTOR, ["GeoJSON"]),
+		"application/vnd.google-earth.kml+xml":(TYPE_VECTOR, ["KML", "LIBKML"]),
+		"application/geopackage+sqlite3":      (TYPE_VECTOR, ["GPKG"]),
+		"text/plain":                          (TYPE_LITERAL, []),
+	}
+	
+	# Data set types and GDAL drivers of the files starting with given bytes
+	SIGNATURES = [
+		("II*\0",              TYPE_RASTER, ["GTiff", "COG"]),
+		("MM\0*",              TYPE_RASTER, ["GTiff", "COG"]),
+		("II+\0",              TYPE_RASTER, ["GTiff", "COG"]),
+		("MM\0+",              TYPE_RASTER, ["GTiff", "COG"]),
+		("\x89PNG",            TYPE_RASTER, ["PNG"]),
+		("\xff\xd8\xff",       TYPE_RASTER, ["JPEG"]),
+		("\0\0\0\x0cjP  ",     TYPE_RASTER, ["JP2OpenJPEG", "JPEG2000"]),
+		("CDF\x01",            TYPE_RASTER, ["netCDF"]),
+		("CDF\x02",            TYPE_RASTER, ["netCDF"]),
+		("\x89HDF",            TYPE_RASTER, ["netCDF", "HDF5"]),
+		("ncols",              TYPE_RASTER, ["AAIGrid"]),
+		("SQLite format 3\0",  TYPE_VECTOR, ["GPKG", "SQLite"]),
+		("\0\0\x27\x0a",       TYPE_VECTOR, ["ESRI Shapefile"]),
+		("fgb\x03",            TYPE_VECTOR, ["FlatGeobuf"]),
+	]
+	
+	# Number of bytes read to recognise a file
+	HEAD_SIZE = 4096
+	
+	# Number of bytes searched for the GML boundedBy envelope
+	BOUNDED_BY_SIZE = 65536
+	
+	BOUNDED_BY = re.compile(r"<(?:\w+:)?boundedBy\b.*?</(?:\w+:)?boundedBy>", re.S)
+	ENVELOPE_SRS = re.compile(r"srsName\s*=\s*[\"']([^\"']*)[\"']")
+	LOWER_CORNER = re.compile(r"<(?:\w+:)?lowerCorner[^>]*>([^<]*)<")
+	UPPER_CORNER = re.compile(r"<(?:\w+:)?upperCorner[^>]*>([^<]*)<")
+	COORDINATES = re.compile(r"<(?:\w+:)?coordinates[^>]*>([^<]*)<")
+	COORD_X = re.compile(r"<(?:\w+:)?X>([^<]*)<")
+	COORD_Y = re.compile(r"<(?:\w+:)?Y>([^<]*)<")
 
 
-	def __init__(self, path, name, uniqueID):
+	def __init__(self, path, name, uniqueID, mimeType = None, value = None, processName = None):
 		
 		self.name = name
 		self.uniqueID = uniqueID
 		self.path = path
+		self.mimeType = mimeType
+		self.processName = processName
+		self.memo = {}
+		
+		# Literal value taken from the execute response, nothing on disk
+		if path is None:
+			self.dataType = self.TYPE_LITERAL
+			self.value = value
+			return
+		
+		record = getMetadataCache().load(path)
+		if record is not None:
+			self.record = record
+			self.dataType = record["dataType"]
+			self.memo.update(record["memo"])
+			logger.debug("Read the metadata of [%s] from its sidecar file" % path)
+			return
 
 		self.dataType = self.getDataSet(path)
 		
 		if self.dataType == self.TYPE_LITERAL:
 			return
 		
-		self.getSpatialReference()
-		
-		logging.debug("Read a data set of type " + str(self.dataType))
-		logging.debug("It has the following SRS: " + str(self.getEPSG()))
-		logging.debug("And the following bounds: " + str(self.getBBox()))
+		if logger.isEnabledFor(logging.DEBUG):
+			logger.debug("Read a data set of type " + str(self.dataType))
+			logger.debug("It has the following SRS: " + str(self.getEPSG()))
+			logger.debug("And the following bounds: " + str(self.getBBox()))
+
+
+	dataSet = property(lambda self: self.getHandle())
+	spatialReference = property(lambda self: self.getSpatialReference())
+	min = property(lambda self: self.getMinMax()[0])
+	max = property(lambda self: self.getMinMax()[1])
 
 
 	def getDataSet(self, path):
 		"""
-		Attempts to create a GDAL object wrapping the spatial set. Tried to
-		import it first as a raster and then as vector and stores it in the
-		dataSet attribute.
+		Attempts to create a GDAL object wrapping the spatial set. The type of
+		the data set and the GDAL drivers able to read it are chosen from the
+		declared mime type or from the first bytes of the file, and only those
+		drivers are tried. If the format is not recognised, or the drivers
+		fail, it is imported first as a raster and then as vector by probing
+		all drivers. The object is stored in the handle attribute.
 		
 		:param path: string with the path to the physical data set 
-		:returns: "raster" or "vector", None in case of error
+		:returns: "raster", "vector" or "literal"
 		"""
+		
+		dataType, drivers = self.getFormat()
+		
+		if dataType == self.TYPE_LITERAL:
+			self.readValue(path)
+			return self.TYPE_LITERAL
+		
+		if dataType is not None:
+			logger.debug("Trying to import [%s] with drivers %s" % (path, ", ".join(drivers)))
+			self.handle = self.openWith(dataType, drivers)
+			if self.handle:
+				return dataType
 
-		logging.debug("Trying to import [%s] using gdal" % path)
+		logger.debug("Trying to import [%s] using gdal" % path)
 		#If dataset is XML it will make an error like ERROR 4: `/var/www/html/wpsoutputs/vectorout-26317EUFxeb' not recognised as a supported file format.
-		self.dataSet = gdal.Open(path)
-
-		if self.dataSet:
-			band = self.dataSet.GetRasterBand(1)
-			self.min = band.GetMinimum()
-			self.max = band.GetMaximum()
-			if self.min is None or self.max is None:
-				(self.min,self.max) = band.ComputeRasterMinMax(1)
+		self.handle = gdal.Open(path)
+
+		if self.handle:
 			return self.TYPE_RASTER
 
-		if not self.dataSet:
-			logging.debug("Trying to import [%s] using ogr" % path)
-			self.dataSet = ogr.Open(path)
+		if not self.handle:
+			logger.debug("Trying to import [%s] using ogr" % path)
+			self.handle = ogr.Open(path)
 
-		if self.dataSet:
+		if self.handle:
 			return self.TYPE_VECTOR
 		else:
-			logging.info("It wasn't possible to import the dataset using gdal or ogr. Assuming literal type.")
-			#** Not very efficient, reading what was just written
-			for line in fileinput.input(path):
-				self.value += str(line)
+			logger.info("It wasn't possible to import the dataset using gdal or ogr. Assuming literal type.")
+			self.readValue(path)
 			return self.TYPE_LITERAL
-			return None
 
 
+	def readValue(self, path):
+		"""
+		Reads the content of a literal data set into the value attribute.
+		
+		:param path: string with the path to the physical data set 
+		"""
+		
+		#** Not very efficient, reading what was just written
+		# fileinput keeps global state, not usable from concurrent threads
+		literal = open(path)
+		self.value = literal.read()
+		literal.close()
+
+
+	@memoized
+	def getFormat(self):
+		"""
+		Recognises the format of the data set from the declared mime type, or
+		else from the first bytes of the file.
+		
+		:returns: tuple with the data set type and the list of names of the
+		GDAL drivers able to read it, (None, []) if not recognised
+		"""
+		
+		if self.mimeType is not None:
+			mimeType = self.mimeType.lower().replace(" ", "").replace(";", "; ")
+			if "subtype=gml" in mimeType or "gml+xml" in mimeType:
+				return (self.TYPE_VECTOR, ["GML"])
+			if mimeType in self.MIME_TYPES:
+				return self.MIME_TYPES[mimeType]
+			if mimeType.split(";")[0] in self.MIME_TYPES:
+				return self.MIME_TYPES[mimeType.split(";")[0]]
+		
+		try:
+			with open(self.path, "rb") as f:
+				head = f.read(self.HEAD_SIZE)
+		except IOError:
+			return (None, [])
+		
+		for signature, dataType, drivers in self.SIGNATURES:
+			if head.startswith(signature):
+				return (dataType, drivers)
+		
+		text = head.lstrip()
+		if text.startswith("<"):
+			if "<kml" in text:
+				return (self.TYPE_VECTOR, ["KML", "LIBKML"])
+			if "gml" in text or "FeatureCollection" in text:
+				return (self.TYPE_VECTOR, ["GML"])
+		elif text.startswith("{") and "FeatureCollection" in text:
+			return (self.TYPE_VECTOR, ["GeoJSON"])
+		return (None, [])
+
+
+	def openWith(self, dataType, drivers):
+		"""
+		Opens the data set with a list of GDAL drivers.
+		
+		:param dataType: "raster" or "vector"
+		:param drivers: list with the names of the GDAL drivers to try
+		:returns: GDAL object wrapping the data set, None if it could not be
+		opened; with GDAL versions lacking OpenEx the drivers are ignored
+		"""
+		
+		if not hasattr(gdal, "OpenEx"):
+			if dataType == self.TYPE_RASTER:
+				return gdal.Open(self.path)
+			return ogr.Open(self.path)
+		
+		if dataType == self.TYPE_RASTER:
+			flags = gdal.OF_RASTER | gdal.OF_READONLY
+			return gdal.OpenEx(self.path, flags, allowed_drivers=list(drivers))
+		
+		flags = gdal.OF_VECTOR | gdal.OF_READONLY
+		if list(drivers) != ["GML"]:
+			return gdal.OpenEx(self.path, flags, allowed_drivers=list(drivers))
+		
+		# Without a .gfs file the GML driver parses the whole file beforehand
+		template = getSchemaCache().getTemplate(self.processName, self.uniqueID)
+		if template is not None:
+			logger.debug("Opening [%s] with the GML schema template %s" % (self.path, template))
+			return gdal.OpenEx(self.path, flags, allowed_drivers=list(drivers),
+			                   open_options=["GFS_TEMPLATE=" + template])
+		
+		handle = gdal.OpenEx(self.path, flags, allowed_drivers=list(drivers))
+		gfsPath = os.path.splitext(self.path)[0] + ".gfs"
+		if handle and os.path.exists(gfsPath):
+			getSchemaCache().store(self.processName, self.uniqueID, gfsPath)
+		return handle
+
+
+	def getHandle(self):
+		"""
+		Opens the data set if its metadata was read from the sidecar file.
+		
+		:returns: GDAL or OGR object wrapping the data set
+		"""
+		
+		if self.handle is None and self.dataType in [self.TYPE_RASTER, self.TYPE_VECTOR]:
+			dataType, drivers = self.getFormat()
+			if dataType == self.dataType:
+				self.handle = self.openWith(dataType, drivers)
+			if not self.handle:
+				if self.dataType == self.TYPE_RASTER:
+					self.handle = gdal.Open(self.path)
+				else:
+					self.handle = ogr.Open(self.path)
+		return self.handle
+
+
+	def prepareMetadata(self, validators = None):
+		"""
+		Computes the digest of a data set inspected for the first time, to be
+		recorded in its sidecar file. Meant to be called from the thread that
+		fetched the data set, so that saveMetadata does not read the file.
+		
+		:param validators: dictionary with the HTTP validators the file was
+		downloaded with, None if unknown
+		"""
+		
+		if validators is not None:
+			self.validators = validators
+		if self.record is None and self.checksum is None and \
+		   self.dataType in [self.TYPE_RASTER, self.TYPE_VECTOR]:
+			self.checksum = getMetadataCache().getChecksum(self.path)
+
+
+	def saveMetadata(self):
+		"""
+		Records the metadata computed so far in the sidecar file of the data
+		set, to be reused while the file is unchanged. Nothing is written if
+		the metadata was read from the sidecar file and nothing was added.
+		"""
+		
+		if self.dataType not in [self.TYPE_RASTER, self.TYPE_VECTOR]:
+			return
+		memo = dict([(name, value) for name, value in self.memo.items()
+		             if name not in self.NOT_RECORDED])
+		
+		checksum = self.checksum
+		validators = self.validators
+		if self.record is not None:
+			if validators is None:
+				validators = self.record.get("validators")
+			if memo == self.record["memo"] and validators == self.record.get("validators"):
+				return
+			if self.record.get("checksumType") == getMetadataCache().checksumType:
+				checksum = self.record.get("checksum")
+		getMetadataCache().store(self.path, self.dataType, memo, checksum, validators)
+
+
+	@memoized
+	def getMinMax(self):
+		"""
+		Reads the minimum and maximum values of the first band, computing them
+		if the data set does not store them.
+		
+		:returns: tuple with the minimum and maximum values, (None, None) if
+		not a raster data set
+		"""
+		
+		if self.dataType != self.TYPE_RASTER:
+			return (None, None)
+		
+		band = self.dataSet.GetRasterBand(1)
+		minimum = band.GetMinimum()
+		maximum = band.GetMaximum()
+		if minimum is None or maximum is None:
+			(minimum, maximum) = band.ComputeRasterMinMax(1)
+		return (minimum, maximum)
+
+
+	@memoized
 	def getSpatialReference(self):
 		"""
-		Loads the Spatial Reference System defined in the data set, storing it
-		in the spatialReference attribute.
+		Loads the Spatial Reference System defined in the data set.
+		
+		:returns: osr SpatialReference object, None if undefined
 		"""
 
 		sr = osr.SpatialReference()
@@ -155,14 +468,16 @@ class DataSet:
 			wkt = self.dataSet.GetProjection()
 			res = sr.ImportFromWkt(wkt)
 			if res == 0:
-				self.spatialReference = sr
+				return sr
 		elif self.dataType == self.TYPE_VECTOR:
 			layer = self.dataSet.GetLayer()
 			ref = layer.GetSpatialRef()
 			if ref:
-				self.spatialReference = ref
+				return ref
+		return None
 
 
+	@memoized
 	def getEPSG(self):
 		"""
 		:returns: Spatial Reference System EPSG code
@@ -179,6 +494,7 @@ class DataSet:
 		return code
 
 
+	@memoized
 	def getBBox(self):
 		"""
 		:returns: dataset bounding box [minX, maxX, minY, maxY]
@@ -191,10 +507,10 @@ class DataSet:
 				    geotransform[3]+geotransform[5]*self.dataSet.RasterYSize,
 				    geotransform[3])
 		else:
-			layer = self.dataSet.GetLayer()
-			return layer.GetExtent()
+			return self.getVectorInfo()["extent"]
 		
 		
+	@memoized
 	def getPixelRes(self):
 		"""
 		:returns: pixel resolution [width, height]
@@ -204,16 +520,20 @@ class DataSet:
 			return (abs(geotransform[1]), abs(geotransform[5]))
 		
 		
+	@memoized
 	def getMimeType(self):
 		"""
-		:returns: a guessed mime type for this data set
+		:returns: the declared mime type of this data set, or else a mime type
+		guessed from the file extension
 		"""		
+		if self.mimeType is not None:
+			return self.mimeType
 		if self.path is None:
 			return None
-		mimetypes.init()
 		return mimetypes.guess_type(self.path)[0]
 
 		
+	@memoized
 	def getDriver(self):
 		"""
 		:returns: format driver (long name), e.g. GeoTIFF
@@ -222,15 +542,19 @@ class DataSet:
 			return self.dataSet.GetDriver().LongName
 		
 		
+	@memoized
 	def getGeometryType(self):
 		"""
 		:returns: string with type of geometry in a vector layer: "Point", 
 		"Line" or "Polygon"
 		"""
 		
-		layer = self.dataSet.GetLayer()
-		if layer <> None:
-			type = ogr.GeometryTypeToName(layer.GetGeomType())
+		if self.dataType != self.TYPE_VECTOR:
+			return None
+		
+		info = self.getVectorInfo()
+		if info is not None:
+			type = ogr.GeometryTypeToName(info["geometryType"])
 			if "Point" in type:
 				return "Point"
 			if "Line" in type:
@@ -240,6 +564,176 @@ class DataSet:
 		return None
 	
 	
+	@memoized
+	def getFeatureCount(self):
+		"""
+		:returns: number of features in a vector layer
+		"""
+		
+		if self.dataType != self.TYPE_VECTOR:
+			return None
+		info = self.getVectorInfo()
+		if info is None:
+			return None
+		if info["featureCount"] is None:
+			return self.dataSet.GetLayer().GetFeatureCount()
+		return info["featureCount"]
+		
+		
+	@memoized
+	def getFields(self):
+		"""
+		:returns: list of [name, type name] pairs with the attributes of a
+		vector layer
+		"""
+		
+		if self.dataType != self.TYPE_VECTOR:
+			return None
+		info = self.getVectorInfo()
+		if info is None:
+			return None
+		return info["fields"]
+		
+		
+	@memoized
+	def getVectorInfo(self):
+		"""
+		Collects the extent, geometry type, feature count and attributes of the
+		first layer of a vector data set. Values the driver provides cheaply
+		are used as they are; the extent of a GML file is otherwise taken from
+		its boundedBy envelope. Whatever is still missing is computed in a
+		single pass over the features, reading geometries only.
+		
+		:returns: dictionary with "extent" [minX, maxX, minY, maxY],
+		"geometryType" (OGR code), "featureCount" (None if not known without
+		reading the features) and "fields"; None if not a vector data set
+		"""
+		
+		if self.dataType != self.TYPE_VECTOR:
+			return None
+		
+		layer = self.dataSet.GetLayer()
+		if layer is None:
+			return None
+		
+		definition = layer.GetLayerDefn()
+		fields = []
+		for index in range(definition.GetFieldCount()):
+			field = definition.GetFieldDefn(index)
+			fields.append((field.GetName(), field.GetFieldTypeName(field.GetType())))
+		
+		extent = None
+		if layer.TestCapability(ogr.OLCFastGetExtent):
+			extent = layer.GetExtent()
+		elif list(self.getFormat()[1]) == ["GML"]:
+			extent = self.readBoundedBy()
+		
+		geometryType = layer.GetGeomType()
+		featureCount = None
+		if layer.TestCapability(ogr.OLCFastFeatureCount):
+			featureCount = layer.GetFeatureCount()
+		
+		if extent is None or ogr.GT_Flatten(geometryType) == ogr.wkbUnknown:
+			(scanExtent, scanType, featureCount) = self.scanFeatures(layer)
+			if extent is None:
+				extent = scanExtent
+			if ogr.GT_Flatten(geometryType) == ogr.wkbUnknown and scanType is not None:
+				geometryType = scanType
+		
+		return {"extent": extent, "geometryType": geometryType,
+		        "featureCount": featureCount, "fields": tuple(fields)}
+		
+		
+	def scanFeatures(self, layer):
+		"""
+		Reads all the features of a layer once, ignoring their attributes.
+		
+		:param layer: OGR layer
+		:returns: tuple with the extent of the geometries [minX, maxX, minY,
+		maxY] (None if there are none), the most frequent geometry type (None
+		if there are no geometries) and the number of features
+		"""
+		
+		definition = layer.GetLayerDefn()
+		ignored = [definition.GetFieldDefn(index).GetName()
+		           for index in range(definition.GetFieldCount())]
+		layer.SetIgnoredFields(ignored + ["OGR_STYLE"])
+		layer.ResetReading()
+		
+		extent = None
+		types = {}
+		count = 0
+		try:
+			feature = layer.GetNextFeature()
+			while feature is not None:
+				count += 1
+				geometry = feature.GetGeometryRef()
+				if geometry is not None and not geometry.IsEmpty():
+					envelope = geometry.GetEnvelope()
+					if extent is None:
+						extent = list(envelope)
+					else:
+						extent = [min(extent[0], envelope[0]), max(extent[1], envelope[1]),
+						          min(extent[2], envelope[2]), max(extent[3], envelope[3])]
+					geometryType = geometry.GetGeometryType()
+					types[geometryType] = types.get(geometryType, 0) + 1
+				feature = layer.GetNextFeature()
+		finally:
+			layer.SetIgnoredFields([])
+			layer.ResetReading()
+		
+		if extent is not None:
+			extent = tuple(extent)
+		geometryType = None
+		if types:
+			geometryType = max(types, key=types.get)
+		return (extent, geometryType, count)
+		
+		
+	def readBoundedBy(self):
+		"""
+		Reads the envelope declared in the boundedBy element at the top of a
+		GML file. Envelopes in a coordinate system given as URN or URL are
+		ignored, their axis order possibly being latitude first.
+		
+		:returns: tuple with the extent [minX, maxX, minY, maxY], None if not
+		found
+		"""
+		
+		try:
+			with open(self.path, "rb") as f:
+				head = f.read(self.BOUNDED_BY_SIZE)
+		except IOError:
+			return None
+		
+		match = self.BOUNDED_BY.search(head)
+		if match is None:
+			return None
+		envelope = match.group(0)
+		
+		srs = self.ENVELOPE_SRS.search(envelope)
+		if srs is not None and (srs.group(1).startswith("urn:") or "opengis.net/def" in srs.group(1)):
+			return None
+		
+		try:
+			lower = self.LOWER_CORNER.search(envelope)
+			upper = self.UPPER_CORNER.search(envelope)
+			coordinates = self.COORDINATES.search(envelope)
+			if lower is not None and upper is not None:
+				corners = [lower.group(1).split()[:2], upper.group(1).split()[:2]]
+			elif coordinates is not None:
+				corners = [pair.split(",")[:2] for pair in coordinates.group(1).split()]
+			else:
+				corners = zip(self.COORD_X.findall(envelope), self.COORD_Y.findall(envelope))
+			if len(corners) != 2:
+				return None
+			xs = [float(corner[0]) for corner in corners]
+			ys = [float(corner[1]) for corner in corners]
+		except (ValueError, IndexError):
+			return None
+		return (min(xs), max(xs), min(ys), max(ys))
+		
+		
 	def getMaxValue(self):
 		"""
 		:returns: The maximum value of the data set (if raster type)
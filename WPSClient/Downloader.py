@@ -0,0 +1,315 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module downloading process outputs to disk. Outputs are streamed in chunks of
+fixed size to a temporary file, which is renamed to the final path once the
+transfer is complete. Dropped connections are resumed with HTTP Range requests.
+A file downloaded before is not downloaded again while the validators the
+server sent with it (ETag, Last-Modified, Content-MD5) still match.
+'''
+
+import os, re, base64, hashlib, threading, logging
+from Settings import getSettings, addReloadHook
+import requests
+from HTTPPool import getPool
+
+##########################################################
+
+class Downloader:
+    """
+    Streams remote files to disk using bounded memory.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: chunkSize
+        Number of bytes read from the connection and written to disk at a time
+
+    .. attribute:: maxResumes
+        Number of times an interrupted download is resumed before giving up
+
+    .. attribute:: checksumType
+        md5 to verify downloads against the Content-MD5 header sent by the
+        server, empty to skip verification. Downloads sent without the header
+        are not hashed.
+    """
+
+    logger = None
+
+    #Configs
+    chunkSize    = 1048576
+    maxResumes   = 5
+    checksumType = ""
+
+    #Messages
+    ERR_01  = "Download failed after too many attempts: "
+    ERR_02  = "Checksum mismatch for the file downloaded from "
+    ERR_03  = "Incomplete download, expected %d bytes but got %d from "
+    WARN_01 = "Connection lost at byte %d, resuming download of "
+    WARN_02 = "Server did not resume at byte %d, starting over the download of "
+
+    TEMP_SUFFIX = ".part"
+
+    # Response headers identifying the version of a remote file
+    VALIDATORS = ["ETag", "Last-Modified", "Content-MD5"]
+
+    CONTENT_RANGE = re.compile(r"\s*bytes\s+(\d+)-\d+/(?:\d+|\*)\s*$")
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.chunkSize = settings.getint('Download', 'chunkSize', self.chunkSize)
+        self.maxResumes = settings.getint('Download', 'maxResumes', self.maxResumes)
+        self.checksumType = settings.get('Download', 'checksumType', self.checksumType).strip()
+
+    def download(self, url, path, validators = None):
+        """
+        Downloads a remote file to path. The content is first written to a
+        temporary file next to path, named after the process and thread
+        writing it, and renamed when complete, so path never holds a partial
+        file even if several clients download it at once. If path exists and
+        the validators it was downloaded with are given, the request is
+        conditional and the file is left untouched if the remote file did not
+        change.
+
+        :param url: string with the URL of the remote file
+        :param path: string with the path of the file to write
+        :param validators: dictionary with the validator headers returned by
+        a previous download of the file at path, None if unknown
+        :returns: dictionary with the validator headers of the file at path
+        """
+
+        size = None
+        if validators and os.path.exists(path):
+            size = os.path.getsize(path)
+        else:
+            validators = None
+
+        temp = "%s.%d.%d%s" % (path, os.getpid(), threading.current_thread().ident, self.TEMP_SUFFIX)
+        out = open(temp, 'wb')
+        try:
+            received = self.transfer(url, out, validators, size)
+        except:
+            out.close()
+            os.remove(temp)
+            raise
+        out.close()
+
+        if received is None:
+            os.remove(temp)
+            return validators
+
+        os.rename(temp, path)
+        return received
+
+    def transfer(self, url, out, validators = None, size = None):
+        """
+        Streams the remote file into an open file object, resuming with Range
+        requests when the connection drops. A resumed response starting at
+        another byte than requested is discarded and the download started
+        over.
+
+        :param url: string with the URL of the remote file
+        :param out: file object opened for writing
+        :param validators: dictionary with the validator headers of the copy
+        of the file already on disk, None if there is none
+        :param size: size in bytes of the copy already on disk
+        :returns: dictionary with the validator headers of the remote file,
+        None if the copy on disk is up to date and nothing was written
+        """
+
+        offset = 0
+        total = None
+        digest = None
+        contentMD5 = None
+        received = {}
+        attempts = 0
+
+        while True:
+
+            complete = False
+            headers = {"Accept-Encoding": "identity"}
+            if offset > 0:
+                headers["Range"] = "bytes=%d-" % offset
+            elif validators is not None:
+                if "ETag" in validators:
+                    headers["If-None-Match"] = validators["ETag"]
+                if "Last-Modified" in validators:
+                    headers["If-Modified-Since"] = validators["Last-Modified"]
+
+            try:
+                response = getPool().get(url, headers=headers, stream=True)
+                try:
+                    if offset == 0 and validators is not None and response.status_code == 304:
+                        return None
+                    response.raise_for_status()
+
+                    restart = False
+                    if offset > 0 and (response.status_code != 206 or
+                                       self.getRangeStart(response) != offset):
+                        # Range not supported or not honoured, start over
+                        if response.status_code == 206:
+                            self.logger.warning(self.WARN_02 % offset + url)
+                            restart = True
+                        offset = 0
+                        out.seek(0)
+                        out.truncate()
+
+                    if offset == 0 and not restart:
+                        total = self.getTotalSize(response)
+                        contentMD5 = response.headers.get("Content-MD5")
+                        digest = self.newDigest(contentMD5)
+                        received = self.getValidators(response)
+                        if self.isCurrent(validators, size, received, total):
+                            return None
+
+                    if not restart:
+                        for chunk in response.iter_content(self.chunkSize):
+                            out.write(chunk)
+                            offset += len(chunk)
+                            if digest is not None:
+                                digest.update(chunk)
+                        complete = True
+                finally:
+                    response.close()
+
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout):
+                self.logger.warning(self.WARN_01 % offset + url)
+
+            if complete and (total is None or offset >= total):
+                break
+
+            attempts += 1
+            if attempts > self.maxResumes:
+                raise Exception(self.ERR_01 + url)
+
+        if total is not None and offset != total:
+            raise Exception(self.ERR_03 % (total, offset) + url)
+
+        self.verify(url, digest, contentMD5)
+        return received
+
+    def newDigest(self, contentMD5):
+        """
+        :param contentMD5: value of the Content-MD5 header, None if absent
+        :returns: a new hashlib object of type checksumType, None if disabled
+        or if the server sent no digest to compare with
+        """
+        if self.checksumType != "md5" or contentMD5 is None:
+            return None
+        return hashlib.new(self.checksumType)
+
+    def getRangeStart(self, response):
+        """
+        :param response: requests Response object of a Range request
+        :returns: first byte sent, from the Content-Range header, None if
+        the header is absent or malformed
+        """
+
+        match = self.CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        if match is None:
+            return None
+        return int(match.group(1))
+
+    def getTotalSize(self, response):
+        """
+        :param response: requests Response object of the first request
+        :returns: size of the complete remote file, None if unknown
+        """
+
+        length = response.headers.get("Content-Length")
+        if length is None:
+            return None
+        return int(length)
+
+    def getValidators(self, response):
+        """
+        :param response: requests Response object of the first request
+        :returns: dictionary with the validator headers of the response
+        """
+
+        return dict([(name, response.headers[name]) for name in self.VALIDATORS
+                     if response.headers.get(name)])
+
+    def isCurrent(self, validators, size, received, total):
+        """
+        Tells whether the copy of a file on disk matches the remote file, for
+        servers ignoring conditional requests: the sizes must be equal, and
+        the ETag or Content-MD5 headers too.
+
+        :param validators: dictionary with the validator headers of the copy
+        on disk, None if there is no copy
+        :param size: size in bytes of the copy on disk
+        :param received: dictionary with the validator headers of the remote
+        file
+        :param total: size in bytes of the remote file, None if unknown
+        :returns: True if the copy on disk is up to date
+        """
+
+        if validators is None or total is None or size != total:
+            return False
+        for name in ["ETag", "Content-MD5"]:
+            if name in validators and validators[name] == received.get(name):
+                return True
+        return False
+
+    def verify(self, url, digest, contentMD5):
+        """
+        Compares the digest of the downloaded content with the Content-MD5
+        header.
+
+        :param url: string with the URL of the remote file
+        :param digest: hashlib object fed with the content, None if the
+        download is not verified
+        :param contentMD5: value of the Content-MD5 header, None if absent
+        """
+
+        if digest is None or contentMD5 is None:
+            return
+
+        if base64.b64encode(digest.digest()) != contentMD5.strip():
+            self.logger.error(self.ERR_02 + url)
+            raise Exception(self.ERR_02 + url)
+
+##########################################################
+
+downloader = None
+downloaderLock = threading.Lock()
+
+def getDownloader():
+    """
+    :returns: the Downloader object shared by the whole process
+    """
+
+    global downloader
+    with downloaderLock:
+        if downloader is None:
+            downloader = Downloader()
+            addReloadHook(downloader.loadConfigs)
+    return downloader
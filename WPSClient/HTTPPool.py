@@ -0,0 +1,149 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module keeping persistent HTTP connections to the remote servers. A single
+keep-alive session is kept per host and shared by every WPSClient in the
+process, for execute requests, status checks and output downloads alike.
+'''
+
+import threading, urlparse
+from Settings import getSettings, addReloadHook
+import requests
+from requests.adapters import HTTPAdapter
+
+##########################################################
+
+class HTTPPool:
+    """
+    Keeps one requests Session per remote host, each with a bounded pool of
+    keep-alive connections.
+
+    .. attribute:: poolMaxSize
+        Maximum number of connections kept open to each host
+
+    .. attribute:: poolBlock
+        If True requests wait for a free connection when poolMaxSize is
+        reached, otherwise extra connections are opened and discarded after use
+
+    .. attribute:: maxRetries
+        Number of times a failed connection attempt is retried
+
+    .. attribute:: timeout
+        Seconds to wait for the server to respond
+
+    .. attribute:: sessions
+        Dictionary with the Session object of each host
+    """
+
+    #Configs
+    poolMaxSize = 10
+    poolBlock   = False
+    maxRetries  = 3
+    timeout     = 60
+
+    sessions = None
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.poolMaxSize = settings.getint('HTTP', 'poolMaxSize', self.poolMaxSize)
+        self.poolBlock = settings.getboolean('HTTP', 'poolBlock', self.poolBlock)
+        self.maxRetries = settings.getint('HTTP', 'maxRetries', self.maxRetries)
+        self.timeout = settings.getfloat('HTTP', 'timeout', self.timeout)
+
+    def getSession(self, url):
+        """
+        :param url: string with any URL on the remote host
+        :returns: the Session object for the host of the URL, created on first use
+        """
+
+        parts = urlparse.urlsplit(url)
+        host = parts.scheme + "://" + parts.netloc
+
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.poolMaxSize,
+                    max_retries=self.maxRetries,
+                    pool_block=self.poolBlock)
+                session = requests.Session()
+                session.mount(host, adapter)
+                self.sessions[host] = session
+        return session
+
+    def get(self, url, **kwargs):
+        """
+        Sends a GET request through the session of the URL host.
+
+        :param url: string with the URL to request
+        :returns: requests Response object
+        """
+
+        kwargs.setdefault('timeout', self.timeout)
+        return self.getSession(url).get(url, **kwargs)
+
+    def post(self, url, data, **kwargs):
+        """
+        Sends a POST request through the session of the URL host.
+
+        :param url: string with the URL to request
+        :param data: string with the request body
+        :returns: requests Response object
+        """
+
+        kwargs.setdefault('timeout', self.timeout)
+        return self.getSession(url).post(url, data=data, **kwargs)
+
+    def close(self):
+        """
+        Closes all the connections kept open.
+        """
+
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+##########################################################
+
+pool = None
+poolLock = threading.Lock()
+
+def getPool():
+    """
+    :returns: the HTTPPool object shared by the whole process
+    """
+
+    global pool
+    with poolLock:
+        if pool is None:
+            pool = HTTPPool()
+            addReloadHook(pool.loadConfigs)
+    return pool
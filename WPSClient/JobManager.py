@@ -0,0 +1,612 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module managing many remote process executions at once. Each execution is
+wrapped by a Job; a single scheduler thread keeps track of when each job is due
+for a status check and hands it to a shared pool of worker threads, that
+submit requests, check status and generate map files for finished jobs.
+The executions recorded in the job store are leased to the manager driving
+them, so that other managers, like the one of the monitor daemon, leave them
+alone while it runs.
+'''
+
+import os, time, uuid, socket, heapq, itertools, threading, logging
+import Queue
+from Settings import getSettings
+from WPSClient import WPSClient
+from PollScheduler import PollScheduler
+from Metrics import getMetrics
+from JobStore import getJobStore
+
+##########################################################
+
+class Job:
+    """
+    Wraps a single remote process execution managed by the JobManager.
+
+    .. attribute:: client
+        WPSClient object used to communicate with the WPS server
+
+    .. attribute:: state
+        One of PENDING, RUNNING, FINISHED, PUBLISHED or ERROR
+
+    .. attribute:: epsg
+        EPSG code used to publish the complex outputs of this job
+
+    .. attribute:: scheduler
+        PollScheduler object deciding when to check the status of this job
+
+    .. attribute:: mapFile
+        Path to the map file generated for this job, None if no map file was
+        written
+
+    .. attribute:: error
+        Message of the error that terminated this job
+
+    .. attribute:: submitted
+        Time at which the job was handed to the JobManager
+
+    .. attribute:: finished
+        Time at which the job reached a final state
+
+    .. attribute:: queued
+        Time at which the job was last put on the work queue
+
+    .. attribute:: stored
+        True once the job is recorded in the job store
+
+    .. attribute:: recorded
+        Tuple with the state, progress, status message, map file and error
+        last written to the job store, None if nothing was written
+
+    .. attribute:: leader
+        Job attached to the same remote execution that checks its status and
+        publishes its outputs on behalf of this one, None if there is none
+
+    .. attribute:: followers
+        List with the jobs attached to this one
+    """
+
+    client    = None
+    state     = None
+    epsg      = None
+    scheduler = None
+    mapFile   = None
+    error     = None
+    submitted = None
+    finished  = None
+    queued    = None
+    stored    = False
+    recorded  = None
+    leader    = None
+    followers = None
+
+    PENDING   = 0
+    RUNNING   = WPSClient.RUNNING
+    FINISHED  = WPSClient.FINISHED
+    ERROR     = WPSClient.ERROR
+    PUBLISHED = 4
+
+    def __init__(self, client, state, epsg = None):
+
+        self.client = client
+        self.state = state
+        self.epsg = epsg
+        self.scheduler = PollScheduler()
+        self.followers = []
+        self.submitted = time.time()
+
+    def isDone(self):
+        """
+        :returns: True if the job reached a final state (PUBLISHED or ERROR)
+        """
+        return self.state in (self.PUBLISHED, self.ERROR)
+
+    def getStatusURL(self):
+        """
+        :returns: string with the status URL of the remote process, None if the
+        request was not yet sent
+        """
+        return self.client.statusURL
+
+##########################################################
+
+class JobManager:
+    """
+    Submits and tracks many remote process executions concurrently, using a
+    shared pool of worker threads. Jobs are checked for status periodically
+    and their map files generated as soon as they finish.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: workers
+        Number of worker threads sending requests and checking status
+
+    .. attribute:: publishers
+        Number of worker threads generating the map files of finished jobs,
+        0 to leave map file generation to the other workers
+
+    .. attribute:: onFinished
+        Optional function called with the Job object when it reaches a final
+        state
+
+    .. attribute:: jobs
+        List with all the Job objects handed to the manager
+
+    .. attribute:: store
+        JobStore object recording the jobs, so that they can be resumed after
+        a restart
+
+    .. attribute:: owner
+        String identifying the manager in the job store, holding the leases
+        of the executions it drives
+    """
+
+    logger = None
+
+    #Configs
+    workers    = 8
+    publishers = 2
+
+    onFinished = None
+    jobs       = None
+    store      = None
+    owner      = None
+
+    #Messages
+    ERR_01  = "Job failed: "
+    ERR_02  = "Could not record the job in the job store: "
+    INFO_01 = "Job finished, map file: "
+    INFO_02 = "Resumed jobs from the job store: "
+
+    def __init__(self, workers = None, onFinished = None, store = None):
+
+        self.loadConfigs()
+
+        if workers is not None:
+            self.workers = workers
+        self.onFinished = onFinished
+
+        if store is None:
+            store = getJobStore()
+        self.store = store
+        self.owner = "%s-%d-%s" % (socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])
+
+        self.logger = logging.getLogger(__name__)
+
+        self.jobs = []
+        self.active = 0
+        self.running = False
+        self.threads = []
+        self.queue = Queue.Queue()
+        self.publishQueue = Queue.Queue()
+        self.schedule = []
+        self.sequence = itertools.count()
+        self.lock = threading.Condition()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.workers = settings.getint('JobManager', 'workers', self.workers)
+        self.publishers = settings.getint('JobManager', 'publishers', self.publishers)
+
+    def start(self):
+        """
+        Starts the scheduler and worker threads.
+        """
+
+        if self.running:
+            return
+        self.running = True
+
+        self.threads = [threading.Thread(target=self.dispatch, name="JobScheduler")]
+        if self.store.enabled:
+            self.threads.append(threading.Thread(target=self.renewLeases, name="JobLeases"))
+        for i in range(self.workers):
+            self.threads.append(threading.Thread(
+                target=self.work, args=(self.queue,), name="JobWorker-%d" % i))
+        for i in range(self.publishers):
+            self.threads.append(threading.Thread(
+                target=self.work, args=(self.publishQueue,), name="JobPublisher-%d" % i))
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        """
+        Stops the scheduler and worker threads. Jobs already queued for
+        processing are completed first, jobs waiting for a status check are
+        left untouched and their leases released, for another manager to
+        take them over.
+        """
+
+        with self.lock:
+            self.running = False
+            self.lock.notifyAll()
+        for i in range(self.workers):
+            self.queue.put(None)
+        for i in range(self.publishers):
+            self.publishQueue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+        try:
+            self.store.release(self.owner)
+        except Exception as e:
+            self.logger.error(self.ERR_02 + str(e))
+
+    def submit(self, serverAddress, processName, inputs, outputs, epsg = None,
+               project = None):
+        """
+        Adds a new execution request to the manager. The request is sent to
+        the server by one of the worker threads.
+
+        :param serverAddress: string with the address of the remote WPS server
+        :param processName: string with process name
+        :param inputs: list of pairs with input names and values
+        :param outputs: dictionary with output names and titles
+        :param epsg: EPSG code used to publish the complex outputs
+        :param project: name of the project map file to which the layers are
+        appended, defaults to the configured project
+        :returns: the Job object created
+        """
+
+        client = WPSClient()
+        client.init(serverAddress, processName, inputs, outputs)
+        if project is not None:
+            client.project = project
+        # Part of the result cache key
+        client.epsg = epsg
+        return self.add(Job(client, Job.PENDING, epsg))
+
+    def watch(self, url, outputs, epsg = None):
+        """
+        Adds an execution already running on the remote server to the manager.
+
+        :param url: string with the status URL address of a remote process
+        :param outputs: dictionary with output names and titles
+        :param epsg: EPSG code used to publish the complex outputs
+        :returns: the Job object created
+        """
+
+        client = WPSClient()
+        client.initFromURL(url, outputs)
+        return self.add(Job(client, Job.RUNNING, epsg))
+
+    def add(self, job):
+        """
+        Registers a job and queues it for immediate processing.
+
+        :param job: Job object
+        :returns: the Job object
+        """
+
+        job.client.owner = self.owner
+        with self.lock:
+            self.jobs.append(job)
+            self.active += 1
+        if job.getStatusURL() is not None:
+            self.persist(job)
+        self.enqueue(job)
+        return job
+
+    def resume(self, epsg = None):
+        """
+        Adds the unfinished executions recorded in the job store, typically
+        after a restart. Executions already handed to this manager, or leased
+        by another manager still running, are skipped; the others are leased
+        to this manager. Their status is checked again before the map file is
+        generated.
+
+        :param epsg: EPSG code used for the jobs recorded without one
+        :returns: list with the Job objects created
+        """
+
+        if not self.store.enabled:
+            return []
+
+        with self.lock:
+            known = set([job.getStatusURL() for job in self.jobs])
+
+        resumed = []
+        for record in self.store.getUnfinished():
+            if record["statusURL"] in known or not self.store.claim(record["statusURL"], self.owner):
+                continue
+            client = WPSClient()
+            client.initFromURL(record["statusURL"], record["outputs"])
+            client.processName = record["processName"]
+            job = Job(client, Job.RUNNING, record["epsg"] or epsg)
+            job.submitted = record["created"]
+            job.stored = True
+            resumed.append(self.add(job))
+
+        if len(resumed) > 0:
+            self.logger.info(self.INFO_02 + str(len(resumed)))
+        return resumed
+
+    def wait(self, timeout = None):
+        """
+        Blocks until all the jobs reach a final state.
+
+        :param timeout: maximum number of seconds to wait, None to wait
+        indefinitely
+        :returns: True if all the jobs are done, False if the timeout expired
+        """
+
+        limit = None
+        if timeout is not None:
+            limit = time.time() + timeout
+
+        with self.lock:
+            while self.active > 0:
+                if limit is None:
+                    self.lock.wait()
+                else:
+                    remaining = limit - time.time()
+                    if remaining <= 0:
+                        return False
+                    self.lock.wait(remaining)
+        return True
+
+    def getActiveJobs(self):
+        """
+        :returns: list with the jobs that have not yet reached a final state
+        """
+        with self.lock:
+            return [job for job in self.jobs if not job.isDone()]
+
+    def getQueueDepths(self):
+        """
+        :returns: dictionary with the number of active jobs, of jobs waiting
+        for a status check, and of jobs queued for the workers and publishers
+        """
+        with self.lock:
+            return {"active": self.active,
+                    "scheduled": len(self.schedule),
+                    "queued": self.queue.qsize(),
+                    "publishing": self.publishQueue.qsize()}
+
+    def forget(self):
+        """
+        Drops the jobs that reached a final state, so that a long running
+        manager does not keep them in memory.
+
+        :returns: number of jobs dropped
+        """
+        with self.lock:
+            count = len(self.jobs)
+            self.jobs = [job for job in self.jobs if not job.isDone()]
+            return count - len(self.jobs)
+
+    def later(self, job, delay):
+        """
+        Schedules a job for processing after a given delay.
+
+        :param job: Job object
+        :param delay: seconds to wait before processing the job again
+        """
+
+        with self.lock:
+            heapq.heappush(self.schedule, (time.time() + delay, self.sequence.next(), job))
+            self.lock.notifyAll()
+
+    def renewLeases(self):
+        """
+        Lease loop, extends the leases of the jobs of the manager until it
+        is stopped.
+        """
+
+        interval = self.store.leaseTime / 4.0
+        while True:
+            with self.lock:
+                if self.running:
+                    self.lock.wait(interval)
+                if not self.running:
+                    return
+            try:
+                self.store.renew(self.owner)
+            except Exception as e:
+                self.logger.error(self.ERR_02 + str(e))
+
+    def dispatch(self):
+        """
+        Scheduler loop, moves jobs whose status check is due to the work queue.
+        """
+
+        with self.lock:
+            while self.running:
+                now = time.time()
+                while len(self.schedule) > 0 and self.schedule[0][0] <= now:
+                    self.enqueue(heapq.heappop(self.schedule)[2])
+                if len(self.schedule) > 0:
+                    self.lock.wait(self.schedule[0][0] - now)
+                else:
+                    self.lock.wait()
+
+    def enqueue(self, job):
+        """
+        Puts a job on the work queue, or on the publishing queue if it is
+        finished, recording the time so that the time spent waiting for a
+        free worker can be measured.
+
+        :param job: Job object
+        """
+
+        job.queued = time.time()
+        if job.state == Job.FINISHED and self.publishers > 0:
+            self.publishQueue.put(job)
+        else:
+            self.queue.put(job)
+
+    def work(self, queue):
+        """
+        Worker loop, processes jobs from a queue until stopped.
+
+        :param queue: Queue object with the jobs to process
+        """
+
+        while True:
+            job = queue.get()
+            if job is None:
+                return
+            getMetrics().observe("dispatch", time.time() - job.queued,
+                job.client.processName, job.client.getServer())
+            self.process(job)
+
+    def process(self, job):
+        """
+        Takes a job one step further: sends the request of a pending job,
+        checks the status of a running job, or generates the map file of a
+        finished job.
+
+        :param job: Job object
+        """
+
+        try:
+            if job.state == Job.PENDING:
+                job.client.sendRequest()
+                if job.client.cachedMapFile is not None:
+                    # Answered from the result cache, nothing to poll
+                    job.state = Job.FINISHED
+                    self.persist(job)
+                    self.enqueue(job)
+                elif self.follow(job):
+                    # Attached to an identical execution of another job
+                    pass
+                else:
+                    job.state = Job.RUNNING
+                    self.persist(job)
+                    self.later(job, job.scheduler.nextInterval(0))
+
+            elif job.state == Job.RUNNING:
+                if job.client.checkStatus():
+                    job.state = Job.FINISHED
+                    self.persist(job)
+                    self.enqueue(job)
+                else:
+                    self.persist(job)
+                    self.later(job, job.scheduler.nextInterval(job.client.getPercentCompleted()))
+
+            elif job.state == Job.FINISHED:
+                if job.epsg is not None:
+                    job.client.epsg = job.epsg
+                job.mapFile = job.client.generateMapFile()
+                job.state = Job.PUBLISHED
+                self.logger.info(self.INFO_01 + str(job.mapFile))
+                self.done(job)
+
+        except Exception as e:
+            job.state = Job.ERROR
+            job.error = str(e)
+            self.logger.error(self.ERR_01 + job.error)
+            self.done(job)
+
+    def done(self, job):
+        """
+        Records a job reaching a final state and notifies any waiting callers.
+
+        :param job: Job object
+        """
+
+        job.finished = time.time()
+        if job.getStatusURL() is not None:
+            self.persist(job)
+
+        if self.onFinished is not None:
+            try:
+                self.onFinished(job)
+            except Exception as e:
+                self.logger.error(self.ERR_01 + str(e))
+
+        with self.lock:
+            followers = job.followers
+            job.followers = []
+        for follower in followers:
+            follower.state = job.state
+            follower.mapFile = job.mapFile
+            follower.error = job.error
+            self.done(follower)
+
+        with self.lock:
+            self.active -= 1
+            self.lock.notifyAll()
+
+    def follow(self, job):
+        """
+        Attaches a job whose request was coalesced with an identical one to
+        the active job of the manager with the same status URL, if any. The
+        status of the execution is then checked, and its outputs published,
+        only once for both.
+
+        :param job: Job object, with a status URL
+        :returns: True if the job was attached to another one
+        """
+
+        with self.lock:
+            for other in self.jobs:
+                if other is not job and other.leader is None and not other.isDone() \
+                   and other.getStatusURL() == job.getStatusURL():
+                    job.state = Job.RUNNING
+                    job.leader = other
+                    other.followers.append(job)
+                    return True
+        return False
+
+    def persist(self, job):
+        """
+        Records the current state of a job in the job store. Nothing is
+        written if the job did not change since it was last recorded, the
+        lease being extended by the lease thread. A failure to write is
+        logged but does not stop the job.
+
+        :param job: Job object, with a status URL
+        """
+
+        # Coalesced executions are recorded by the client that started them
+        if not self.store.enabled or job.leader is not None or job.client.attached:
+            return
+
+        client = job.client
+        recorded = (job.state, client.percentCompleted, client.statusMessage,
+                    job.mapFile, job.error)
+        if job.stored and recorded == job.recorded:
+            return
+        try:
+            if not job.stored:
+                server = None
+                if client.wps is not None:
+                    server = client.wps.url
+                self.store.save(client.statusURL, client.processId, client.processName,
+                    server, client.outputs, job.epsg, job.state, client.percentCompleted,
+                    client.statusMessage, job.mapFile, job.error, client.requestKey,
+                    self.owner)
+                job.stored = True
+            else:
+                self.store.update(client.statusURL, state=job.state,
+                    percentCompleted=client.percentCompleted,
+                    statusMessage=client.statusMessage,
+                    mapFile=job.mapFile, error=job.error)
+            job.recorded = recorded
+        except Exception as e:
+            self.logger.error(self.ERR_02 + str(e))
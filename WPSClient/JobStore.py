@@ -0,0 +1,410 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module keeping a durable record of the remote process executions in a SQLite
+database. Every execution is recorded with its status URL, outputs and last
+known status, so that a monitoring process can resume all the unfinished
+executions after a restart instead of sending the requests again. The request
+key of each execution lets identical requests from other processes attach to
+it while it runs. Each unfinished execution is leased by the JobManager
+driving it, which renews the lease while it runs; other managers only take
+over executions that are not leased or whose lease expired.
+'''
+
+import os, json, time, sqlite3, threading, logging
+from Settings import getSettings
+
+##########################################################
+
+class JobStore:
+    """
+    SQLite database with one row per remote process execution, keyed by the
+    status URL.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False nothing is recorded
+
+    .. attribute:: path
+        Path to the database file
+
+    .. attribute:: leaseTime
+        Seconds for which a JobManager keeps an execution to itself without
+        renewing the lease, after which another manager may take it over
+
+    .. attribute:: connection
+        sqlite3 Connection object, shared by all threads
+    """
+
+    logger = None
+
+    #Configs
+    enabled   = True
+    path      = "/tmp/WPSClient/jobs.db"
+    leaseTime = 120
+
+    connection = None
+
+    # States, as in the Job class
+    RUNNING   = 1
+    FINISHED  = 2
+    ERROR     = 3
+    PUBLISHED = 4
+
+    COLUMNS = ["statusURL", "processId", "processName", "server", "outputs", "epsg",
+               "state", "percentCompleted", "statusMessage", "mapFile", "error",
+               "created", "updated", "requestKey", "owner", "lease"]
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            statusURL        TEXT PRIMARY KEY,
+            processId        TEXT,
+            processName      TEXT,
+            server           TEXT,
+            outputs          TEXT,
+            epsg             TEXT,
+            state            INTEGER NOT NULL,
+            percentCompleted INTEGER,
+            statusMessage    TEXT,
+            mapFile          TEXT,
+            error            TEXT,
+            created          REAL NOT NULL,
+            updated          REAL NOT NULL,
+            requestKey       TEXT,
+            owner            TEXT,
+            lease            REAL);
+        CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, updated);
+        """
+
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS jobs_request ON jobs (requestKey, state);
+        """
+
+    def __init__(self, path = None):
+
+        self.loadConfigs()
+        if path is not None:
+            self.path = path
+
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+
+        if self.enabled:
+            self.open()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('JobStore', 'enabled', self.enabled)
+        self.path = settings.get('JobStore', 'path', self.path)
+        self.leaseTime = settings.getfloat('JobStore', 'leaseTime', self.leaseTime)
+
+    def open(self):
+        """
+        Opens the database, creating it if needed. The write-ahead log lets
+        other processes read the database while it is being written.
+        """
+
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.text_factory = str
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+
+        # Databases created before the requestKey, owner and lease columns were added
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")]
+        if "requestKey" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN requestKey TEXT")
+        if "owner" not in columns:
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self.connection.execute("ALTER TABLE jobs ADD COLUMN lease REAL")
+        self.connection.executescript(self.INDEXES)
+        self.connection.commit()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def save(self, statusURL, processId = None, processName = None, server = None,
+             outputs = None, epsg = None, state = RUNNING, percentCompleted = None,
+             statusMessage = None, mapFile = None, error = None, requestKey = None,
+             owner = None):
+        """
+        Records an execution, replacing any previous record of the same
+        status URL. The creation time of an existing record is kept.
+
+        :param statusURL: string with the status URL of the remote process
+        :param processId: string with the identifier of the remote process
+        :param processName: string with the process name
+        :param server: string with the address of the remote WPS server
+        :param outputs: dictionary with output names and titles
+        :param epsg: EPSG code used to publish the complex outputs
+        :param state: one of RUNNING, FINISHED, PUBLISHED or ERROR
+        :param percentCompleted: last progress reported by the server
+        :param statusMessage: last status message reported by the server
+        :param mapFile: path to the map file generated
+        :param error: message of the error that terminated the execution
+        :param requestKey: string with the request key of the result cache
+        :param owner: string identifying the JobManager driving the
+        execution, which gets a lease on it; None if no manager drives it
+        """
+
+        if not self.enabled:
+            return
+
+        now = time.time()
+        lease = None
+        if owner is not None:
+            lease = now + self.leaseTime
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO jobs (" + ", ".join(self.COLUMNS) + ") VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, "
+                "COALESCE((SELECT created FROM jobs WHERE statusURL = ?), ?), ?, ?, ?, ?)",
+                (statusURL, processId, processName, server,
+                 None if outputs is None else json.dumps(outputs),
+                 None if epsg is None else str(epsg), state, percentCompleted,
+                 statusMessage, mapFile, error, statusURL, now, now, requestKey,
+                 owner, lease))
+            self.connection.commit()
+
+    def update(self, statusURL, **values):
+        """
+        Updates some of the columns of an execution record.
+
+        :param statusURL: string with the status URL of the remote process
+        :param values: column names and new values, e.g. state=JobStore.ERROR
+        """
+
+        if not self.enabled or len(values) == 0:
+            return
+
+        for name in values:
+            if name not in self.COLUMNS:
+                raise ValueError("Unknown column: " + name)
+        if "outputs" in values:
+            values["outputs"] = json.dumps(values["outputs"])
+        values["updated"] = time.time()
+
+        names = sorted(values)
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET " + ", ".join([name + " = ?" for name in names]) +
+                " WHERE statusURL = ?",
+                [values[name] for name in names] + [statusURL])
+            self.connection.commit()
+
+    def get(self, statusURL):
+        """
+        :param statusURL: string with the status URL of the remote process
+        :returns: dictionary with the record of the execution, None if absent
+        """
+
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT * FROM jobs WHERE statusURL = ?", (statusURL,)).fetchone()
+        if row is None:
+            return None
+        return self.toDict(row)
+
+    def getByState(self, states):
+        """
+        :param states: list of states
+        :returns: list of dictionaries with the records of the executions in
+        any of the given states, oldest first
+        """
+
+        if not self.enabled or len(states) == 0:
+            return []
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM jobs WHERE state IN (" + ", ".join(["?"] * len(states)) +
+                ") ORDER BY created", list(states)).fetchall()
+        return [self.toDict(row) for row in rows]
+
+    def findActive(self, requestKey):
+        """
+        :param requestKey: string with the request key of the result cache
+        :returns: dictionary with the record of the most recent execution of
+        an identical request still running and leased to a live JobManager,
+        None if there is none
+        """
+
+        if not self.enabled or requestKey is None:
+            return None
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT * FROM jobs WHERE requestKey = ? AND state = ? AND lease >= ? "
+                "ORDER BY created DESC LIMIT 1",
+                (requestKey, self.RUNNING, time.time())).fetchone()
+        if row is None:
+            return None
+        return self.toDict(row)
+
+    def getUnfinished(self):
+        """
+        :returns: list of dictionaries with the records of the executions not
+        yet published nor failed
+        """
+
+        return self.getByState([self.RUNNING, self.FINISHED])
+
+    def claim(self, statusURL, owner):
+        """
+        Leases an unfinished execution to a JobManager, unless another
+        manager holds a lease on it that has not expired. The check and the
+        update are a single statement, so only one manager gets the execution.
+
+        :param statusURL: string with the status URL of the remote process
+        :param owner: string identifying the JobManager
+        :returns: True if the execution is now leased to the owner
+        """
+
+        if not self.enabled:
+            return False
+
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET owner = ?, lease = ? WHERE statusURL = ? "
+                "AND state IN (?, ?) AND (owner IS NULL OR owner = ? OR lease < ?)",
+                (owner, now + self.leaseTime, statusURL, self.RUNNING, self.FINISHED,
+                 owner, now))
+            self.connection.commit()
+        return cursor.rowcount == 1
+
+    def renew(self, owner):
+        """
+        Extends the leases of all the unfinished executions of a JobManager.
+
+        :param owner: string identifying the JobManager
+        :returns: number of leases renewed
+        """
+
+        if not self.enabled:
+            return 0
+
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET lease = ? WHERE owner = ? AND state IN (?, ?)",
+                (time.time() + self.leaseTime, owner, self.RUNNING, self.FINISHED))
+            self.connection.commit()
+        return cursor.rowcount
+
+    def release(self, owner):
+        """
+        Gives up the leases of a JobManager on its unfinished executions, so
+        that another manager can take them over at once.
+
+        :param owner: string identifying the JobManager
+        :returns: number of leases released
+        """
+
+        if not self.enabled:
+            return 0
+
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET owner = NULL, lease = NULL WHERE owner = ? AND state IN (?, ?)",
+                (owner, self.RUNNING, self.FINISHED))
+            self.connection.commit()
+        return cursor.rowcount
+
+    def countByState(self):
+        """
+        :returns: dictionary mapping states to the number of executions
+        """
+
+        if not self.enabled:
+            return {}
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict([(row[0], row[1]) for row in rows])
+
+    def purge(self, olderThan):
+        """
+        Removes the records of published and failed executions not updated
+        for a given time.
+
+        :param olderThan: age in seconds
+        :returns: number of records removed
+        """
+
+        if not self.enabled:
+            return 0
+
+        with self.lock:
+            cursor = self.connection.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated < ?",
+                (self.PUBLISHED, self.ERROR, time.time() - olderThan))
+            self.connection.commit()
+        return cursor.rowcount
+
+    def toDict(self, row):
+        """
+        :param row: sqlite3 Row object
+        :returns: dictionary with the record, outputs decoded; titles that
+        are not strings, e.g. None, are kept as they are
+        """
+
+        record = dict(zip(row.keys(), tuple(row)))
+        if record["outputs"] is not None:
+            outputs = json.loads(record["outputs"]) or {}
+            record["outputs"] = dict([(name.encode("utf-8"),
+                                       title.encode("utf-8") if isinstance(title, unicode) else title)
+                                      for name, title in outputs.items()])
+        return record
+
+##########################################################
+
+store = None
+storeLock = threading.Lock()
+
+def getJobStore():
+    """
+    :returns: the JobStore object shared by the whole process
+    """
+
+    global store
+    with storeLock:
+        if store is None:
+            store = JobStore()
+    return store
@@ -0,0 +1,197 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module setting up the logging of the package. Log records are put on a queue
+and written to the log file by a background thread, so that logging does not
+block on disk I/O. The handlers are installed once per process, however many
+WPSClient objects are created. The log level follows reloaded settings, the
+log file does not change until the process is restarted.
+'''
+
+import atexit, threading, logging
+import Queue
+from Settings import getSettings, addReloadHook
+
+LOGGER_NAME = "WPSClient"
+
+##########################################################
+
+class QueueHandler(logging.Handler):
+    """
+    Handler putting log records on a queue, to be written by a QueueListener.
+
+    .. attribute:: queue
+        Queue object shared with the listener
+    """
+
+    queue = None
+
+    def __init__(self, queue):
+
+        logging.Handler.__init__(self)
+        self.queue = queue
+
+    def prepare(self, record):
+        """
+        Merges the message arguments and exception text into the record, so
+        that it can be formatted later in another thread.
+
+        :param record: LogRecord object
+        :returns: the LogRecord object
+        """
+
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+##########################################################
+
+class QueueListener:
+    """
+    Background thread taking log records from a queue and passing them to
+    the actual handlers.
+
+    .. attribute:: queue
+        Queue object shared with the QueueHandler
+
+    .. attribute:: handlers
+        List of handlers writing the records
+    """
+
+    queue    = None
+    handlers = None
+    thread   = None
+
+    def __init__(self, queue, handlers):
+
+        self.queue = queue
+        self.handlers = handlers
+
+    def start(self):
+        """
+        Starts the background thread.
+        """
+
+        self.thread = threading.Thread(target=self.run, name="LogWriter")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Writes the records still in the queue and stops the background thread.
+        """
+
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        for handler in self.handlers:
+            handler.close()
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                return
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+##########################################################
+
+class JobFilter(logging.Filter):
+    """
+    Fills in the per-job fields (processId, statusURL) of records logged
+    outside the context of a job, so that any formatter can use them.
+    """
+
+    def filter(self, record):
+        if not hasattr(record, "processId"):
+            record.processId = "-"
+        if not hasattr(record, "statusURL"):
+            record.statusURL = "-"
+        return True
+
+##########################################################
+
+listener = None
+setupLock = threading.Lock()
+
+def setupLogging(logFile, logLevel, logFormat):
+    """
+    Installs the queue based handlers on the package logger. Only the first
+    call has any effect, later calls just return the logger.
+
+    :param logFile: path to the log file, None or empty to log to stderr
+    :param logLevel: string with the name of the logging level
+    :param logFormat: string formating log output
+    :returns: the package logger
+    """
+
+    global listener
+    logger = logging.getLogger(LOGGER_NAME)
+
+    with setupLock:
+        if listener is not None:
+            return logger
+
+        if logFile:
+            handler = logging.FileHandler(logFile, 'a')
+        else:
+            handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(logFormat))
+        handler.addFilter(JobFilter())
+
+        queue = Queue.Queue()
+        listener = QueueListener(queue, [handler])
+        listener.start()
+        atexit.register(listener.stop)
+
+        logger.addHandler(QueueHandler(queue))
+        logger.setLevel(logLevel)
+        addReloadHook(reloadLogLevel)
+
+    return logger
+
+def reloadLogLevel():
+    """
+    Sets the level of the package logger from the configuration file.
+    """
+
+    settings = getSettings()
+    if settings.has('Logging', 'logLevel'):
+        logging.getLogger(LOGGER_NAME).setLevel(settings.get('Logging', 'logLevel'))
+
+def getJobLogger(processId = None, statusURL = None):
+    """
+    :param processId: identifier of the remote process
+    :param statusURL: status URL of the remote process
+    :returns: LoggerAdapter adding the per-job fields to every record
+    """
+
+    return logging.LoggerAdapter(logging.getLogger(LOGGER_NAME),
+        {"processId": processId or "-", "statusURL": statusURL or "-"})
@@ -0,0 +1,237 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module splitting the text of MapServer map files into blocks (MAP, LAYER,
+WEB, METADATA, ...), so that map files written by MapFileText can be taken
+apart and recombined without regenerating them.
+'''
+
+import re
+
+# Keywords opening a block closed by END
+BLOCKS = set(["MAP", "LAYER", "CLASS", "STYLE", "LABEL", "WEB", "METADATA",
+    "VALIDATION", "PROJECTION", "OUTPUTFORMAT", "LEGEND", "SCALEBAR",
+    "QUERYMAP", "REFERENCE", "FEATURE", "POINTS", "GRID", "JOIN", "CLUSTER",
+    "COMPOSITE", "LEADER"])
+
+# Keywords opening a block only when alone on their line or closed on the
+# same line, otherwise parameters (e.g. SYMBOL "circle" in a STYLE)
+BLOCKS_ALONE = set(["SYMBOL", "PATTERN"])
+
+TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|#.*|[^\s"\'#]+')
+
+##########################################################
+
+class Block:
+    """
+    Block of a map file, with the lines it spans.
+
+    .. attribute:: keyword
+        Upper case keyword opening the block, e.g. LAYER
+
+    .. attribute:: start
+        Index of the line opening the block
+
+    .. attribute:: end
+        Index of the line closing the block
+
+    .. attribute:: children
+        List with the blocks nested in this one
+    """
+
+    keyword  = None
+    start    = None
+    end      = None
+    children = None
+
+    def __init__(self, keyword, start):
+
+        self.keyword = keyword
+        self.start = start
+        self.children = []
+
+    def find(self, keyword):
+        """
+        :param keyword: upper case keyword
+        :returns: list with the direct children opened by keyword
+        """
+        return [child for child in self.children if child.keyword == keyword]
+
+##########################################################
+
+def tokenize(line):
+    """
+    :param line: string with a line of a map file
+    :returns: list with the tokens of the line, comments removed
+    """
+
+    return [token for token in TOKEN.findall(line) if not token.startswith("#")]
+
+def parse(lines):
+    """
+    Builds the tree of blocks of a map file.
+
+    :param lines: list with the lines of the map file
+    :returns: Block object with keyword None spanning the whole file, whose
+    children are the top level blocks
+    """
+
+    root = Block(None, 0)
+    stack = [root]
+
+    for index in range(len(lines)):
+        words = [token.upper() for token in tokenize(lines[index])]
+        for position in range(len(words)):
+            word = words[position]
+            if word == "END":
+                if len(stack) > 1:
+                    stack.pop().end = index
+            elif position == 0 and (word in BLOCKS or (word in BLOCKS_ALONE and
+                                    (len(words) == 1 or "END" in words[1:]))):
+                block = Block(word, index)
+                stack[-1].children.append(block)
+                stack.append(block)
+
+    root.end = len(lines) - 1
+    return root
+
+def findParameter(lines, block, keyword):
+    """
+    :param lines: list with the lines of the map file
+    :param block: Block object
+    :param keyword: upper case parameter name, e.g. NAME
+    :returns: index of the line setting the parameter directly in the block,
+    not in a nested block, None if absent
+    """
+
+    nested = set()
+    for child in block.children:
+        nested.update(range(child.start, child.end + 1))
+
+    for index in range(block.start + 1, block.end):
+        if index in nested:
+            continue
+        tokens = tokenize(lines[index])
+        if len(tokens) > 1 and tokens[0].upper() == keyword:
+            return index
+    return None
+
+def getValues(lines, block, keyword):
+    """
+    :param lines: list with the lines of the map file
+    :param block: Block object
+    :param keyword: upper case parameter name, e.g. EXTENT
+    :returns: list with the values of the parameter directly in the block,
+    quotes removed, None if absent
+    """
+
+    index = findParameter(lines, block, keyword)
+    if index is None:
+        return None
+    return [unquote(token) for token in tokenize(lines[index])[1:]]
+
+def getValue(lines, block, keyword):
+    """
+    :param lines: list with the lines of the map file
+    :param block: Block object
+    :param keyword: upper case parameter name, e.g. NAME
+    :returns: string with the first value of the parameter directly in the
+    block, quotes removed, None if absent
+    """
+
+    values = getValues(lines, block, keyword)
+    if values is None:
+        return None
+    return values[0]
+
+def setValues(lines, block, keyword, values):
+    """
+    Replaces the values of a parameter directly in a block.
+
+    :param lines: list with the lines of the map file, modified in place
+    :param block: Block object
+    :param keyword: upper case parameter name, e.g. EXTENT
+    :param values: list of strings with the new values, written as given
+    :returns: True if the parameter was found
+    """
+
+    index = findParameter(lines, block, keyword)
+    if index is None:
+        return False
+    line = lines[index]
+    indent = line[:len(line) - len(line.lstrip())]
+    lines[index] = "%s%s %s\n" % (indent, tokenize(line)[0], " ".join(values))
+    return True
+
+def insertValues(lines, block, keyword, values):
+    """
+    Adds a parameter at the top of a block, indented like the line opening
+    it; the lines after it are shifted, so blocks must be parsed again.
+
+    :param lines: list with the lines of the map file, modified in place
+    :param block: Block object
+    :param keyword: upper case parameter name, e.g. EXTENT
+    :param values: list of strings with the values, written as given
+    """
+
+    line = lines[block.start]
+    indent = line[:len(line) - len(line.lstrip())] + "  "
+    lines.insert(block.start + 1, "%s%s %s\n" % (indent, keyword, " ".join(values)))
+
+def setValue(lines, block, keyword, value):
+    """
+    Replaces the value of a parameter directly in a block.
+
+    :param lines: list with the lines of the map file, modified in place
+    :param block: Block object
+    :param keyword: upper case parameter name, e.g. NAME
+    :param value: string with the new value, quoted in the file
+    :returns: True if the parameter was found
+    """
+
+    return setValues(lines, block, keyword, ['"%s"' % value.replace('"', '\\"')])
+
+def setMetadata(lines, block, key, value):
+    """
+    Replaces the value of an entry of a METADATA block.
+
+    :param lines: list with the lines of the map file, modified in place
+    :param block: Block object of the METADATA block
+    :param key: string with the metadata key, e.g. wms_title
+    :param value: string with the new value
+    :returns: True if the entry was found
+    """
+
+    for index in range(block.start + 1, block.end):
+        tokens = tokenize(lines[index])
+        if len(tokens) == 2 and unquote(tokens[0]).lower() == key.lower():
+            line = lines[index]
+            indent = line[:len(line) - len(line.lstrip())]
+            lines[index] = '%s%s "%s"\n' % (indent, tokens[0], value.replace('"', '\\"'))
+            return True
+    return False
+
+def unquote(token):
+    """
+    :param token: string with a token, possibly quoted
+    :returns: the token without its quotes
+    """
+
+    if len(token) > 1 and token[0] == token[-1] and token[0] in "\"'":
+        return token[1:-1]
+    return token
@@ -0,0 +1,232 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module keeping the metadata of each output (type, extent, coordinate system,
+geometry type, raster min/max, ...) in a JSON sidecar file next to it. The
+record is keyed on the size and modification time of the file, and optionally
+on a digest of its content, so that publishing an unchanged file again reads
+the record instead of inspecting the file with GDAL/OGR. The record also keeps
+the HTTP validators the file was downloaded with, so that an unchanged output
+is not downloaded again, which would give it a new modification time.
+'''
+
+import os, json, hashlib, threading, logging
+from Settings import getSettings, addReloadHook
+from AtomicFile import writeAtomic
+
+##########################################################
+
+class MetadataCache:
+    """
+    Reads and writes the sidecar metadata files of data sets.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False data sets are always inspected
+
+    .. attribute:: suffix
+        Appended to the path of a data set to name its sidecar file
+
+    .. attribute:: checksumType
+        Name of the hashlib algorithm (e.g. md5) used to recognise a file
+        whose modification time changed but whose content did not, e.g. after
+        downloading it again; empty to rely on size and modification time only
+
+    .. attribute:: chunkSize
+        Number of bytes read at a time when computing digests
+    """
+
+    logger = None
+
+    #Configs
+    enabled      = True
+    suffix       = ".meta.json"
+    checksumType = ""
+    chunkSize    = 1048576
+
+    VERSION = 1
+
+    #Messages
+    WARN_01 = "Could not write the metadata file: "
+    WARN_02 = "Ignoring unreadable metadata file: "
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('MetadataCache', 'enabled', self.enabled)
+        self.suffix = settings.get('MetadataCache', 'suffix', self.suffix)
+        self.checksumType = settings.get('MetadataCache', 'checksumType', self.checksumType).strip()
+
+    def getDigest(self, path):
+        """
+        :param path: path to a file
+        :returns: string with the hexadecimal digest of the file content
+        """
+
+        digest = hashlib.new(self.checksumType)
+        with open(path, "rb") as f:
+            chunk = f.read(self.chunkSize)
+            while chunk:
+                digest.update(chunk)
+                chunk = f.read(self.chunkSize)
+        return digest.hexdigest()
+
+    def load(self, path):
+        """
+        Reads the sidecar record of a data set, if it still describes the
+        file. When only the modification time differs and checksumType is set,
+        the content digest decides, and the record is refreshed on a match.
+
+        :param path: path to the data set
+        :returns: dictionary with the data set type under "dataType" and the
+        memoized metadata under "memo", None if there is no valid record
+        """
+
+        if not self.enabled or path is None:
+            return None
+
+        try:
+            with open(path + self.suffix) as f:
+                record = decode(json.load(f))
+            stat = os.stat(path)
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            self.logger.warning(self.WARN_02 + path + self.suffix)
+            return None
+
+        if record.get("version") != self.VERSION or record.get("size") != stat.st_size:
+            return None
+        if record.get("mtime") != stat.st_mtime:
+            if not self.checksumType or record.get("checksumType") != self.checksumType or \
+               record.get("checksum") != self.getDigest(path):
+                return None
+            record["mtime"] = stat.st_mtime
+            self.write(path, record)
+
+        return record
+
+    def getValidators(self, path):
+        """
+        :param path: path to a data set
+        :returns: dictionary with the validator headers the data set was
+        downloaded with, None if unknown or if the record is no longer valid
+        """
+
+        record = self.load(path)
+        if record is None:
+            return None
+        return record.get("validators")
+
+    def getChecksum(self, path):
+        """
+        :param path: path to a data set
+        :returns: string with the digest of the file to record in its sidecar
+        file, None if no checksumType is set
+        """
+
+        if not self.enabled or not self.checksumType or path is None:
+            return None
+        return self.getDigest(path)
+
+    def store(self, path, dataType, memo, checksum = None, validators = None):
+        """
+        Writes the sidecar record of a data set.
+
+        :param path: path to the data set
+        :param dataType: type of the data set, e.g. DataSet.TYPE_RASTER
+        :param memo: dictionary with the metadata to record, JSON serialisable
+        :param checksum: digest of the file computed with checksumType, e.g.
+        by getChecksum; computed here if None and checksumType is set
+        :param validators: dictionary with the validator headers the data set
+        was downloaded with, None if unknown
+        """
+
+        if not self.enabled or path is None:
+            return
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        record = {"version": self.VERSION, "size": stat.st_size, "mtime": stat.st_mtime,
+                  "dataType": dataType, "memo": memo}
+        if validators:
+            record["validators"] = validators
+        if self.checksumType:
+            record["checksumType"] = self.checksumType
+            record["checksum"] = checksum or self.getDigest(path)
+        self.write(path, record)
+
+    def write(self, path, record):
+        """
+        Writes a sidecar file through a temporary file renamed over it.
+
+        :param path: path to the data set
+        :param record: dictionary with the record
+        """
+
+        target = path + self.suffix
+        try:
+            writeAtomic(target, [json.dumps(record)])
+        except (IOError, OSError, TypeError, ValueError) as e:
+            self.logger.warning(self.WARN_01 + target + ": " + str(e))
+
+##########################################################
+
+def decode(value):
+    """
+    :param value: value decoded from JSON
+    :returns: the value with unicode strings encoded as utf-8; lists are kept
+    as lists, like the driver lists compared by DataSet
+    """
+
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if isinstance(value, dict):
+        return dict([(decode(key), decode(item)) for key, item in value.items()])
+    return value
+
+metadataCache = None
+metadataCacheLock = threading.Lock()
+
+def getMetadataCache():
+    """
+    :returns: the MetadataCache object shared by the whole process
+    """
+
+    global metadataCache
+    with metadataCacheLock:
+        if metadataCache is None:
+            metadataCache = MetadataCache()
+            addReloadHook(metadataCache.loadConfigs)
+    return metadataCache
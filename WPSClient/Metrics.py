@@ -0,0 +1,316 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module recording how long each phase of a remote process execution takes:
+submission, time queued on the remote server, time waiting for a worker of
+the JobManager, status polling, output download, output inspection,
+post-processing and map file writing. Counters and latency
+histograms are labelled by phase, process name and server, and exposed in the
+Prometheus text format, either as a file periodically rewritten or through a
+local HTTP endpoint.
+'''
+
+import os, time, atexit, threading, logging
+import BaseHTTPServer
+from contextlib import contextmanager
+from Settings import getSettings, addReloadHook
+
+##########################################################
+
+class Metrics:
+    """
+    Keeps a count and a latency histogram for each combination of phase,
+    process name and server.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False nothing is recorded
+
+    .. attribute:: buckets
+        List with the upper bounds, in seconds, of the histogram buckets
+
+    .. attribute:: textFile
+        Path of the Prometheus text file to write, empty to write no file
+
+    .. attribute:: writeInterval
+        Seconds between two writes of the text file
+
+    .. attribute:: httpAddress
+        Address on which the HTTP endpoint listens
+
+    .. attribute:: httpPort
+        Port of the HTTP endpoint, 0 to start no endpoint
+
+    .. attribute:: series
+        Dictionary mapping (phase, process, server) tuples to lists with the
+        bucket counts, the sum of the durations, the number of observations
+        and the number of failures
+    """
+
+    logger = None
+
+    #Configs
+    enabled       = False
+    buckets       = [0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300]
+    textFile      = ""
+    writeInterval = 15
+    httpAddress   = "127.0.0.1"
+    httpPort      = 0
+
+    series = None
+
+    PREFIX = "wpsclient_phase"
+
+    #Messages
+    ERR_01 = "Failed to write the metrics file: "
+    INFO_01 = "Serving metrics on port "
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+        self.series = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.writer = None
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('Metrics', 'enabled', self.enabled)
+        self.textFile = settings.get('Metrics', 'textFile', self.textFile)
+        self.writeInterval = settings.getfloat('Metrics', 'writeInterval', self.writeInterval)
+        self.httpAddress = settings.get('Metrics', 'httpAddress', self.httpAddress)
+        self.httpPort = settings.getint('Metrics', 'httpPort', self.httpPort)
+        if settings.has('Metrics', 'buckets'):
+            self.buckets = sorted([float(b) for b in settings.get('Metrics', 'buckets').split()])
+
+    def reloadConfigs(self):
+        """
+        Loads the configuration again, used when the configuration file
+        changes. The series recorded so far are reset if the buckets changed.
+        The HTTP endpoint and text file writer keep their initial settings.
+        """
+
+        with self.lock:
+            buckets = self.buckets
+            self.loadConfigs()
+            if self.buckets != buckets:
+                self.series = {}
+
+    def observe(self, phase, seconds, process = None, server = None, failed = False):
+        """
+        Records the duration of one execution of a phase.
+
+        :param phase: string with the name of the phase, e.g. submit or poll
+        :param seconds: duration of the phase
+        :param process: string with the name of the remote process
+        :param server: string with the remote server
+        :param failed: True if the phase ended with an error
+        """
+
+        if not self.enabled:
+            return
+
+        key = (phase, process or "unknown", server or "unknown")
+        with self.lock:
+            entry = self.series.get(key)
+            if entry is None:
+                entry = [[0] * len(self.buckets), 0.0, 0, 0]
+                self.series[key] = entry
+            for i in range(len(self.buckets)):
+                if seconds <= self.buckets[i]:
+                    entry[0][i] += 1
+            entry[1] += seconds
+            entry[2] += 1
+            if failed:
+                entry[3] += 1
+
+    def reset(self):
+        """
+        Discards everything recorded so far.
+        """
+
+        with self.lock:
+            self.series = {}
+
+    def getTotals(self, phase):
+        """
+        :param phase: string with the name of the phase
+        :returns: tuple with the number of executions, the total duration and
+        the number of failures of the phase, over all processes and servers
+        """
+
+        count, seconds, failures = 0, 0.0, 0
+        with self.lock:
+            for key, entry in self.series.items():
+                if key[0] == phase:
+                    count += entry[2]
+                    seconds += entry[1]
+                    failures += entry[3]
+        return count, seconds, failures
+
+    @contextmanager
+    def time(self, phase, process = None, server = None):
+        """
+        Context manager recording the time spent in the enclosed block. An
+        exception leaving the block is counted as a failure and re-raised.
+
+        :param phase: string with the name of the phase
+        :param process: string with the name of the remote process
+        :param server: string with the remote server
+        """
+
+        start = time.time()
+        try:
+            yield
+        except:
+            self.observe(phase, time.time() - start, process, server, True)
+            raise
+        self.observe(phase, time.time() - start, process, server)
+
+    def labels(self, key, extra = ""):
+        """
+        :param key: tuple with the phase, process and server
+        :param extra: string with further labels, already formatted
+        :returns: string with the labels in the Prometheus text format
+        """
+
+        values = []
+        for name, value in zip(("phase", "process", "server"), key):
+            value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            values.append('%s="%s"' % (name, value))
+        if extra:
+            values.append(extra)
+        return "{" + ",".join(values) + "}"
+
+    def render(self):
+        """
+        :returns: string with all the series in the Prometheus text format
+        """
+
+        with self.lock:
+            buckets = list(self.buckets)
+            series = [(key, [list(entry[0])] + entry[1:]) for key, entry in self.series.items()]
+        series.sort()
+
+        lines = []
+        lines.append("# HELP %s_total Number of executions of each phase." % self.PREFIX)
+        lines.append("# TYPE %s_total counter" % self.PREFIX)
+        for key, entry in series:
+            lines.append("%s_total%s %d" % (self.PREFIX, self.labels(key), entry[2]))
+
+        lines.append("# HELP %s_failures_total Number of executions of each phase ending with an error." % self.PREFIX)
+        lines.append("# TYPE %s_failures_total counter" % self.PREFIX)
+        for key, entry in series:
+            lines.append("%s_failures_total%s %d" % (self.PREFIX, self.labels(key), entry[3]))
+
+        lines.append("# HELP %s_seconds Duration of each phase." % self.PREFIX)
+        lines.append("# TYPE %s_seconds histogram" % self.PREFIX)
+        for key, entry in series:
+            for bound, count in zip(buckets, entry[0]):
+                lines.append("%s_seconds_bucket%s %d" % (self.PREFIX, self.labels(key, 'le="%g"' % bound), count))
+            lines.append("%s_seconds_bucket%s %d" % (self.PREFIX, self.labels(key, 'le="+Inf"'), entry[2]))
+            lines.append("%s_seconds_sum%s %f" % (self.PREFIX, self.labels(key), entry[1]))
+            lines.append("%s_seconds_count%s %d" % (self.PREFIX, self.labels(key), entry[2]))
+
+        return "\n".join(lines) + "\n"
+
+    def writeTextFile(self):
+        """
+        Writes the series to textFile, through a temporary file so that a
+        scraper never reads a partial file.
+        """
+
+        if not self.textFile:
+            return
+
+        temp = self.textFile + ".part"
+        try:
+            out = open(temp, 'w')
+            out.write(self.render())
+            out.close()
+            os.rename(temp, self.textFile)
+        except (IOError, OSError) as e:
+            self.logger.error(self.ERR_01 + str(e))
+
+    def start(self):
+        """
+        Starts the thread rewriting the text file and the HTTP endpoint, if
+        configured. Called once, when the shared object is created.
+        """
+
+        if not self.enabled:
+            return
+
+        if self.textFile:
+            self.writer = threading.Thread(target=self.writeLoop, name="MetricsWriter")
+            self.writer.daemon = True
+            self.writer.start()
+            atexit.register(self.writeTextFile)
+
+        if self.httpPort > 0:
+            metrics = self
+
+            class MetricsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+                def do_GET(self):
+                    body = metrics.render()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self.server = BaseHTTPServer.HTTPServer((self.httpAddress, self.httpPort), MetricsHandler)
+            thread = threading.Thread(target=self.server.serve_forever, name="MetricsServer")
+            thread.daemon = True
+            thread.start()
+            self.logger.info(self.INFO_01 + str(self.httpPort))
+
+    def writeLoop(self):
+        while True:
+            time.sleep(self.writeInterval)
+            self.writeTextFile()
+
+##########################################################
+
+metrics = None
+metricsLock = threading.Lock()
+
+def getMetrics():
+    """
+    :returns: the Metrics object shared by the whole process
+    """
+
+    global metrics
+    with metricsLock:
+        if metrics is None:
+            metrics = Metrics()
+            addReloadHook(metrics.reloadConfigs)
+            metrics.start()
+    return metrics
@@ -0,0 +1,226 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module implementing a long running monitor of remote process executions. The
+monitor periodically picks up the unfinished executions recorded in the job
+store that no other running JobManager holds a lease on, whichever process
+recorded them, and hands them to a JobManager that checks their status and
+publishes their outputs. Health and queue depth are served as JSON on a local
+HTTP endpoint. Changes to the configuration file are picked up at the next
+scan by the monitor and the objects shared by the whole process; the number
+of workers, the endpoints and the log file require a restart. On SIGTERM or
+SIGINT the monitor stops taking new work and drains the jobs already queued;
+executions still running remotely stay in the job store and are resumed on
+the next start.
+'''
+
+import time, json, signal, threading, logging
+import BaseHTTPServer
+from Settings import getSettings, reloadSettings
+from JobManager import JobManager
+
+##########################################################
+
+class Monitor:
+    """
+    Keeps a JobManager fed with the unfinished executions of the job store.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: manager
+        JobManager object checking status and generating map files
+
+    .. attribute:: scanInterval
+        Seconds between two scans of the job store
+
+    .. attribute:: purgeAge
+        Age in seconds after which the records of published and failed
+        executions are removed from the job store, 0 to keep them
+
+    .. attribute:: epsg
+        EPSG code used for executions recorded without one
+
+    .. attribute:: httpAddress
+        Address on which the health endpoint listens
+
+    .. attribute:: httpPort
+        Port of the health endpoint, 0 to start no endpoint
+
+    .. attribute:: started
+        Time at which the monitor was started
+    """
+
+    logger = None
+    manager = None
+
+    #Configs
+    scanInterval = 30
+    purgeAge     = 604800
+    epsg         = None
+    httpAddress  = "127.0.0.1"
+    httpPort     = 8090
+
+    started = None
+
+    #Messages
+    ERR_01  = "Failed to scan the job store: "
+    INFO_01 = "Monitor started."
+    INFO_02 = "Stopping the monitor, draining queued jobs..."
+    INFO_03 = "Monitor stopped."
+    INFO_04 = "Serving health information on port "
+    INFO_05 = "Configuration file changed, settings reloaded."
+
+    def __init__(self, manager = None):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+        if manager is None:
+            manager = JobManager()
+        self.manager = manager
+
+        self.stopping = threading.Event()
+        self.server = None
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.scanInterval = settings.getfloat('Monitor', 'scanInterval', self.scanInterval)
+        self.purgeAge = settings.getfloat('Monitor', 'purgeAge', self.purgeAge)
+        self.epsg = settings.get('Monitor', 'epsg', self.epsg) or None
+        self.httpAddress = settings.get('Monitor', 'httpAddress', self.httpAddress)
+        self.httpPort = settings.getint('Monitor', 'httpPort', self.httpPort)
+
+    def run(self):
+        """
+        Runs the monitor until SIGTERM or SIGINT is received. Must be called
+        from the main thread, where the signal handlers are installed.
+        """
+
+        signal.signal(signal.SIGTERM, self.handleSignal)
+        signal.signal(signal.SIGINT, self.handleSignal)
+
+        self.start()
+        try:
+            while not self.stopping.is_set():
+                self.scan()
+                self.stopping.wait(self.scanInterval)
+        finally:
+            self.shutdown()
+
+    def handleSignal(self, signum, frame):
+        self.stop()
+
+    def stop(self):
+        """
+        Requests the monitor to stop, the loop in run() then shuts it down.
+        """
+
+        self.stopping.set()
+
+    def start(self):
+        """
+        Starts the JobManager and the health endpoint.
+        """
+
+        self.started = time.time()
+        self.manager.start()
+
+        if self.httpPort > 0:
+            self.server = BaseHTTPServer.HTTPServer(
+                (self.httpAddress, self.httpPort), self.createHandler())
+            thread = threading.Thread(target=self.server.serve_forever, name="MonitorHealth")
+            thread.daemon = True
+            thread.start()
+            self.logger.info(self.INFO_04 + str(self.httpPort))
+
+        self.logger.info(self.INFO_01)
+
+    def scan(self):
+        """
+        Reloads the settings if the configuration file changed, adds the new
+        unfinished executions of the job store to the manager, drops finished
+        jobs from memory and purges old records.
+        """
+
+        try:
+            if reloadSettings():
+                self.loadConfigs()
+                self.logger.info(self.INFO_05)
+            self.manager.resume(self.epsg)
+            self.manager.forget()
+            if self.purgeAge > 0:
+                self.manager.store.purge(self.purgeAge)
+        except Exception as e:
+            self.logger.error(self.ERR_01 + str(e))
+
+    def shutdown(self):
+        """
+        Stops the health endpoint and the JobManager, waiting for the jobs
+        already queued to be processed.
+        """
+
+        self.logger.info(self.INFO_02)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.manager.stop()
+        self.logger.info(self.INFO_03)
+
+    def getHealth(self):
+        """
+        :returns: dictionary with the health and queue depth information
+        """
+
+        health = self.manager.getQueueDepths()
+        health["status"] = "stopping" if self.stopping.is_set() else "ok"
+        health["uptime"] = time.time() - self.started
+        if self.manager.store.enabled:
+            health["stored"] = dict([(str(state), count) for state, count
+                                     in self.manager.store.countByState().items()])
+        return health
+
+    def createHandler(self):
+        """
+        :returns: request handler class answering GET requests with the
+        health information as JSON
+        """
+
+        monitor = self
+
+        class HealthHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                health = monitor.getHealth()
+                body = json.dumps(health)
+                self.send_response(200 if health["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return HealthHandler
@@ -0,0 +1,142 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module deciding how long to wait between two status checks of a remote
+process. The interval grows exponentially while the process runs, but is
+shortened when the progress reported by the server indicates the process is
+about to finish.
+'''
+
+import time
+from Settings import getSettings
+
+##########################################################
+
+class PollScheduler:
+    """
+    Computes the interval until the next status check of a single remote
+    process, from the progress (percentCompleted) observed so far.
+
+    .. attribute:: minInterval
+        Shortest interval between two status checks, in seconds
+
+    .. attribute:: maxInterval
+        Longest interval between two status checks, in seconds
+
+    .. attribute:: backoffFactor
+        Factor by which the interval grows after each status check
+
+    .. attribute:: approachFactor
+        Fraction of the estimated remaining time to wait before the next
+        status check
+
+    .. attribute:: interval
+        Last interval computed, None before the first status check
+
+    .. attribute:: firstTime
+        Time of the first progress observation
+
+    .. attribute:: firstPercent
+        Progress reported at the first observation
+    """
+
+    #Configs
+    minInterval    = 2
+    maxInterval    = 300
+    backoffFactor  = 1.5
+    approachFactor = 0.5
+
+    interval     = None
+    firstTime    = None
+    firstPercent = None
+
+    def __init__(self, minInterval = None, maxInterval = None, backoffFactor = None):
+
+        self.loadConfigs()
+
+        if minInterval is not None:
+            self.minInterval = minInterval
+        if maxInterval is not None:
+            self.maxInterval = maxInterval
+        if backoffFactor is not None:
+            self.backoffFactor = backoffFactor
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.minInterval = settings.getfloat('Polling', 'minInterval', self.minInterval)
+        self.maxInterval = settings.getfloat('Polling', 'maxInterval', self.maxInterval)
+        self.backoffFactor = settings.getfloat('Polling', 'backoffFactor', self.backoffFactor)
+        self.approachFactor = settings.getfloat('Polling', 'approachFactor', self.approachFactor)
+
+    def nextInterval(self, percentCompleted = None, now = None):
+        """
+        Records a progress observation and computes the time to wait until the
+        next status check. Without a useful progress estimate the previous
+        interval is multiplied by backoffFactor; otherwise the interval is
+        capped at approachFactor times the estimated remaining time.
+
+        :param percentCompleted: progress reported by the server, None if unknown
+        :param now: time of the observation, defaults to the current time
+        :returns: seconds to wait, between minInterval and maxInterval
+        """
+
+        if now is None:
+            now = time.time()
+
+        if self.interval is None:
+            interval = self.minInterval
+        else:
+            interval = self.interval * self.backoffFactor
+
+        remaining = self.estimateRemaining(percentCompleted, now)
+        if remaining is not None:
+            interval = min(interval, remaining * self.approachFactor)
+
+        self.interval = max(self.minInterval, min(self.maxInterval, interval))
+        return self.interval
+
+    def estimateRemaining(self, percentCompleted, now):
+        """
+        Estimates the time the process still needs to finish, assuming a
+        constant progress rate since the first observation.
+
+        :param percentCompleted: progress reported by the server
+        :param now: time of the observation
+        :returns: estimated seconds to completion, None if no estimate is possible
+        """
+
+        try:
+            percent = float(percentCompleted)
+        except (TypeError, ValueError):
+            return None
+
+        if self.firstTime is None or percent < self.firstPercent:
+            self.firstTime = now
+            self.firstPercent = percent
+            return None
+
+        progress = percent - self.firstPercent
+        if progress <= 0 or percent >= 100:
+            return None
+
+        return (now - self.firstTime) * (100 - percent) / progress
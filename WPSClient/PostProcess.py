@@ -0,0 +1,532 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module preparing downloaded outputs for publication with MapServer. Each stage
+takes a DataSet and optimises the file it wraps for map requests, e.g. by
+building overviews for raster data sets, rewriting rasters as Cloud Optimized
+GeoTIFFs or converting vector data sets to a spatially indexed format.
+'''
+
+import os, shutil, threading, logging
+from Settings import getSettings, addReloadHook
+from osgeo import gdal
+from osgeo import ogr
+from DataSet import DataSet
+from MetadataCache import getMetadataCache
+
+##########################################################
+
+class OverviewBuilder:
+    """
+    Builds overviews (reduced resolution copies) for raster data sets, so
+    that MapServer does not resample the full resolution raster when serving
+    zoomed out maps.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False no overviews are built
+
+    .. attribute:: resampling
+        Resampling method, e.g. NEAREST, AVERAGE or CUBIC
+
+    .. attribute:: levels
+        List of integer decimation factors, e.g. [2, 4, 8, 16]
+
+    .. attribute:: minSize
+        Rasters whose width and height are both under this number of pixels
+        are left as they are
+
+    .. attribute:: external
+        If True overviews are written to an external .ovr file, otherwise
+        inside the raster file
+
+    .. attribute:: threads
+        Value of GDAL_NUM_THREADS used when computing the overviews
+    """
+
+    logger = None
+
+    #Configs
+    enabled    = False
+    resampling = "AVERAGE"
+    levels     = [2, 4, 8, 16, 32]
+    minSize    = 2048
+    external   = False
+    threads    = "ALL_CPUS"
+
+    #Messages
+    ERR_01  = "Failed to build overviews for "
+    INFO_01 = "Built overviews %s for "
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('PostProcess', 'buildOverviews', self.enabled)
+        self.resampling = settings.get('PostProcess', 'overviewResampling', self.resampling)
+        if settings.has('PostProcess', 'overviewLevels'):
+            self.levels = [int(l) for l in settings.get('PostProcess', 'overviewLevels').split()]
+        self.minSize = settings.getint('PostProcess', 'overviewMinSize', self.minSize)
+        self.external = settings.getboolean('PostProcess', 'overviewExternal', self.external)
+        self.threads = settings.get('PostProcess', 'gdalThreads', self.threads)
+
+    def getLevels(self, width, height):
+        """
+        :param width: raster width in pixels
+        :param height: raster height in pixels
+        :returns: list with the configured levels producing overviews of at
+        least one block of 256 pixels
+        """
+        return [l for l in self.levels if max(width, height) / l >= 256]
+
+    def run(self, dataSet):
+        """
+        Builds the overviews of a raster data set. Vector and literal data
+        sets, rasters smaller than minSize and rasters that already have
+        overviews, e.g. when an output is published again, are ignored.
+
+        :param dataSet: DataSet object
+        :returns: True if overviews were built
+        """
+
+        if not self.enabled or dataSet.dataType != dataSet.TYPE_RASTER:
+            return False
+
+        width = dataSet.dataSet.RasterXSize
+        height = dataSet.dataSet.RasterYSize
+        if width < self.minSize and height < self.minSize:
+            return False
+
+        levels = self.getLevels(width, height)
+        if len(levels) == 0 or dataSet.dataSet.GetRasterBand(1).GetOverviewCount() > 0:
+            return False
+
+        # The read-only handle is closed before the file is opened again, it
+        # is reopened by the DataSet on its next use
+        dataSet.handle = None
+
+        # Internal overviews need the file opened for update, external ones
+        # are written to a .ovr file when the file is opened read-only
+        if self.external:
+            mode = gdal.GA_ReadOnly
+        else:
+            mode = gdal.GA_Update
+
+        previous = gdal.GetThreadLocalConfigOption('GDAL_NUM_THREADS', None)
+        gdal.SetThreadLocalConfigOption('GDAL_NUM_THREADS', self.threads)
+        try:
+            handle = gdal.Open(dataSet.path, mode)
+            if handle is None or handle.BuildOverviews(self.resampling, levels) != 0:
+                self.logger.warning(self.ERR_01 + dataSet.path)
+                return False
+            handle = None
+        finally:
+            gdal.SetThreadLocalConfigOption('GDAL_NUM_THREADS', previous)
+
+        self.logger.debug(self.INFO_01 % str(levels) + dataSet.path)
+        return True
+
+##########################################################
+
+class COGConverter:
+    """
+    Rewrites raster data sets as tiled and compressed Cloud Optimized GeoTIFFs
+    with internal overviews. With GDAL versions lacking the COG driver a
+    tiled, compressed GeoTIFF with internal overviews is written instead.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False raster data sets are published as they are
+
+    .. attribute:: compression
+        Compression method, e.g. DEFLATE, LZW, ZSTD or JPEG
+
+    .. attribute:: blockSize
+        Width and height of the tiles in pixels
+
+    .. attribute:: resampling
+        Resampling method used for the overviews
+
+    .. attribute:: threads
+        Number of threads used for compression, e.g. ALL_CPUS
+    """
+
+    logger = None
+
+    #Configs
+    enabled     = False
+    compression = "DEFLATE"
+    blockSize   = 512
+    resampling  = "AVERAGE"
+    threads     = "ALL_CPUS"
+
+    #Messages
+    ERR_01  = "Failed to convert raster data set "
+    INFO_01 = "Converted raster data set to "
+
+    TEMP_SUFFIX = ".part"
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('PostProcess', 'convertCOG', self.enabled)
+        self.compression = settings.get('PostProcess', 'cogCompression', self.compression)
+        self.blockSize = settings.getint('PostProcess', 'cogBlockSize', self.blockSize)
+        self.resampling = settings.get('PostProcess', 'overviewResampling', self.resampling)
+        self.threads = settings.get('PostProcess', 'gdalThreads', self.threads)
+
+    def run(self, dataSet):
+        """
+        Converts a raster data set. Vector and literal data sets are ignored.
+        The converted file replaces the original output.
+
+        :param dataSet: DataSet object
+        :returns: DataSet object wrapping the converted file, or the original
+        DataSet object if no conversion took place
+        """
+
+        if not self.enabled or dataSet.dataType != dataSet.TYPE_RASTER:
+            return dataSet
+
+        target = os.path.splitext(dataSet.path)[0] + ".tif"
+        temp = target + self.TEMP_SUFFIX
+        try:
+            if gdal.GetDriverByName('COG') is not None:
+                self.translateCOG(dataSet.dataSet, temp)
+            else:
+                self.translateGTiff(dataSet.dataSet, temp)
+        except Exception as e:
+            self.logger.error(self.ERR_01 + dataSet.path + ": " + str(e))
+            if os.path.exists(temp):
+                os.remove(temp)
+            return dataSet
+
+        os.rename(temp, target)
+        if target != dataSet.path:
+            dataSet.handle = None
+            removeSource(dataSet.path)
+
+        self.logger.debug(self.INFO_01 + target)
+        return DataSet(target, dataSet.name, dataSet.uniqueID, "image/tiff")
+
+    def translateCOG(self, source, path):
+        """
+        Writes a raster with the COG driver (GDAL 3.1 or later).
+
+        :param source: GDAL data set to convert
+        :param path: string with the path of the file to write
+        """
+
+        options = gdal.TranslateOptions(format='COG', creationOptions=[
+            'COMPRESS=' + self.compression,
+            'BLOCKSIZE=%d' % self.blockSize,
+            'OVERVIEW_RESAMPLING=' + self.resampling,
+            'NUM_THREADS=' + self.threads,
+            'BIGTIFF=IF_SAFER'])
+        if gdal.Translate(path, source, options=options) is None:
+            raise Exception(gdal.GetLastErrorMsg())
+
+    def translateGTiff(self, source, path):
+        """
+        Writes a tiled, compressed GeoTIFF with internal overviews, for GDAL
+        versions without the COG driver.
+
+        :param source: GDAL data set to convert
+        :param path: string with the path of the file to write
+        """
+
+        options = gdal.TranslateOptions(format='GTiff', creationOptions=[
+            'TILED=YES',
+            'COMPRESS=' + self.compression,
+            'BLOCKXSIZE=%d' % self.blockSize,
+            'BLOCKYSIZE=%d' % self.blockSize,
+            'NUM_THREADS=' + self.threads,
+            'BIGTIFF=IF_SAFER'])
+        handle = gdal.Translate(path, source, options=options)
+        if handle is None:
+            raise Exception(gdal.GetLastErrorMsg())
+
+        levels = []
+        factor = 2
+        while max(handle.RasterXSize, handle.RasterYSize) / factor >= self.blockSize:
+            levels.append(factor)
+            factor *= 2
+        if len(levels) > 0:
+            previous = gdal.GetThreadLocalConfigOption('COMPRESS_OVERVIEW', None)
+            gdal.SetThreadLocalConfigOption('COMPRESS_OVERVIEW', self.compression)
+            try:
+                handle.BuildOverviews(self.resampling, levels)
+            finally:
+                gdal.SetThreadLocalConfigOption('COMPRESS_OVERVIEW', previous)
+        handle = None
+
+##########################################################
+
+class VectorConverter:
+    """
+    Converts vector data sets (typically GML) to a format with a spatial
+    index, so that MapServer does not parse the whole file on every request.
+    Features are streamed from the source to the target in transactions of
+    batchSize features.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False vector data sets are published as they are
+
+    .. attribute:: format
+        OGR driver of the target format: "ESRI Shapefile" or "GPKG"
+
+    .. attribute:: batchSize
+        Number of features written per transaction
+    """
+
+    logger = None
+
+    #Configs
+    enabled   = False
+    format    = "ESRI Shapefile"
+    batchSize = 10000
+
+    EXTENSIONS = {"ESRI Shapefile": ".shp", "GPKG": ".gpkg"}
+
+    #Messages
+    ERR_01  = "Failed to convert vector data set "
+    ERR_02  = "OGR driver not available: "
+    ERR_03  = "Could not create data source "
+    ERR_04  = "Failed to write feature %d"
+    INFO_01 = "Converted %d features to "
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('PostProcess', 'convertVectors', self.enabled)
+        self.format = settings.get('PostProcess', 'vectorFormat', self.format)
+        self.batchSize = settings.getint('PostProcess', 'vectorBatchSize', self.batchSize)
+
+    def run(self, dataSet):
+        """
+        Converts the first layer of a vector data set. Raster and literal data
+        sets are ignored, as well as data sets already in the target format.
+        The converted files replace the original output, as for rasters.
+
+        :param dataSet: DataSet object
+        :returns: DataSet object wrapping the converted file, or the original
+        DataSet object if no conversion took place
+        """
+
+        if not self.enabled or dataSet.dataType != dataSet.TYPE_VECTOR:
+            return dataSet
+
+        extension = self.EXTENSIONS.get(self.format, "")
+        base = os.path.splitext(dataSet.path)[0]
+        target = base + extension
+        if target == dataSet.path:
+            return dataSet
+
+        # The target is written in a temporary folder, whose files are then
+        # moved next to the source; the main file is moved last
+        tempDir = base + ".part"
+        if os.path.isdir(tempDir):
+            shutil.rmtree(tempDir)
+        os.mkdir(tempDir)
+        try:
+            count = self.convert(dataSet.dataSet.GetLayer(), os.path.join(tempDir, os.path.basename(target)))
+            mainFile = os.path.basename(target)
+            for name in sorted(os.listdir(tempDir), key=lambda n: n == mainFile):
+                os.rename(os.path.join(tempDir, name), os.path.join(os.path.dirname(target), name))
+        except Exception as e:
+            self.logger.error(self.ERR_01 + dataSet.path + ": " + str(e))
+            return dataSet
+        finally:
+            shutil.rmtree(tempDir, True)
+
+        dataSet.handle = None
+        removeSource(dataSet.path, [".gfs"])
+
+        self.logger.debug(self.INFO_01 % count + target)
+        return DataSet(target, dataSet.name, dataSet.uniqueID)
+
+    def convert(self, source, path):
+        """
+        Streams the features of an OGR layer into a new data source.
+
+        :param source: OGR layer to convert
+        :param path: string with the path of the data source to create
+        :returns: number of features written
+        """
+
+        driver = ogr.GetDriverByName(self.format)
+        if driver is None:
+            raise Exception(self.ERR_02 + self.format)
+
+        target = driver.CreateDataSource(path)
+        if target is None:
+            raise Exception(self.ERR_03 + path)
+
+        layer = target.CreateLayer(
+            os.path.splitext(os.path.basename(path))[0],
+            source.GetSpatialRef(),
+            source.GetGeomType())
+
+        sourceDefn = source.GetLayerDefn()
+        for i in range(sourceDefn.GetFieldCount()):
+            layer.CreateField(sourceDefn.GetFieldDefn(i))
+        # Fields are mapped by position, some formats truncate field names
+        fieldMap = range(sourceDefn.GetFieldCount())
+        targetDefn = layer.GetLayerDefn()
+
+        count = 0
+        source.ResetReading()
+        layer.StartTransaction()
+        feature = source.GetNextFeature()
+        while feature is not None:
+            newFeature = ogr.Feature(targetDefn)
+            newFeature.SetFromWithMap(feature, 1, fieldMap)
+            if layer.CreateFeature(newFeature) != 0:
+                raise Exception(self.ERR_04 % count)
+            count += 1
+            if count % self.batchSize == 0:
+                layer.CommitTransaction()
+                layer.StartTransaction()
+            feature = source.GetNextFeature()
+        layer.CommitTransaction()
+
+        # GeoPackage layers are indexed on creation, shapefiles need a .qix
+        if self.format == "ESRI Shapefile":
+            target.ExecuteSQL("CREATE SPATIAL INDEX ON " + layer.GetName())
+
+        layer = None
+        target = None
+        return count
+
+##########################################################
+
+class PostProcessor:
+    """
+    Runs the configured post-processing stages on downloaded outputs.
+
+    .. attribute:: overviewBuilder
+        OverviewBuilder object applied to raster data sets
+
+    .. attribute:: cogConverter
+        COGConverter object applied to raster data sets
+
+    .. attribute:: vectorConverter
+        VectorConverter object applied to vector data sets
+    """
+
+    overviewBuilder = None
+    cogConverter    = None
+    vectorConverter = None
+
+    def __init__(self):
+
+        self.overviewBuilder = OverviewBuilder()
+        self.cogConverter = COGConverter()
+        self.vectorConverter = VectorConverter()
+
+    def loadConfigs(self):
+        """
+        Loads the configuration of every stage again.
+        """
+
+        self.overviewBuilder.loadConfigs()
+        self.cogConverter.loadConfigs()
+        self.vectorConverter.loadConfigs()
+
+    def run(self, dataSet):
+        """
+        Applies every stage to a data set.
+
+        :param dataSet: DataSet object
+        :returns: the DataSet object to publish
+        """
+
+        # Converted rasters already carry internal overviews
+        converted = self.cogConverter.run(dataSet)
+        if converted is dataSet:
+            self.overviewBuilder.run(dataSet)
+        return self.vectorConverter.run(converted)
+
+##########################################################
+
+def removeSource(path, extensions = []):
+    """
+    Deletes an output replaced by a converted file, with its sidecar metadata
+    file and the files next to it with the given extensions, e.g. the .gfs
+    file of a GML output.
+
+    :param path: string with the path of the output
+    :param extensions: list of strings with the extensions of the files
+    accompanying the output
+    """
+
+    paths = [path, path + getMetadataCache().suffix]
+    paths += [os.path.splitext(path)[0] + extension for extension in extensions]
+    for name in paths:
+        try:
+            os.remove(name)
+        except OSError:
+            pass
+
+postProcessor = None
+postProcessorLock = threading.Lock()
+
+def getPostProcessor():
+    """
+    :returns: the PostProcessor object shared by the whole process
+    """
+
+    global postProcessor
+    with postProcessorLock:
+        if postProcessor is None:
+            postProcessor = PostProcessor()
+            addReloadHook(postProcessor.loadConfigs)
+    return postProcessor
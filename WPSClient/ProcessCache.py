@@ -0,0 +1,241 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module caching the GetCapabilities and DescribeProcess documents of remote
+WPS servers on disk. The cached descriptions allow requests to be checked
+locally before they are sent to the server. The parsed descriptions are also
+kept in memory while the documents on disk do not change.
+'''
+
+import os, time, hashlib, threading, logging
+from Settings import getSettings, addReloadHook
+from owslib.wps import WebProcessingService
+from HTTPPool import getPool
+
+##########################################################
+
+class ProcessCache:
+    """
+    Keeps GetCapabilities and DescribeProcess documents on disk for a limited
+    time, fetching them from the server when missing or expired.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False requests are not validated before being sent
+
+    .. attribute:: path
+        Folder where the documents are stored
+
+    .. attribute:: ttl
+        Number of seconds a document is kept before being fetched again
+
+    .. attribute:: parsed
+        Dictionary mapping request URLs to tuples with the modification time
+        of the document on disk and the object parsed from it
+    """
+
+    logger = None
+
+    #Configs
+    enabled = True
+    path    = "/tmp/WPSClient/processes/"
+    ttl     = 86400
+
+    parsed = None
+
+    TEMP_SUFFIX = ".part"
+
+    # Seconds during which a document just fetched is not fetched again, even
+    # when a refresh is requested
+    MIN_AGE = 5
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+        self.parsed = {}
+        self.lock = threading.Lock()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('Cache', 'validateRequests', self.enabled)
+        self.path = settings.get('Cache', 'processCachePath', self.path)
+        self.ttl = settings.getint('Cache', 'processCacheTTL', self.ttl)
+
+    def buildURL(self, serverAddress, request, identifier = None):
+        """
+        :param serverAddress: string with the address of the remote WPS server
+        :param request: string with the WPS request, e.g. DescribeProcess
+        :param identifier: string with the process identifier, if needed
+        :returns: string with the key-value pair URL of the request
+        """
+
+        url = serverAddress
+        if "?" not in url:
+            url += "?"
+        elif not (url.endswith("?") or url.endswith("&")):
+            url += "&"
+        url += "service=WPS&version=1.0.0&request=" + request
+        if identifier is not None:
+            url += "&identifier=" + identifier
+        return url
+
+    def getFileName(self, url):
+        """
+        :param url: string with the request URL
+        :returns: string with the path of the cached document
+        """
+
+        return os.path.join(self.path, hashlib.md5(url).hexdigest() + ".xml")
+
+    def getAge(self, fileName):
+        """
+        :param fileName: string with the path of a cached document
+        :returns: tuple with the modification time and the age in seconds of
+        the document, (None, None) if it is absent
+        """
+
+        try:
+            mtime = os.path.getmtime(fileName)
+        except OSError:
+            return (None, None)
+        return (mtime, time.time() - mtime)
+
+    def getDocument(self, url, refresh = False):
+        """
+        Returns a document from the cache, fetching it from the server if
+        absent or older than ttl.
+
+        :param url: string with the request URL
+        :param refresh: if True the document is fetched again regardless of
+        ttl, unless it was fetched less than MIN_AGE seconds ago
+        :returns: string with the XML document
+        """
+
+        fileName = self.getFileName(url)
+        age = self.getAge(fileName)[1]
+        if refresh:
+            limit = self.MIN_AGE
+        else:
+            limit = self.ttl
+
+        if age is not None and age < limit:
+            cached = open(fileName, 'rb')
+            content = cached.read()
+            cached.close()
+            return content
+
+        response = getPool().get(url)
+        response.raise_for_status()
+        content = response.content
+
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                # Created meanwhile by another thread
+                pass
+        temp = fileName + "." + str(threading.current_thread().ident) + self.TEMP_SUFFIX
+        out = open(temp, 'wb')
+        out.write(content)
+        out.close()
+        os.rename(temp, fileName)
+
+        return content
+
+    def getParsed(self, url, parse, refresh = False):
+        """
+        Returns the object parsed from a document, kept in memory while the
+        document on disk is neither replaced nor expired.
+
+        :param url: string with the request URL
+        :param parse: function building the object from the XML document
+        :param refresh: if True the document is fetched again, see getDocument
+        :returns: the object parsed
+        """
+
+        fileName = self.getFileName(url)
+        if not refresh:
+            mtime, age = self.getAge(fileName)
+            if age is not None and age < self.ttl:
+                with self.lock:
+                    entry = self.parsed.get(url)
+                if entry is not None and entry[0] == mtime:
+                    return entry[1]
+
+        content = self.getDocument(url, refresh)
+        result = parse(content)
+        with self.lock:
+            self.parsed[url] = (self.getAge(fileName)[0], result)
+        return result
+
+    def getProcessIdentifiers(self, serverAddress, refresh = False):
+        """
+        :param serverAddress: string with the address of the remote WPS server
+        :param refresh: if True the capabilities are fetched again, e.g. to
+        look for a process deployed after they were cached
+        :returns: list with the identifiers of the processes offered by the server
+        """
+
+        def parse(content):
+            wps = WebProcessingService(serverAddress, verbose=False, skip_caps=True)
+            wps.getcapabilities(xml=content)
+            return [process.identifier for process in wps.processes]
+
+        return self.getParsed(self.buildURL(serverAddress, "GetCapabilities"), parse, refresh)
+
+    def describeProcess(self, serverAddress, identifier, refresh = False):
+        """
+        :param serverAddress: string with the address of the remote WPS server
+        :param identifier: string with the process identifier
+        :param refresh: if True the description is fetched again, e.g. to look
+        for an input added after it was cached
+        :returns: OWSLib Process object describing the inputs and outputs,
+        shared by the callers and not to be modified
+        """
+
+        def parse(content):
+            wps = WebProcessingService(serverAddress, verbose=False, skip_caps=True)
+            return wps.describeprocess(identifier, xml=content)
+
+        return self.getParsed(self.buildURL(serverAddress, "DescribeProcess", identifier),
+                              parse, refresh)
+
+##########################################################
+
+cache = None
+cacheLock = threading.Lock()
+
+def getProcessCache():
+    """
+    :returns: the ProcessCache object shared by the whole process
+    """
+
+    global cache
+    with cacheLock:
+        if cache is None:
+            cache = ProcessCache()
+            addReloadHook(cache.loadConfigs)
+    return cache
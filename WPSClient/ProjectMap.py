@@ -0,0 +1,343 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module maintaining a long-lived map file per project, publishing the layers
+of many executions. Each layer is kept in its own snippet file, INCLUDEd by
+the project map file; appending the layers of a new execution writes their
+snippets and adds INCLUDE lines, without regenerating the existing layers.
+Every file is written to a temporary file and renamed, so MapServer never
+reads a partial map file, and concurrent writers are serialised with a lock
+file.
+'''
+
+import os, fcntl, logging
+from contextlib import contextmanager
+import MapText
+from AtomicFile import writeAtomic
+
+##########################################################
+
+class ProjectMap:
+    """
+    Map file of a project, named <project>.map, with the layer snippets in
+    the <project>.layers folder next to it.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: name
+        Name of the project
+
+    .. attribute:: path
+        Path to the project map file
+
+    .. attribute:: layersFolder
+        Name of the folder with the layer snippets, relative to the folder of
+        the project map file as INCLUDE paths are resolved by MapServer
+    """
+
+    logger = None
+
+    name = None
+    path = None
+    layersFolder = None
+
+    #Messages
+    ERR_01  = "No MAP block found in map file: "
+    INFO_01 = "Appended layers to project map file %s: %s"
+    INFO_02 = "Removed layers from project map file %s: %s"
+
+    def __init__(self, name, folder):
+
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.path = os.path.join(folder, name + ".map")
+        self.layersFolder = name + ".layers"
+
+    def filePath(self):
+        """
+        :returns: string with the path to the project map file
+        """
+
+        return self.path
+
+    @contextmanager
+    def locked(self):
+        """
+        Holds an exclusive lock on the project map file, shared by threads
+        and processes.
+        """
+
+        handle = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+    def readLines(self, path):
+        """
+        :param path: path to a map file
+        :returns: list with the lines of the file, each ending with a newline,
+        None if it does not exist
+        """
+
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            lines = f.readlines()
+        if len(lines) > 0 and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+        return lines
+
+    def findMap(self, lines, path):
+        """
+        :param lines: list with the lines of a map file
+        :param path: path to the map file, for error messages
+        :returns: Block object of the MAP block
+        """
+
+        blocks = MapText.parse(lines).find("MAP")
+        if len(blocks) == 0 or blocks[0].end is None:
+            raise Exception(self.ERR_01 + path)
+        return blocks[0]
+
+    def getIncludes(self, lines, mapBlock):
+        """
+        :param lines: list with the lines of the project map file
+        :param mapBlock: Block object of the MAP block
+        :returns: list of pairs with the line index and the path of the layer
+        snippets included
+        """
+
+        includes = []
+        for index in range(mapBlock.start + 1, mapBlock.end):
+            tokens = MapText.tokenize(lines[index])
+            if len(tokens) == 2 and tokens[0].upper() == "INCLUDE":
+                target = MapText.unquote(tokens[1])
+                if target.startswith(self.layersFolder + "/"):
+                    includes.append((index, target))
+        return includes
+
+    def createHeader(self, lines, mapBlock):
+        """
+        Builds the project map file from the map file of an execution, keeping
+        everything but its layers, named and titled after the project.
+
+        :param lines: list with the lines of the execution map file
+        :param mapBlock: Block object of the MAP block
+        :returns: list with the lines of the project map file
+        """
+
+        skipped = set()
+        for layer in mapBlock.find("LAYER"):
+            skipped.update(range(layer.start, layer.end + 1))
+
+        header = [lines[index] for index in range(mapBlock.end + 1) if index not in skipped]
+        mapBlock = self.findMap(header, self.path)
+        MapText.setValue(header, mapBlock, "NAME", self.name)
+        for web in mapBlock.find("WEB"):
+            for metadata in web.find("METADATA"):
+                for key in ["wms_title", "ows_title"]:
+                    MapText.setMetadata(header, metadata, key, self.name)
+        return header
+
+    def readExtent(self, lines, block):
+        """
+        :param lines: list with the lines of a map file
+        :param block: Block object of a MAP or LAYER block
+        :returns: list with the four floats of the EXTENT of the block, None
+        if absent or invalid
+        """
+
+        values = MapText.getValues(lines, block, "EXTENT")
+        try:
+            extent = [float(value) for value in values]
+        except (TypeError, ValueError):
+            return None
+        if len(extent) != 4:
+            return None
+        return extent
+
+    def writeExtent(self, lines, mapBlock, extents):
+        """
+        Sets the EXTENT of the project map file to the union of a list of
+        extents.
+
+        :param lines: list with the lines of the project map file, modified
+        in place
+        :param mapBlock: Block object of its MAP block
+        :param extents: list of lists with the four floats of each extent
+        """
+
+        extent = [min([e[0] for e in extents]), min([e[1] for e in extents]),
+                  max([e[2] for e in extents]), max([e[3] for e in extents])]
+        MapText.setValues(lines, mapBlock, "EXTENT", [repr(value) for value in extent])
+
+    def mergeExtent(self, lines, mapBlock, other, otherBlock):
+        """
+        Enlarges the EXTENT of the project map file to cover the EXTENT of an
+        execution map file.
+
+        :param lines: list with the lines of the project map file, modified
+        in place
+        :param mapBlock: Block object of its MAP block
+        :param other: list with the lines of the execution map file
+        :param otherBlock: Block object of its MAP block
+        """
+
+        current = self.readExtent(lines, mapBlock)
+        added = self.readExtent(other, otherBlock)
+        if current is not None and added is not None:
+            self.writeExtent(lines, mapBlock, [current, added])
+
+    def shrinkExtent(self, lines, mapBlock):
+        """
+        Reduces the EXTENT of the project map file to the union of the EXTENT
+        of the layers still included. Left as it is if no layer remains or a
+        layer has no EXTENT of its own.
+
+        :param lines: list with the lines of the project map file, modified
+        in place
+        :param mapBlock: Block object of its MAP block
+        """
+
+        extents = []
+        for index, target in self.getIncludes(lines, mapBlock):
+            snippet = self.readLines(os.path.join(os.path.dirname(self.path), target))
+            extent = None
+            if snippet is not None and len(snippet) > 0:
+                extent = self.readExtent(snippet, MapText.parse(snippet).children[0])
+            if extent is None:
+                return
+            extents.append(extent)
+
+        if len(extents) > 0 and self.readExtent(lines, mapBlock) is not None:
+            self.writeExtent(lines, mapBlock, extents)
+
+    def addLayers(self, processId, mapFile):
+        """
+        Appends the layers of the map file of an execution to the project map
+        file, creating it if needed. Layers are renamed <processId>_<name> to
+        keep their names unique within the project, layers without a name
+        being named after their position, e.g. <processId>_layer1. Layers
+        without an EXTENT get the one of the execution map file, so that the
+        project EXTENT can be reduced again when layers are removed.
+
+        :param processId: string with the identifier of the remote process
+        :param mapFile: path to the map file generated for the execution
+        :returns: list with the names of the layers added
+        """
+
+        source = self.readLines(mapFile)
+        sourceMap = self.findMap(source, mapFile)
+
+        folder = os.path.join(os.path.dirname(self.path), self.layersFolder)
+        if not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                if not os.path.isdir(folder):
+                    raise
+
+        names = []
+        with self.locked():
+            lines = self.readLines(self.path)
+            if lines is None:
+                lines = self.createHeader(source, sourceMap)
+            else:
+                self.mergeExtent(lines, self.findMap(lines, self.path), source, sourceMap)
+
+            mapBlock = self.findMap(lines, self.path)
+            included = set([target for index, target in self.getIncludes(lines, mapBlock)])
+            new = []
+
+            extent = self.readExtent(source, sourceMap)
+            layers = sourceMap.find("LAYER")
+            for position in range(len(layers)):
+                layer = layers[position]
+                snippet = source[layer.start:layer.end + 1]
+                block = MapText.parse(snippet).children[0]
+                name = MapText.getValue(snippet, block, "NAME")
+                if name is None:
+                    name = "layer%d" % (position + 1)
+                    MapText.insertValues(snippet, block, "NAME", ['""'])
+                    block = MapText.parse(snippet).children[0]
+                name = "%s_%s" % (processId, name)
+                MapText.setValue(snippet, block, "NAME", name)
+                if extent is not None and self.readExtent(snippet, block) is None:
+                    MapText.insertValues(snippet, block, "EXTENT", [repr(value) for value in extent])
+
+                target = "%s/%s.map" % (self.layersFolder, name)
+                writeAtomic(os.path.join(os.path.dirname(self.path), target), snippet)
+                if target not in included:
+                    new.append('  INCLUDE "%s"\n' % target)
+                names.append(name)
+
+            lines[mapBlock.end:mapBlock.end] = new
+            writeAtomic(self.path, lines)
+
+        self.logger.info(self.INFO_01 % (self.path, ", ".join(names)))
+        return names
+
+    def removeLayers(self, processId):
+        """
+        Removes the layers of an execution from the project map file, reduces
+        its EXTENT to the remaining layers and deletes their snippets.
+
+        :param processId: string with the identifier of the remote process
+        :returns: list with the names of the layers removed
+        """
+
+        prefix = "%s/%s_" % (self.layersFolder, processId)
+        removed = []
+        with self.locked():
+            lines = self.readLines(self.path)
+            if lines is None:
+                return removed
+
+            for index, target in reversed(self.getIncludes(lines, self.findMap(lines, self.path))):
+                if target.startswith(prefix):
+                    del lines[index]
+                    removed.append(target)
+            if len(removed) == 0:
+                return removed
+            self.shrinkExtent(lines, self.findMap(lines, self.path))
+            writeAtomic(self.path, lines)
+
+            for target in removed:
+                try:
+                    os.remove(os.path.join(os.path.dirname(self.path), target))
+                except OSError:
+                    pass
+
+        names = [os.path.basename(target)[:-4] for target in reversed(removed)]
+        self.logger.info(self.INFO_02 % (self.path, ", ".join(names)))
+        return names
+
+    def getLayers(self):
+        """
+        :returns: list with the names of the layers of the project map file
+        """
+
+        lines = self.readLines(self.path)
+        if lines is None:
+            return []
+        return [os.path.basename(target)[:-4] for index, target
+                in self.getIncludes(lines, self.findMap(lines, self.path))]
@@ -0,0 +1,273 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module caching the results of remote process executions. Results are keyed
+on a digest of the server, process name, normalised inputs, requested outputs
+and publishing EPSG code, so that an identical request can be answered with
+the status URL and map file of a previous execution without contacting the
+server. Entries expire after a time to live and the least recently used are
+evicted when the cache is full. The cache is disabled by default, and should
+only be used for deterministic processes, listed in the processes option.
+'''
+
+import os, json, time, hashlib, sqlite3, threading, logging
+from Settings import getSettings, addReloadHook
+
+##########################################################
+
+class ResultCache:
+    """
+    SQLite table mapping request keys to the status URL and map file of the
+    execution that answered them.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False every request is sent to the server
+
+    .. attribute:: processes
+        List with the names of the processes whose results are reused, empty
+        to reuse the results of every process
+
+    .. attribute:: path
+        Path to the database file
+
+    .. attribute:: ttl
+        Number of seconds a result is reused
+
+    .. attribute:: maxEntries
+        Maximum number of results kept, the least recently used are evicted
+
+    .. attribute:: connection
+        sqlite3 Connection object, opened on first use once the cache is
+        enabled
+    """
+
+    logger = None
+
+    #Configs
+    enabled    = False
+    processes  = []
+    path       = "/tmp/WPSClient/results.db"
+    ttl        = 3600
+    maxEntries = 1000
+
+    connection = None
+    openPath   = None
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            requestKey  TEXT PRIMARY KEY,
+            server      TEXT,
+            processName TEXT,
+            statusURL   TEXT NOT NULL,
+            mapFile     TEXT NOT NULL,
+            created     REAL NOT NULL,
+            accessed    REAL NOT NULL);
+        CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+        """
+
+    def __init__(self, path = None):
+
+        self.loadConfigs()
+        if path is not None:
+            self.path = path
+
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('ResultCache', 'enabled', self.enabled)
+        self.processes = settings.get('ResultCache', 'processes', " ".join(self.processes)).split()
+        self.path = settings.get('ResultCache', 'path', self.path)
+        self.ttl = settings.getint('ResultCache', 'ttl', self.ttl)
+        self.maxEntries = settings.getint('ResultCache', 'maxEntries', self.maxEntries)
+
+    def open(self):
+        """
+        Opens the database, creating it if needed.
+        """
+
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.text_factory = str
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+        self.connection.commit()
+        self.openPath = self.path
+
+    def getConnection(self):
+        """
+        Opens the database on first use, or again if its path was changed by
+        a reload of the settings. Must be called holding the lock.
+
+        :returns: sqlite3 Connection object
+        """
+
+        if self.connection is not None and self.openPath != self.path:
+            self.connection.close()
+            self.connection = None
+        if self.connection is None:
+            self.open()
+        return self.connection
+
+    def getKey(self, serverAddress, processName, inputs, outputs, epsg = None,
+               project = None):
+        """
+        Computes the key of a request. Inputs are sorted by name, keeping the
+        order of repeated inputs, and their values stripped of surrounding
+        blanks and XML escaping of ampersands.
+
+        :param serverAddress: string with the address of the remote WPS server
+        :param processName: string with process name
+        :param inputs: list of pairs with input names and values
+        :param outputs: dictionary with output names and titles
+        :param epsg: EPSG code used to publish the complex outputs
+        :param project: name of the project map file the layers are appended
+        to, if any
+        :returns: string with the hexadecimal digest of the request, None if
+        an input value is not a string and the request cannot be keyed
+        """
+
+        normalised = []
+        for name, value in inputs:
+            if not isinstance(value, basestring):
+                return None
+            normalised.append([name, value.strip().replace("&amp;", "&")])
+        normalised.sort(key=lambda pair: pair[0])
+
+        request = [serverAddress, processName, normalised,
+                   sorted([[name, title] for name, title in outputs.items()]),
+                   None if epsg is None else str(epsg)]
+        if project is not None:
+            request.append(project)
+        return hashlib.sha256(json.dumps(request)).hexdigest()
+
+    def allows(self, processName):
+        """
+        :param processName: string with process name
+        :returns: True if results of the process are reused
+        """
+
+        return self.enabled and (len(self.processes) == 0 or processName in self.processes)
+
+    def get(self, requestKey):
+        """
+        Looks up a result. Expired results, and results whose map file no
+        longer exists, are discarded.
+
+        :param requestKey: string returned by getKey
+        :returns: tuple with the status URL and the map file path, None if
+        there is no valid result
+        """
+
+        if not self.enabled or requestKey is None:
+            return None
+
+        now = time.time()
+        with self.lock:
+            connection = self.getConnection()
+            row = connection.execute(
+                "SELECT statusURL, mapFile, created FROM results WHERE requestKey = ?",
+                (requestKey,)).fetchone()
+            if row is None:
+                return None
+            if row[2] + self.ttl < now or not os.path.exists(row[1]):
+                connection.execute("DELETE FROM results WHERE requestKey = ?", (requestKey,))
+                connection.commit()
+                return None
+            connection.execute(
+                "UPDATE results SET accessed = ? WHERE requestKey = ?", (now, requestKey))
+            connection.commit()
+        return (row[0], row[1])
+
+    def store(self, requestKey, serverAddress, processName, statusURL, mapFile):
+        """
+        Records the result of an execution, evicting expired results and the
+        least recently used ones beyond maxEntries.
+
+        :param requestKey: string returned by getKey
+        :param serverAddress: string with the address of the remote WPS server
+        :param processName: string with process name
+        :param statusURL: string with the status URL of the execution
+        :param mapFile: path to the map file generated for the execution
+        """
+
+        if not self.enabled or requestKey is None or mapFile is None:
+            return
+
+        now = time.time()
+        with self.lock:
+            connection = self.getConnection()
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (requestKey, serverAddress, processName, statusURL, mapFile, now, now))
+            connection.execute(
+                "DELETE FROM results WHERE created < ?", (now - self.ttl,))
+            connection.execute(
+                "DELETE FROM results WHERE requestKey IN (SELECT requestKey FROM results "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.maxEntries,))
+            connection.commit()
+
+    def discard(self, mapFile, accept = None):
+        """
+        Removes the results published to a map file, used when layers are
+        removed from a project map file.
+
+        :param mapFile: path to the map file
+        :param accept: optional function called with the status URL of each
+        result, only the results for which it returns True are removed
+        """
+
+        if not self.enabled:
+            return
+
+        with self.lock:
+            connection = self.getConnection()
+            rows = connection.execute(
+                "SELECT requestKey, statusURL FROM results WHERE mapFile = ?", (mapFile,)).fetchall()
+            keys = [(row[0],) for row in rows if accept is None or accept(row[1])]
+            connection.executemany("DELETE FROM results WHERE requestKey = ?", keys)
+            connection.commit()
+
+##########################################################
+
+cache = None
+cacheLock = threading.Lock()
+
+def getResultCache():
+    """
+    :returns: the ResultCache object shared by the whole process
+    """
+
+    global cache
+    with cacheLock:
+        if cache is None:
+            cache = ResultCache()
+            addReloadHook(cache.loadConfigs)
+    return cache
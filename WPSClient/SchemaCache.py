@@ -0,0 +1,160 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module caching the OGR schema of the GML outputs of each process output. When
+OGR opens a GML file without a .gfs schema file, it parses the whole file to
+find out its feature classes, fields and geometry types, and writes the .gfs
+file next to it. The first .gfs file written for an output of a process is
+kept, stripped of the information specific to that file, and passed as
+GFS_TEMPLATE when opening later outputs of the same process, which are then
+not parsed beforehand.
+'''
+
+import os, re, time, threading, logging
+from Settings import getSettings, addReloadHook
+
+##########################################################
+
+class SchemaCache:
+    """
+    Folder with a GML schema template per process output.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: enabled
+        If False GML outputs are always parsed to find out their schema
+
+    .. attribute:: path
+        Path to the folder with the templates
+
+    .. attribute:: maxAge
+        Seconds after which a template is replaced, in case the process
+        changed the structure of its outputs
+    """
+
+    logger = None
+
+    #Configs
+    enabled = True
+    path    = "/tmp/WPSClient/schemas"
+    maxAge  = 86400
+
+    DATASET_INFO = re.compile(r"\s*<DatasetSpecificInfo>.*?</DatasetSpecificInfo>", re.S)
+
+    #Messages
+    INFO_01 = "Stored the GML schema template: "
+    WARN_01 = "Could not store the GML schema template: "
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.logger = logging.getLogger(__name__)
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('SchemaCache', 'enabled', self.enabled)
+        self.path = settings.get('SchemaCache', 'path', self.path)
+        self.maxAge = settings.getfloat('SchemaCache', 'maxAge', self.maxAge)
+
+    def getPath(self, processName, outputName):
+        """
+        :param processName: string with the process name
+        :param outputName: string with the output identifier
+        :returns: string with the path to the template of the output
+        """
+
+        name = re.sub(r"[^\w.-]", "_", "%s-%s" % (processName, outputName))
+        return os.path.join(self.path, name + ".gfs")
+
+    def getTemplate(self, processName, outputName):
+        """
+        :param processName: string with the process name
+        :param outputName: string with the output identifier
+        :returns: string with the path to the template, None if there is no
+        valid template
+        """
+
+        if not self.enabled or processName is None or outputName is None:
+            return None
+
+        path = self.getPath(processName, outputName)
+        try:
+            if os.path.getmtime(path) + self.maxAge < time.time():
+                return None
+        except OSError:
+            return None
+        return path
+
+    def store(self, processName, outputName, gfsPath):
+        """
+        Keeps the .gfs file written by OGR for an output as the template of
+        the process output, unless a valid template already exists.
+
+        :param processName: string with the process name
+        :param outputName: string with the output identifier
+        :param gfsPath: string with the path to the .gfs file
+        """
+
+        if not self.enabled or processName is None or outputName is None:
+            return
+        if self.getTemplate(processName, outputName) is not None:
+            return
+
+        target = self.getPath(processName, outputName)
+        temporary = "%s.%d.%d.tmp" % (target, os.getpid(), threading.current_thread().ident)
+        try:
+            with open(gfsPath) as f:
+                schema = self.DATASET_INFO.sub("", f.read())
+            if not os.path.isdir(self.path):
+                try:
+                    os.makedirs(self.path)
+                except OSError:
+                    if not os.path.isdir(self.path):
+                        raise
+            with open(temporary, "w") as f:
+                f.write(schema)
+            os.rename(temporary, target)
+        except (IOError, OSError) as e:
+            self.logger.warning(self.WARN_01 + target + ": " + str(e))
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self.logger.info(self.INFO_01 + target)
+
+##########################################################
+
+schemaCache = None
+schemaCacheLock = threading.Lock()
+
+def getSchemaCache():
+    """
+    :returns: the SchemaCache object shared by the whole process
+    """
+
+    global schemaCache
+    with schemaCacheLock:
+        if schemaCache is None:
+            schemaCache = SchemaCache()
+            addReloadHook(schemaCache.loadConfigs)
+    return schemaCache
@@ -0,0 +1,193 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module reading the WPSClient.cfg configuration file. The file is parsed once
+per process into a read-only Settings object shared by all the classes of the
+package. Any option can be overridden with an environment variable named
+WPSCLIENT_<SECTION>_<OPTION>, e.g. WPSCLIENT_LOGGING_LOGLEVEL. Long-running
+processes can parse the file again when it changes with reloadSettings, the
+shared objects registered with addReloadHook then load their values again.
+'''
+
+import os, threading
+from ConfigParser import SafeConfigParser, NoOptionError
+
+##########################################################
+
+class Settings:
+    """
+    Read-only view of the configuration file and environment overrides.
+    Section and option names are case insensitive.
+
+    .. attribute:: path
+        Path to the configuration file
+
+    .. attribute:: mtime
+        Modification time of the configuration file when it was parsed, None
+        if the file does not exist
+
+    .. attribute:: values
+        Dictionary mapping (section, option) pairs to string values
+    """
+
+    path   = None
+    mtime  = None
+    values = None
+
+    ENV_PREFIX = "WPSCLIENT_"
+    BOOLEANS = {"1": True, "yes": True, "true": True, "on": True,
+                "0": False, "no": False, "false": False, "off": False}
+
+    ERR_01 = "Settings are read-only"
+    ERR_02 = "Not a boolean: "
+
+    def __init__(self, path):
+
+        values = {}
+
+        parser = SafeConfigParser()
+        parser.read(path)
+        for section in parser.sections():
+            for option, value in parser.items(section):
+                values[(section.lower(), option.lower())] = value
+
+        for key, value in os.environ.items():
+            if key.startswith(self.ENV_PREFIX) and "_" in key[len(self.ENV_PREFIX):]:
+                section, option = key[len(self.ENV_PREFIX):].lower().split("_", 1)
+                values[(section, option)] = value
+
+        mtime = None
+        if os.path.exists(path):
+            mtime = os.path.getmtime(path)
+
+        self.__dict__["path"] = path
+        self.__dict__["mtime"] = mtime
+        self.__dict__["values"] = values
+
+    def __setattr__(self, name, value):
+        raise AttributeError(self.ERR_01)
+
+    def has(self, section, option):
+        """
+        :returns: True if the option is defined
+        """
+        return (section.lower(), option.lower()) in self.values
+
+    def get(self, section, option, *default):
+        """
+        :param section: string with the section name
+        :param option: string with the option name
+        :param default: optional value returned if the option is not defined
+        :returns: string with the option value
+        :raises NoOptionError: if the option is not defined and no default given
+        """
+
+        key = (section.lower(), option.lower())
+        if key in self.values:
+            return self.values[key]
+        if len(default) > 0:
+            return default[0]
+        raise NoOptionError(option, section)
+
+    def getint(self, section, option, *default):
+        """
+        :returns: the option value as an integer, see get
+        """
+        if not self.has(section, option) and len(default) > 0:
+            return default[0]
+        return int(self.get(section, option))
+
+    def getfloat(self, section, option, *default):
+        """
+        :returns: the option value as a float, see get
+        """
+        if not self.has(section, option) and len(default) > 0:
+            return default[0]
+        return float(self.get(section, option))
+
+    def getboolean(self, section, option, *default):
+        """
+        :returns: the option value as a boolean, see get
+        """
+        if not self.has(section, option) and len(default) > 0:
+            return default[0]
+        value = self.get(section, option).strip().lower()
+        if value not in self.BOOLEANS:
+            raise ValueError(self.ERR_02 + value)
+        return self.BOOLEANS[value]
+
+##########################################################
+
+currDir = os.path.dirname(os.path.realpath(__file__))
+CONFIG_FILE = os.path.join(os.path.abspath(os.path.join(currDir, os.pardir)), 'WPSClient.cfg')
+
+settings = None
+settingsLock = threading.Lock()
+reloadHooks = []
+
+def getSettings():
+    """
+    :returns: the Settings object shared by the whole process, parsed on the
+    first call
+    """
+
+    global settings
+    with settingsLock:
+        if settings is None:
+            settings = Settings(CONFIG_FILE)
+    return settings
+
+def addReloadHook(hook):
+    """
+    Registers a function called without arguments each time the settings are
+    reloaded, typically the loadConfigs method of an object shared by the
+    whole process.
+
+    :param hook: function to call
+    """
+
+    with settingsLock:
+        reloadHooks.append(hook)
+
+def reloadSettings(force = False):
+    """
+    Parses the configuration file again if it changed since it was last read,
+    then calls the registered reload hooks. Objects created afterwards use the
+    new settings, existing ones keep the values they loaded unless they
+    registered a hook. Resources already set up, like open connections, the
+    log file or HTTP endpoints, keep their configuration until the process
+    is restarted.
+
+    :param force: if True the file is parsed even if unchanged, picking up
+    changes to the environment variables
+    :returns: True if the settings were reloaded
+    """
+
+    global settings
+    with settingsLock:
+        mtime = None
+        if os.path.exists(CONFIG_FILE):
+            mtime = os.path.getmtime(CONFIG_FILE)
+        if not force and settings is not None and settings.mtime == mtime:
+            return False
+        settings = Settings(CONFIG_FILE)
+        hooks = list(reloadHooks)
+
+    for hook in hooks:
+        hook()
+    return True
@@ -0,0 +1,170 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module writing the service metadata common to all map files (contact details,
+fees, keywords and the list of coordinate systems) once to a shared file in
+the map files folder. Generated map files INCLUDE it in their WEB METADATA
+block instead of repeating the entries, so changing the contact details only
+rewrites the shared file.
+'''
+
+import os, logging
+import MapText
+from AtomicFile import writeAtomic
+
+##########################################################
+
+class SharedMetadata:
+    """
+    Shared metadata file of the map files published with a given EPSG code,
+    named metadata_<epsg>.inc in the map files folder.
+
+    .. attribute:: logger
+        Reference to logging object
+
+    .. attribute:: folder
+        Path to the map files folder
+
+    .. attribute:: entries
+        Dictionary with the metadata keys, without service prefix (e.g.
+        contactperson), and their values
+
+    .. attribute:: otherProjs
+        String listing EPSG codes of further coordinate systems with which to
+        publish the layers
+    """
+
+    logger = None
+
+    folder = None
+    entries = None
+    otherProjs = None
+
+    # Service prefixes of the metadata keys replaced by the shared entries
+    PREFIXES = ["ows_", "wms_", "wfs_", "wcs_"]
+
+    #Messages
+    INFO_01 = "Wrote shared metadata file: "
+    WARN_01 = "No WEB METADATA block found, shared metadata not included in: "
+
+    def __init__(self, folder, entries, otherProjs):
+
+        self.logger = logging.getLogger(__name__)
+        self.folder = folder
+        self.entries = entries
+        self.otherProjs = otherProjs
+
+    def fileName(self, epsg):
+        """
+        :param epsg: EPSG code of the map files
+        :returns: string with the name of the shared metadata file
+        """
+
+        if epsg is None:
+            return "metadata.inc"
+        return "metadata_%s.inc" % epsg
+
+    def getLines(self, epsg):
+        """
+        :param epsg: EPSG code of the map files
+        :returns: list with the METADATA entries of the shared file
+        """
+
+        projections = []
+        if epsg is not None:
+            projections.append("EPSG:%s" % epsg)
+        for projection in (self.otherProjs or "").split():
+            if projection not in projections:
+                projections.append(projection)
+
+        lines = ['"ows_srs" "%s"\n' % " ".join(projections)]
+        for key in sorted(self.entries):
+            lines.append('"ows_%s" "%s"\n' % (key, self.entries[key].replace('"', '\\"')))
+        return lines
+
+    def write(self, epsg):
+        """
+        Writes the shared metadata file if it is missing or its entries
+        changed, through a temporary file renamed over it.
+
+        :param epsg: EPSG code of the map files
+        :returns: string with the path to the shared metadata file
+        """
+
+        path = os.path.join(self.folder, self.fileName(epsg))
+        lines = self.getLines(epsg)
+
+        if os.path.exists(path):
+            with open(path) as f:
+                if f.readlines() == lines:
+                    return path
+
+        writeAtomic(path, lines)
+        self.logger.info(self.INFO_01 + path)
+        return path
+
+    def isShared(self, key):
+        """
+        :param key: string with a metadata key
+        :returns: True if the entry is provided by the shared file
+        """
+
+        key = key.lower()
+        for prefix in self.PREFIXES:
+            if key.startswith(prefix):
+                name = key[len(prefix):]
+                return name == "srs" or name in self.entries
+        return False
+
+    def apply(self, mapFile, epsg):
+        """
+        Replaces the common entries of the WEB METADATA block of a map file
+        by an INCLUDE of the shared metadata file, writing the latter if
+        needed.
+
+        :param mapFile: path to the map file
+        :param epsg: EPSG code of the map file
+        """
+
+        self.write(epsg)
+
+        with open(mapFile) as f:
+            lines = f.readlines()
+
+        metadata = None
+        for mapBlock in MapText.parse(lines).find("MAP"):
+            for web in mapBlock.find("WEB"):
+                for block in web.find("METADATA"):
+                    metadata = block
+        if metadata is None:
+            self.logger.warning(self.WARN_01 + mapFile)
+            return
+
+        kept = []
+        for index in range(metadata.start + 1, metadata.end):
+            tokens = MapText.tokenize(lines[index])
+            if len(tokens) == 2 and self.isShared(MapText.unquote(tokens[0])):
+                continue
+            kept.append(lines[index])
+
+        opening = lines[metadata.start]
+        indent = opening[:len(opening) - len(opening.lstrip())] + "  "
+        kept.append('%sINCLUDE "%s"\n' % (indent, self.fileName(epsg)))
+        lines[metadata.start + 1:metadata.end] = kept
+
+        writeAtomic(mapFile, lines)
@@ -0,0 +1,189 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Module caching the status documents of running remote processes. The HTTP
+validators (ETag and Last-Modified) of each status document are kept together
+with the parsed execution, so that a status check answered with 304 Not
+Modified does not need to download or parse the document again. Each client
+receives its own copy of the cached execution. Entries of executions no longer
+checked expire, and the least recently used are evicted beyond a maximum
+number, so that a long-running process does not keep abandoned executions.
+'''
+
+import copy, time, threading
+from collections import OrderedDict
+from Settings import getSettings, addReloadHook
+
+##########################################################
+
+class StatusCache:
+    """
+    Keeps, for each status URL, the validators returned by the server and the
+    OWSLib WPSExecution object parsed from the last status document.
+
+    .. attribute:: enabled
+        If False no validators are sent and every status check downloads the
+        full document
+
+    .. attribute:: maxEntries
+        Maximum number of status URLs cached, the least recently checked are
+        evicted first; 0 to cache nothing
+
+    .. attribute:: maxAge
+        Seconds after which the entry of a status URL not checked meanwhile
+        expires
+
+    .. attribute:: entries
+        Ordered dictionary mapping status URLs to tuples (etag, lastModified,
+        execution, lastUsed), least recently used first
+    """
+
+    #Configs
+    enabled    = True
+    maxEntries = 1000
+    maxAge     = 3600
+
+    entries = None
+
+    def __init__(self):
+
+        self.loadConfigs()
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def loadConfigs(self):
+        """
+        Loads default attribute values from the configuration file.
+        """
+
+        settings = getSettings()
+
+        self.enabled = settings.getboolean('HTTP', 'conditionalStatus', self.enabled)
+        self.maxEntries = settings.getint('HTTP', 'statusCacheSize', self.maxEntries)
+        self.maxAge = settings.getfloat('HTTP', 'statusCacheMaxAge', self.maxAge)
+
+    def getEntry(self, url):
+        """
+        Looks up the entry of a status URL, marking it as recently used. Must
+        be called with the lock held.
+
+        :param url: string with a status URL
+        :returns: the entry tuple, None if absent or expired
+        """
+
+        entry = self.entries.pop(url, None)
+        if entry is None:
+            return None
+        now = time.time()
+        if entry[3] + self.maxAge < now:
+            return None
+        entry = (entry[0], entry[1], entry[2], now)
+        self.entries[url] = entry
+        return entry
+
+    def getHeaders(self, url):
+        """
+        :param url: string with a status URL
+        :returns: dictionary with the conditional request headers for the URL,
+        empty if nothing is cached
+        """
+
+        headers = {}
+        if not self.enabled:
+            return headers
+
+        with self.lock:
+            entry = self.getEntry(url)
+        if entry is not None:
+            if entry[0] is not None:
+                headers["If-None-Match"] = entry[0]
+            if entry[1] is not None:
+                headers["If-Modified-Since"] = entry[1]
+        return headers
+
+    def getExecution(self, url):
+        """
+        :param url: string with a status URL
+        :returns: a copy of the WPSExecution object cached for the URL, whose
+        outputs may be modified by the caller; None if absent
+        """
+
+        with self.lock:
+            entry = self.getEntry(url)
+        if entry is None:
+            return None
+
+        execution = copy.copy(entry[2])
+        execution.errors = list(execution.errors)
+        execution.dataInputs = [copy.copy(item) for item in execution.dataInputs]
+        execution.processOutputs = [copy.copy(output) for output in execution.processOutputs]
+        return execution
+
+    def store(self, url, response, execution):
+        """
+        Caches the execution parsed from a successfully retrieved status
+        document, if the server provided any validator for it.
+
+        :param url: string with the status URL
+        :param response: requests Response object with the status document
+        :param execution: WPSExecution object parsed from the response
+        """
+
+        if not self.enabled or response.status_code != 200:
+            return
+
+        etag = response.headers.get("ETag")
+        lastModified = response.headers.get("Last-Modified")
+        if etag is None and lastModified is None:
+            return
+
+        now = time.time()
+        with self.lock:
+            self.entries.pop(url, None)
+            self.entries[url] = (etag, lastModified, execution, now)
+            # Least recently used first, expired entries are at the front
+            while self.entries and (len(self.entries) > self.maxEntries or
+                                    self.entries.itervalues().next()[3] + self.maxAge < now):
+                self.entries.popitem(last=False)
+
+    def discard(self, url):
+        """
+        Removes the entry of a status URL, used once the process is complete.
+
+        :param url: string with the status URL
+        """
+
+        with self.lock:
+            self.entries.pop(url, None)
+
+##########################################################
+
+cache = None
+cacheLock = threading.Lock()
+
+def getStatusCache():
+    """
+    :returns: the StatusCache object shared by the whole process
+    """
+
+    global cache
+    with cacheLock:
+        if cache is None:
+            cache = StatusCache()
+            addReloadHook(cache.loadConfigs)
+    return cache
@@ -32,12 +32,26 @@ This package is released under the GPL-3.0 open source license [4].
 [4] http://opensource.org/licenses/GPL-3.0
 '''
 
-__all__ = ["DataSet","MapServerText"]
+__all__ = ["Coalescer","DataSet","Downloader","HTTPPool","JobManager","JobStore","LogSetup","MapServerText","MapText","MetadataCache","Metrics","Monitor","PollScheduler","PostProcess","ProcessCache","ProjectMap","ResultCache","SchemaCache","Settings","SharedMetadata","StatusCache"]
 
-import os, logging
-from ConfigParser import SafeConfigParser
+import os, time, logging, urlparse
+from multiprocessing.pool import ThreadPool
 from owslib.wps import WebProcessingService, WPSExecution
+from owslib.etree import etree
 from DataSet import DataSet
+from Settings import getSettings
+from LogSetup import setupLogging, getJobLogger
+from HTTPPool import getPool
+from Downloader import getDownloader
+from PostProcess import getPostProcessor
+from ProcessCache import getProcessCache
+from StatusCache import getStatusCache
+from ResultCache import getResultCache
+from Coalescer import getCoalescer
+from Metrics import getMetrics
+from MetadataCache import getMetadataCache
+from ProjectMap import ProjectMap
+from SharedMetadata import SharedMetadata
 #import MapServerText as UMN
 from MapFileText.Text import MapFile, RasterLayer, VectorLayer, MapStyle
 
@@ -49,7 +63,8 @@ class WPSClient:
     processing cycle. 
     
     .. attribute:: logger
-        Reference to logging object
+        Reference to logging object, by default an adapter adding the 
+        processId and statusURL fields to every record
         
     .. attribute:: logFormat
         String formating log output
@@ -84,6 +99,11 @@ class WPSClient:
     .. attribute:: statusMessage
         Last status message returned during asynchronous execution
     
+    .. attribute:: acceptedAt
+        Time at which the execution was first seen accepted but not started
+        by the server, None once it started; used to measure the time queued
+        on the server, to the precision of the polling interval
+    
     .. attribute:: map
         Object of type MapFile used to generate the map file publishing complex
         outputs through MapServer
@@ -94,6 +114,28 @@ class WPSClient:
      
     .. attribute:: dataSets
         Array with output dataSets, created during map file generation
+    
+    .. attribute:: requestKey
+        Digest of the server, process, inputs, outputs and EPSG code of the
+        request, used to look up the result cache and coalesce identical
+        requests; None if neither is enabled
+    
+    .. attribute:: cachedMapFile
+        Path to the map file of a previous identical execution, if the request
+        was answered from the result cache, or to the map file published by
+        another client following the same execution
+    
+    .. attribute:: attached
+        True if the request was coalesced with an identical execution started
+        by another client
+    
+    .. attribute:: owner
+        String identifying the JobManager driving the execution, None if the
+        client is used on its own
+    
+    .. attribute:: projectMapFile
+        Path to the project map file the layers were appended to, if a
+        project is set
                
     .. attribute:: logFile
         Path to the log file
@@ -104,6 +146,9 @@ class WPSClient:
     .. attribute:: pathFilesGML
         Path where to store the GML files with complex outputs
     
+    .. attribute:: outputWorkers
+        Number of threads used to download and inspect outputs concurrently
+    
     .. attribute:: mapServerURL
         URL of the MapServer instance to use
     
@@ -122,10 +167,20 @@ class WPSClient:
     .. attribute:: otherProjs
         String listing EPSG codes of further coordinate systems with which to
         publish the complex outputs
+    
+    .. attribute:: project
+        Name of the project map file to which the layers are appended, None to
+        write a map file per execution
+    
+    .. attribute:: sharedMetadata
+        If True the service metadata and coordinate systems are written once 
+        to a shared file included by the map files, instead of being repeated
+        in each of them
     """
     
     logger = None
-    logFormat = "[WPSClient][%(asctime)s] %(levelname)s: %(message)s"
+    ownLogger = False
+    logFormat = "[WPSClient][%(asctime)s][%(processId)s] %(levelname)s: %(message)s"
     
     processName = None
     inputs = None
@@ -136,20 +191,29 @@ class WPSClient:
     processId = None
     percentCompleted = 0
     statusMessage = None
+    acceptedAt = None
     map  = None
     epsg = None
     dataSets = []
+    requestKey = None
+    cachedMapFile = None
+    projectMapFile = None
+    attached = False
+    owner = None
     
     #Configs
     logFile      = None
     logLevel     = None
     pathFilesGML = None
+    outputWorkers = 4
     mapServerURL = None
     mapFilesPath = None
     mapTemplate  = None
     imagePath    = None
     imageURL     = None
     otherProjs   = None
+    project      = None
+    sharedMetadata = True
     
     meta_fees = "none"
     meta_accessconstraints = "none"
@@ -169,22 +233,42 @@ class WPSClient:
     meta_contactfacsimiletelephone = ""
     meta_contactinstructions = ""
     meta_hoursofservice = ""
+    
+    META_OPTIONS = ["meta_fees", "meta_accessconstraints", "meta_keywordlist",
+        "meta_addresstype", "meta_address", "meta_city", "meta_stateorprovince",
+        "meta_postcode", "meta_country", "meta_contactelectronicmailaddress",
+        "meta_contactperson", "meta_contactorganization", "meta_contactposition",
+        "meta_role", "meta_contactvoicetelephone", "meta_contactfacsimiletelephone",
+        "meta_contactinstructions", "meta_hoursofservice"]
 
     RUNNING = 1
     FINISHED = 2
     ERROR = 3
     
     #Messages
+    INFO_01 = "Literal output %s: %s"
     WARN_02 = "Output "
     WARN_03 = " not added to the map file, possibly non complex output."
     WARN_04 = "No spatial layers found, no map file was written."
+    WARN_05 = "Could not retrieve the process description, request not validated: "
     ERR_04  = "EXECUTE request failed:\n"
     ERR_05  = "Incomplete request -- missing URL"
     ERR_06  = "The process failed with the following message:\n"
     ERR_07  = "Failed to save map file to disk:\n"
     ERR_08  = "Cannot generate a map file with the outputs specified."
+    ERR_09  = "Invalid request:\n"
+    ERR_10  = "Unknown process: "
+    ERR_11  = "Unknown input: "
+    ERR_12  = "Unknown output: "
+    ERR_13  = "Missing mandatory input: "
+    ERR_14  = "Too many values for input: "
+    ERR_15  = "Value %s is not of type %s for input: "
+    ERR_16  = "Value %s is not allowed for input: "
     SUCC_01 = "The process has finished successfully.\nProcessing the results..."
     SUCC_02 = "Wrote map file to disk:\n"
+    SUCC_03 = "Request answered from the result cache, map file:\n"
+    SUCC_04 = "Identical request already running, attached to:\n"
+    SUCC_05 = "Outputs already published by another client, map file:\n"
     
     def __init__(self, logger = None):
          
@@ -192,6 +276,8 @@ class WPSClient:
         
         if (logger == None):
             self.setupLogging()
+        else:
+            self.logger = logger
             
         
     def init(self, serverAddress, processName, inputs, outputs):
@@ -206,11 +292,6 @@ class WPSClient:
         :param outputNames: list of strings with output names       
         """
         
-        # Loading this stuff here probably doesn't make sense
-        # Check at a later data if __init__ is run from an external model (that includes this one)
-        self.loadConfigs()
-        self.setupLogging()
-        
         self.processName = processName
         self.inputs = inputs
         self.outputs = outputs
@@ -226,95 +307,59 @@ class WPSClient:
         :param url: string with the status URL address of a remote process      
         """
         
-        # Loading this stuff here probably doesn't make sense
-        # Check at a later data if __init__ is run from an external model (tha includes this one)
-        self.loadConfigs()
-        self.setupLogging()
-        
         # Note that the outputs are not used
         self.statusURL = url
         self.outputs = outputs
         self.processId = self.decodeId(url)
+        self.updateLogContext()
         
     def loadConfigs(self):
         """ 
-        Loads default attribute values from the configuration file. 
-        """
-        
-        parser = SafeConfigParser()
-        currDir = os.path.dirname(os.path.realpath(__file__))
-        parentDir = os.path.abspath(os.path.join(currDir, os.pardir))
-        parser.read(os.path.join(parentDir, 'WPSClient.cfg'))
-    
-        self.logFile      = parser.get('Logging',   'logFile')
-        self.logLevel     = parser.get('Logging',   'logLevel')
-        self.pathFilesGML = parser.get('Data',      'GMLfilesPath')
-        self.mapServerURL = parser.get('MapServer', 'MapServerURL')
-        self.mapFilesPath = parser.get('MapServer', 'mapFilesPath')
-        self.mapTemplate  = parser.get('MapServer', 'mapTemplate')
-        self.imagePath    = parser.get('MapServer', 'imagePath')
-        self.imageURL     = parser.get('MapServer', 'imageURL')
-        self.otherProjs   = parser.get('MapServer', 'otherProjs')
-        
-        if parser.has_option('MapServer', 'meta_fees'):
-            self.meta_fees = parser.get('MapServer', 'meta_fees')
-        if parser.has_option('MapServer', 'meta_accessconstraints'):
-            self.meta_accessconstraints = parser.get('MapServer', 'meta_accessconstraints')
-        if parser.has_option('MapServer', 'meta_keywordlist'):
-            self.meta_keywordlist = parser.get('MapServer', 'meta_keywordlist')
-        if parser.has_option('MapServer', 'meta_addresstype'):
-            self.meta_addresstype = parser.get('MapServer', 'meta_addresstype')
-        if parser.has_option('MapServer', 'meta_address'):
-            self.meta_address = parser.get('MapServer', 'meta_address')
-        if parser.has_option('MapServer', 'meta_city'):
-            self.meta_city = parser.get('MapServer', 'meta_city')
-        if parser.has_option('MapServer', 'meta_stateorprovince'):
-            self.meta_stateorprovince = parser.get('MapServer', 'meta_stateorprovince')
-        if parser.has_option('MapServer', 'meta_postcode'):
-            self.meta_postcode = parser.get('MapServer', 'meta_postcode')
-        if parser.has_option('MapServer', 'meta_country'):
-            self.meta_country = parser.get('MapServer', 'meta_country')
-        if parser.has_option('MapServer', 'meta_contactelectronicmailaddress'):
-            self.meta_contactelectronicmailaddress = parser.get('MapServer', 'meta_contactelectronicmailaddress')
-        if parser.has_option('MapServer', 'meta_contactperson'):
-            self.meta_contactperson = parser.get('MapServer', 'meta_contactperson')
-        if parser.has_option('MapServer', 'meta_contactorganization'):
-            self.meta_contactorganization   = parser.get('MapServer', 'meta_contactorganization')
-        if parser.has_option('MapServer', 'meta_contactposition'):
-            self.meta_contactposition = parser.get('MapServer', 'meta_contactposition')
-        if parser.has_option('MapServer', 'meta_role'):
-            self.meta_role = parser.get('MapServer', 'meta_role')
-        if parser.has_option('MapServer', 'meta_contactvoicetelephone'):
-            self.meta_contactvoicetelephone = parser.get('MapServer', 'meta_contactvoicetelephone')
-        if parser.has_option('MapServer', 'meta_contactfacsimiletelephone'):
-            self.meta_contactfacsimiletelephone = parser.get('MapServer', 'meta_contactfacsimiletelephone')
-        if parser.has_option('MapServer', 'meta_contactinstructions'):
-            self.meta_contactinstructions = parser.get('MapServer', 'meta_contactinstructions')
-        if parser.has_option('MapServer', 'meta_hoursofservice'):
-            self.meta_hoursofservice = parser.get('MapServer', 'meta_hoursofservice')
+        Loads default attribute values from the configuration file, parsed 
+        once per process by the Settings module. 
+        """
+        
+        settings = getSettings()
+    
+        self.logFile      = settings.get('Logging',   'logFile')
+        self.logLevel     = settings.get('Logging',   'logLevel')
+        self.pathFilesGML = settings.get('Data',      'GMLfilesPath')
+        self.mapServerURL = settings.get('MapServer', 'MapServerURL')
+        self.mapFilesPath = settings.get('MapServer', 'mapFilesPath')
+        self.mapTemplate  = settings.get('MapServer', 'mapTemplate')
+        self.imagePath    = settings.get('MapServer', 'imagePath')
+        self.imageURL     = settings.get('MapServer', 'imageURL')
+        self.otherProjs   = settings.get('MapServer', 'otherProjs')
+        self.project      = settings.get('MapServer', 'project', self.project) or None
+        self.sharedMetadata = settings.getboolean('MapServer', 'sharedMetadata', self.sharedMetadata)
+        
+        self.outputWorkers = settings.getint('Data', 'outputWorkers', self.outputWorkers)
+        
+        for name in self.META_OPTIONS:
+            setattr(self, name, settings.get('MapServer', name, getattr(self, name)))
 
         
     def setupLogging(self):
         """
-        Sets up the logging file.
+        Sets up the logging file. The handlers are installed only once per 
+        process, records are written by a background thread.
         """
         
-        formatter = logging.Formatter(self.logFormat)
+        setupLogging(self.logFile, self.logLevel, self.logFormat)
+        self.logger = getJobLogger(self.processId, self.statusURL)
+        self.ownLogger = True
         
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(self.logLevel)
-
-        if(self.logFile == None):
-            ch_stream = logging.StreamHandler()
-            #ch_stream.setLevel(logging.INFO)
-            ch_stream.setFormatter(formatter)
-            self.logger.addHandler(ch_stream)
+        
+    def updateLogContext(self):
+        """
+        Updates the per-job fields added to the log records once the status
+        URL is known. Loggers passed to the constructor are left untouched.
+        """
+        
+        if self.ownLogger:
+            self.logger.extra["processId"] = self.processId
+            self.logger.extra["statusURL"] = self.statusURL
             
-        else:
-            ch_file = logging.FileHandler(self.logFile, 'a')
-            #ch_file.setLevel(self.logLevel)
-            ch_file.setFormatter(formatter)
-            self.logger.addHandler(ch_file)            
         
     def decodeId(self, url):
         """
@@ -327,6 +372,41 @@ class WPSClient:
         s = url.split("/")
         return s[len(s) - 1].split(".")[0] 
     
+    def getServer(self):
+        """
+        :returns: string with the host of the remote WPS server, used to label
+        the metrics
+        """
+        
+        if self.wps is not None:
+            return urlparse.urlsplit(self.wps.url).netloc
+        elif self.statusURL is not None:
+            return urlparse.urlsplit(self.statusURL).netloc
+        return None
+    
+    def timePhase(self, phase):
+        """
+        :param phase: string with the name of the phase, e.g. submit or poll
+        :returns: context manager recording the duration of the phase in the
+        shared Metrics object
+        """
+        
+        return getMetrics().time(phase, self.processName, self.getServer())
+    
+    def observeQueue(self):
+        """
+        Records the time the execution spent queued on the server once it is
+        seen leaving the accepted state, in the queue phase of the metrics.
+        """
+        
+        if self.execution.status == "ProcessAccepted":
+            if self.acceptedAt is None:
+                self.acceptedAt = time.time()
+        elif self.acceptedAt is not None:
+            getMetrics().observe("queue", time.time() - self.acceptedAt,
+                                 self.processName, self.getServer())
+            self.acceptedAt = None
+    
     def getPercentCompleted(self):
         """
         :returns: process execution progress in percentage   
@@ -363,19 +443,86 @@ class WPSClient:
         else:
             return None
             
-    def sendRequest(self):
+    def sendRequest(self, useCache = True):
         """
-        Uses the wps object to start the process execution. Stores the
+        Uses the wps object to build the execute request and sends it through
+        the shared connection pool to start the process execution. Stores the
         status URL and the process in the statusURL and processId attributes.
+        If the result cache is enabled for the process, and an identical 
+        request was answered recently and its map file is still on disk, the
+        status URL of that execution is returned instead and nothing is sent
+        to the server; checkStatus and generateMapFile then return at once.
+        If an identical request is still running, the status URL of that 
+        execution is returned, and its status is checked as usual. The EPSG
+        code must be set beforehand for the result cache to be used.
         
+        :param useCache: if False the request is always sent to the server
         :returns: string with the status URL, None in case of error
         """
         
-        execOutputs = []
-        for key in self.outputs:
-            execOutputs.append((key, "True"))
+        cache = getResultCache()
+        coalescer = getCoalescer()
+        cached = cache.allows(self.processName)
+        self.requestKey = None
+        if cached or coalescer.enabled:
+            self.requestKey = cache.getKey(self.wps.url, self.processName, 
+                                           self.inputs, self.outputs, self.epsg,
+                                           self.project)
+        if useCache:
+            result = None
+            if cached:
+                result = cache.get(self.requestKey)
+            if result is not None:
+                self.statusURL, self.cachedMapFile = result
+                self.processId = self.decodeId(self.statusURL)
+                self.updateLogContext()
+                self.logger.info(self.SUCC_03 + self.cachedMapFile)
+                return self.statusURL
+            
+            statusURL = coalescer.join(self.requestKey)
+            if statusURL is not None:
+                self.statusURL = statusURL
+                self.attached = True
+                self.processId = self.decodeId(self.statusURL)
+                self.updateLogContext()
+                self.logger.info(self.SUCC_04 + self.statusURL)
+                return self.statusURL
+        
+        try:
+            self.postRequest()
+        finally:
+            if useCache:
+                if self.statusURL is None:
+                    coalescer.abandon(self.requestKey)
+                else:
+                    coalescer.resolve(self.requestKey, self.statusURL)
+        
+        return self.statusURL
+        
+    def postRequest(self):
+        """
+        Builds the execute request and posts it to the server, storing the
+        status URL and process identifier of the new execution.
+        
+        :raises requests.HTTPError: if the server answers with an HTTP error
+        """
         
-        self.execution = self.wps.execute(self.processName, self.inputs, execOutputs)
+        with self.timePhase("submit"):
+            self.validateRequest()
+            
+            execOutputs = []
+            for key in self.outputs:
+                execOutputs.append((key, "True"))
+            
+            self.execution = WPSExecution(url=self.wps.url)
+            requestElement = self.execution.buildRequest(self.processName, self.inputs, execOutputs)
+            self.execution.request = etree.tostring(requestElement)
+            
+            response = getPool().post(self.wps.url, self.execution.request, 
+                                      headers={"Content-Type": "text/xml"})
+            response.raise_for_status()
+            self.execution.parseResponse(etree.fromstring(response.content))
+            self.observeQueue()
         
         self.logger.info("The request sent: \n" + self.execution.request)
         self.logger.debug("The status URL: " + self.execution.statusLocation)
@@ -383,19 +530,157 @@ class WPSClient:
         if len(self.execution.errors) > 0:
             self.logger.error(self.ERR_04 + self.execution.errors[0].code + self.execution.errors[0].text)
             raise Exception(self.ERR_04 + self.execution.errors[0].code + self.execution.errors[0].text)
-            return None
         
         self.statusURL = self.execution.statusLocation
         self.processId = self.decodeId(self.statusURL)
-        
-        return self.statusURL  
+        self.updateLogContext()
 
+    def validateRequest(self):
+        """
+        Checks the process name, inputs and outputs of the request against the
+        process description kept in the local cache, before anything is sent
+        to the server. Validation is skipped if the description cannot be 
+        retrieved. If the process, an input or an output is unknown, the
+        description is fetched again before the request is rejected, in case
+        it changed on the server since it was cached.
+        """
+        
+        cache = getProcessCache()
+        if not cache.enabled:
+            return
+        
+        try:
+            process = self.describeProcess(cache)
+            if process is None or self.hasUnknownNames(process):
+                process = self.describeProcess(cache, True)
+        except Exception as e:
+            self.logger.warning(self.WARN_05 + str(e))
+            return
+        
+        if process is None:
+            self.logger.error(self.ERR_09 + self.ERR_10 + self.processName)
+            raise Exception(self.ERR_09 + self.ERR_10 + self.processName)
+        
+        problems = []
+        
+        counts = {}
+        for name, value in self.inputs:
+            counts[name] = counts.get(name, 0) + 1
+        
+        descriptions = {}
+        for description in process.dataInputs:
+            descriptions[description.identifier] = description
+            count = counts.get(description.identifier, 0)
+            if count < description.minOccurs:
+                problems.append(self.ERR_13 + description.identifier)
+            if description.maxOccurs > 0 and count > description.maxOccurs:
+                problems.append(self.ERR_14 + description.identifier)
+        
+        for name, value in self.inputs:
+            description = descriptions.get(name)
+            if description is None:
+                problems.append(self.ERR_11 + name)
+            elif isinstance(value, basestring):
+                problem = self.validateLiteral(description, value)
+                if problem is not None:
+                    problems.append(problem + name)
+        
+        known = [output.identifier for output in process.processOutputs]
+        for name in self.outputs:
+            if name not in known:
+                problems.append(self.ERR_12 + name)
+        
+        if len(problems) > 0:
+            self.logger.error(self.ERR_09 + "\n".join(problems))
+            raise Exception(self.ERR_09 + "\n".join(problems))
+        
+        
+    def describeProcess(self, cache, refresh = False):
+        """
+        :param cache: ProcessCache object
+        :param refresh: if True the cached documents are fetched again
+        :returns: OWSLib Process object describing the process, None if the
+        server does not offer it
+        """
+        
+        if self.processName not in cache.getProcessIdentifiers(self.wps.url, refresh):
+            return None
+        return cache.describeProcess(self.wps.url, self.processName, refresh)
+        
+        
+    def hasUnknownNames(self, process):
+        """
+        :param process: OWSLib Process object describing the process
+        :returns: True if an input or output of the request is not in the
+        process description
+        """
+        
+        inputs = [description.identifier for description in process.dataInputs]
+        outputs = [output.identifier for output in process.processOutputs]
+        for name, value in self.inputs:
+            if name not in inputs:
+                return True
+        for name in self.outputs:
+            if name not in outputs:
+                return True
+        return False
+        
+        
+    def validateLiteral(self, description, value):
+        """
+        Checks a literal input value against its type and allowed values.
+        
+        :param description: OWSLib Input object describing the input
+        :param value: string with the input value
+        :returns: string with the message prefix describing the problem, None
+        if the value is valid
+        """
+        
+        dataType = description.dataType
+        try:
+            typed = self.castLiteral(dataType, value)
+        except ValueError:
+            return self.ERR_15 % (value, dataType)
+        
+        if len(description.allowedValues) > 0 and \
+           typed not in description.allowedValues and value not in description.allowedValues:
+            return self.ERR_16 % value
+        
+        return None
+        
+        
+    def castLiteral(self, dataType, value):
+        """
+        Converts a literal value to the Python type matching its data type.
+        
+        :param dataType: string with the literal data type, e.g. integer, 
+        xs:double or a reference to the XML Schema type
+        :param value: string with the value
+        :returns: the value as int, float, bool or string
+        :raises ValueError: if the value does not match the data type
+        """
+        
+        if dataType is not None:
+            dataType = dataType.split("#")[-1].split(":")[-1]
+        
+        if dataType in ("integer", "int", "long", "short", "nonNegativeInteger", "positiveInteger"):
+            return int(value)
+        elif dataType in ("double", "float", "decimal"):
+            return float(value)
+        elif dataType == "boolean":
+            if value.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(value)
+            return value.lower() in ("true", "1")
+        return value
+        
+        
     def checkStatus(self):
         """
         Sends a request to the status URL checking the progress of the remote 
         process. If the process has finished creates the necessary Output 
         objects to fetch the results and stores them in the resultsLiteral and
-        resultsComplex attributes.
+        resultsComplex attributes. The request is conditional, if the status
+        document did not change since the last check it is not parsed again.
         
         :returns: True if the process finished successfully 
                   False if the process is still running
@@ -410,11 +695,27 @@ class WPSClient:
         if (self.statusURL == None):
             self.logger.error(self.ERR_05)
             raise Exception(self.ERR_05)
+        
+        if self.cachedMapFile is not None:
+            self.status = self.FINISHED
+            self.percentCompleted = 100
+            return True
 
         try: 
-            self.execution = WPSExecution()
-            self.execution.statusLocation = self.statusURL
-            self.execution.checkStatus(sleepSecs=0)
+            with self.timePhase("poll"):
+                cache = getStatusCache()
+                response = getPool().get(self.statusURL, headers=cache.getHeaders(self.statusURL))
+                self.execution = None
+                if response.status_code == 304:
+                    self.execution = cache.getExecution(self.statusURL)
+                    if self.execution is None:
+                        response = getPool().get(self.statusURL)
+                if self.execution is None:
+                    response.raise_for_status()
+                    self.execution = WPSExecution()
+                    self.execution.statusLocation = self.statusURL
+                    self.execution.checkStatus(response=response.content, sleepSecs=0)
+                    cache.store(self.statusURL, response, self.execution)
         except Exception as ex:
             mesg = "Unexpected error from OWSLib!! " + str(ex)
             self.logger.error(mesg)
@@ -424,13 +725,25 @@ class WPSClient:
             self.status = self.RUNNING
             return False
         
+        # Processes watched from their status URL are named after the status document
+        if self.processName is None and self.execution.process is not None:
+            self.processName = self.execution.process.identifier
+        
+        self.percentCompleted = self.execution.percentCompleted
+        self.statusMessage = self.execution.statusMessage
+        self.observeQueue()
+        
         # Check if the process has finished
         if not (self.execution.isComplete()):
+            getCoalescer().touch(self.statusURL)
             self.status = self.RUNNING
             self.logger.debug("The process hasn't finished yet.")
             self.logger.info(str(self.percentCompleted) + " % of the execution complete.")
             return False
         
+        getStatusCache().discard(self.statusURL)
+        getCoalescer().release(self.statusURL)
+        
         # Check if the process failed
         if not (self.execution.isSucceded()):
             self.status = self.ERROR
@@ -448,6 +761,35 @@ class WPSClient:
             
         
     def generateMapFile(self):
+        """
+        Publishes the complex outputs in a map file. A client attached to an
+        execution started by another client does not publish its outputs
+        again, the map file written by that client is returned instead.
+        
+        :returns: string with the path to the map file generated. None if no
+        map file was generated (no complex outputs present).
+        """
+        
+        if self.cachedMapFile is not None:
+            return self.cachedMapFile
+        
+        coalescer = getCoalescer()
+        publish, mapFile = coalescer.claimPublication(self.statusURL, self.owner, self.attached)
+        if not publish:
+            self.cachedMapFile = mapFile
+            self.logger.info(self.SUCC_05 + str(mapFile))
+            return mapFile
+        
+        succeeded = False
+        try:
+            mapFile = self.writeMapFile()
+            succeeded = True
+            return mapFile
+        finally:
+            coalescer.published(self.statusURL, mapFile, succeeded)
+        
+        
+    def writeMapFile(self):
         """
         Creates the MapFile object that encodes a map file publishing the 
         complex outputs and writes it to disk.
@@ -462,6 +804,7 @@ class WPSClient:
         
         #self.map = UMN.MapFile(self.processId)
         self.map = MapFile(self.processId)
+        self.dataSets = []
         
         self.map.shapePath    = self.pathFilesGML
         self.map.epsgCode     = self.epsg
@@ -472,31 +815,28 @@ class WPSClient:
         self.map.mapFilesPath = self.mapFilesPath
         self.map.otherProjs   = self.otherProjs
         
-        self.map.meta_fees = self.meta_fees
-        self.map.meta_accessconstraints = self.meta_accessconstraints
-        self.map.meta_keywordlist = self.meta_keywordlist
-        self.map.meta_addresstype = self.meta_addresstype
-        self.map.meta_address = self.meta_address
-        self.map.meta_city = self.meta_city
-        self.map.meta_stateorprovince = self.meta_stateorprovince
-        self.map.meta_postcode = self.meta_postcode
-        self.map.meta_country = self.meta_country
-        self.map.meta_contactelectronicmailaddress = self.meta_contactelectronicmailaddress
-        self.map.meta_contactperson = self.meta_contactperson
-        self.map.meta_contactorganization = self.meta_contactorganization
-        self.map.meta_contactposition = self.meta_contactposition
-        self.map.meta_role = self.meta_role
-        self.map.meta_contactvoicetelephone = self.meta_contactvoicetelephone
-        self.map.meta_contactfacsimiletelephone = self.meta_contactfacsimiletelephone
-        self.map.meta_contactinstructions = self.meta_contactinstructions
-        self.map.meta_hoursofservice = self.meta_hoursofservice
-        
-        for output in self.execution.processOutputs:
-            
-            output.writeToDisk(self.pathFilesGML);
+        if not self.sharedMetadata:
+            for name in self.META_OPTIONS:
+                setattr(self.map, name, getattr(self, name))
+        
+        # Outputs are fetched and inspected concurrently, layers are added 
+        # sequentially in the order of the process outputs
+        processOutputs = self.execution.processOutputs
+        complexOutputs = [output for output in processOutputs if not self.isLiteral(output)]
+        workers = min(self.outputWorkers, len(complexOutputs))
+        if workers > 1:
+            pool = ThreadPool(workers)
+            try:
+                dataSets = pool.map(self.processOutput, processOutputs)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            dataSets = map(self.processOutput, processOutputs)
+        
+        for output, dataSet in zip(processOutputs, dataSets):
             
             providedTitle = self.outputs[output.identifier]
-            dataSet = DataSet(output.filePath, providedTitle, output.identifier)
             self.dataSets.append(dataSet)
             
             layerEPSG = dataSet.getEPSG()
@@ -508,7 +848,7 @@ class WPSClient:
                 style = MapStyle()
                 #* layer = UMN.VectorLayer(
                 layer = VectorLayer(
-                    output.filePath, 
+                    dataSet.path, 
                     dataSet.getBBox(), 
                     layerEPSG, 
                     output.identifier,
@@ -526,7 +866,7 @@ class WPSClient:
             elif dataSet.dataType == dataSet.TYPE_RASTER:
                 #layer = UMN.RasterLayer(
                 layer = RasterLayer(
-                    output.filePath, 
+                    dataSet.path, 
                     dataSet.getBBox(), 
                     layerEPSG, 
                     output.identifier,
@@ -535,24 +875,38 @@ class WPSClient:
                 self.map.addLayer(layer)
                 self.logger.debug("Generated layer " + layer.name + " of type raster.")
                 
+            elif dataSet.dataType == dataSet.TYPE_LITERAL and dataSet.path is None:
+                self.logger.debug(self.INFO_01 % (output.identifier, dataSet.value))
+                
             else:
                 self.logger.warning(self.WARN_02 + output.identifier + self.WARN_03)
                 
-            self.logger.debug("Guessed mime type for this layer: " + str(dataSet.getMimeType()))
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Guessed mime type for this layer: " + str(dataSet.getMimeType()))
+                self.logger.debug("The pixel res: " + str(dataSet.getPixelRes()))
             
-            print "The pixel res: " + str(dataSet.getPixelRes())
+            dataSet.saveMetadata()
                 
         if (len(self.map.layers) > 0):
                     
             try :
-                self.map.writeToDisk()
+                with self.timePhase("mapfile"):
+                    self.map.writeToDisk()
+                    if self.sharedMetadata:
+                        self.getSharedMetadata().apply(self.map.filePath(), self.map.epsgCode)
+                    if self.project is not None:
+                        self.appendToProject()
             except Exception, e:
                 self.logger.error(self.ERR_07 + str(e))
                 raise Exception(self.ERR_07 + str(e))
                 return
             
-            self.logger.info(self.SUCC_02 + self.map.filePath())
-            return self.map.filePath()
+            self.logger.info(self.SUCC_02 + self.getMapFilePath())
+            
+            if self.wps is not None and getResultCache().allows(self.processName):
+                getResultCache().store(self.requestKey, self.wps.url, self.processName,
+                                       self.statusURL, self.getMapFilePath())
+            return self.getMapFilePath()
         
         else:
             
@@ -560,16 +914,157 @@ class WPSClient:
             return None
         
         
+    def getSharedMetadata(self):
+        """
+        :returns: SharedMetadata object with the service metadata configured
+        """
+        
+        return SharedMetadata(self.mapFilesPath, 
+            dict([(name[len("meta_"):], getattr(self, name)) for name in self.META_OPTIONS]),
+            self.otherProjs)
+        
+    def appendToProject(self):
+        """
+        Appends the layers of the map file just written to the project map
+        file, leaving the layers already published untouched, and removes the
+        map file of the execution.
+        """
+        
+        projectMap = ProjectMap(self.project, self.mapFilesPath)
+        projectMap.addLayers(self.processId, self.map.filePath())
+        os.remove(self.map.filePath())
+        self.projectMapFile = projectMap.filePath()
+        
+    def removeFromProject(self):
+        """
+        Removes the layers of this execution from the project map file, and
+        the cached results pointing to them.
+        
+        :returns: list with the names of the layers removed
+        """
+        
+        projectMap = ProjectMap(self.project, self.mapFilesPath)
+        removed = projectMap.removeLayers(self.processId)
+        getResultCache().discard(projectMap.filePath(),
+                                 lambda url: self.decodeId(url) == self.processId)
+        return removed
+        
+        
+    def isLiteral(self, output):
+        """
+        :param output: OWSLib Output object
+        :returns: True if the value of the output is embedded in the execute
+        response, as literal data or as plain text complex data
+        """
+        
+        if output.reference is not None or len(output.data) == 0:
+            return False
+        if output.dataType == "ComplexData":
+            return output.mimeType is not None and \
+                output.mimeType.split(";")[0].strip().lower() == "text/plain"
+        return output.dataType != "BoundingBoxData"
+        
+        
+    def getLiteralValue(self, output):
+        """
+        :param output: OWSLib Output object of a literal output
+        :returns: the value of the output converted to its data type, as a
+        string if the conversion fails
+        """
+        
+        value = "".join(output.data)
+        try:
+            return self.castLiteral(output.dataType, value)
+        except ValueError:
+            return value
+        
+        
+    def getLiteralOutputs(self):
+        """
+        Reads the literal outputs from the execute response, without writing
+        them to disk. Must be called after checkStatus reports the process as
+        finished.
+        
+        :returns: dictionary with the identifiers and typed values of the
+        literal outputs
+        """
+        
+        if self.execution is None:
+            return {}
+        return dict([(output.identifier, self.getLiteralValue(output))
+                     for output in self.execution.processOutputs if self.isLiteral(output)])
+        
+        
+    def processOutput(self, output):
+        """
+        Fetches a process output, wraps it in a DataSet object and prepares it
+        for publication. Runs on the output worker threads. Literal outputs
+        are taken from the execute response, with no download nor inspection.
+        
+        :param output: OWSLib Output object
+        :returns: DataSet object
+        """
+        
+        if self.isLiteral(output):
+            return DataSet(None, self.outputs[output.identifier], output.identifier,
+                           value = self.getLiteralValue(output))
+        
+        with self.timePhase("download"):
+            validators = self.fetchOutput(output)
+        with self.timePhase("inspection"):
+            dataSet = DataSet(output.filePath, self.outputs[output.identifier], output.identifier,
+                              output.mimeType, processName = self.processName)
+        with self.timePhase("postprocess"):
+            dataSet = getPostProcessor().run(dataSet)
+        # Converted files were not downloaded as they are
+        if dataSet.path != output.filePath:
+            validators = None
+        dataSet.prepareMetadata(validators)
+        return dataSet
+        
+        
+    def fetchOutput(self, output):
+        """
+        Writes a process output to the pathFilesGML folder, setting its 
+        fileName and filePath attributes. Outputs returned by reference are
+        streamed to disk through the shared connection pool, outputs embedded 
+        in the response are written by OWSLib. An output already on disk is
+        not downloaded again if the server reports it unchanged since it was
+        published, so that its sidecar metadata file stays valid.
+        
+        :param output: OWSLib Output object
+        :returns: dictionary with the HTTP validators the output was
+        downloaded with, None if it was embedded in the response
+        """
+        
+        url = output.reference
+        if url is None:
+            output.writeToDisk(self.pathFilesGML)
+            return None
+        
+        # Same file naming as OWSLib
+        if '?' in url:
+            output.fileName = url.split('?')[1].split('=')[1]
+        else:
+            output.fileName = url.split('/')[-1]
+        output.filePath = self.pathFilesGML + output.fileName
+        
+        return getDownloader().download(url, output.filePath,
+            validators = getMetadataCache().getValidators(output.filePath))
+        
+        
     def getMapFilePath(self):
         """
         Is this method really needed?
         :returns: string with the path to the generated map file
         """
        
-        if self.map <> None:
+        if self.projectMapFile <> None:
+            return self.projectMapFile
+        elif self.map <> None:
             return self.map.filePath()
         else:
-            return None     
+            return self.cachedMapFile
         
     
     def getMapFileTitle(self):
@@ -22,6 +22,7 @@ Created on Nov 21, 2013
 import sys
 import time
 import WPSClient
+from WPSClient.PollScheduler import PollScheduler
 
 #url = "http://wps.iguess.tudor.lu/wpsoutputs/pywps-40332884-aaaf-11e3-8adb-005056a52e0d.xml"
 #url = "http://wps.iguess.tudor.lu/wpsoutputs/pywps-0a1e8c52-b59a-11e3-9302-005056a52e0d.xml"
@@ -38,6 +39,7 @@ outputs = {"path":"LdS.myPath"}
 statCli = WPSClient.WPSClient()
 
 statCli.initFromURL(url, outputs)
+scheduler = PollScheduler()
 
 status = False
 while not status:
@@ -50,7 +52,7 @@ while not status:
     print "Process still running"
     print str(statCli.getPercentCompleted()) + "% completed"
     print "Status message: " + str(statCli.getStatusMessage())
-    time.sleep(10)
+    time.sleep(scheduler.nextInterval(statCli.getPercentCompleted()))
     
 if(statCli.status == statCli.ERROR):
     print "There was an error, no map file was generated. Please check the log file."
@@ -0,0 +1,57 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of science and Technology
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Runs the end-to-end benchmarks against a local stand-in WPS server and prints
+the measurements of each scenario, e.g.:
+
+    python runBenchmarks.py --jobs 20 --latency 0.05 --raster-size 2048
+'''
+
+import sys
+from optparse import OptionParser
+from Benchmarks.Benchmark import Benchmark, report
+
+parser = OptionParser(usage="%prog [options] [scenario ...]")
+parser.add_option("--jobs", type="int", default=10,
+                  help="number of jobs submitted per scenario")
+parser.add_option("--workers", type="int", default=8,
+                  help="number of JobManager worker threads")
+parser.add_option("--latency", type="float", default=0.0,
+                  help="seconds added by the server to every response")
+parser.add_option("--duration", type="float", default=10.0,
+                  help="seconds each remote process takes to complete")
+parser.add_option("--queue-time", type="float", default=0.0, dest="queueTime",
+                  help="seconds each execution waits in the server queue")
+parser.add_option("--raster-size", type="int", default=512, dest="rasterSize",
+                  help="width and height in pixels of the raster outputs")
+parser.add_option("--features", type="int", default=1000,
+                  help="number of features of the vector outputs")
+
+(options, names) = parser.parse_args()
+
+for name in names:
+    if name not in Benchmark.SCENARIOS:
+        print "Unknown scenario: " + name
+        print "Available scenarios: " + ", ".join(sorted(Benchmark.SCENARIOS))
+        sys.exit(1)
+
+benchmark = Benchmark(options.jobs, options.workers, options.latency,
+                      options.duration, options.rasterSize, options.features,
+                      options.queueTime)
+
+print report(benchmark.run(names or None))
@@ -0,0 +1,44 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of science and Technology
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Runs the monitor daemon. Every unfinished execution recorded in the job store
+is checked until it finishes and its outputs are published, replacing the
+one-shot polling scripts. Scripts only need to record the status URL in the
+job store and leave the rest to the daemon, e.g.:
+
+    from WPSClient.JobStore import getJobStore
+    getJobStore().save(url, processName="buffer", outputs={"buffered_vector":"MyBuffer"})
+
+Executions sent with a JobManager are leased to it: the daemon leaves them
+alone while the manager runs, and takes them over once it is stopped or its
+lease expires, e.g. because the script died.
+
+Stop the daemon with SIGTERM (or Ctrl+C): queued jobs are drained first.
+'''
+
+from WPSClient import WPSClient
+from WPSClient.Settings import getSettings
+from WPSClient.LogSetup import setupLogging
+from WPSClient.Monitor import Monitor
+
+settings = getSettings()
+setupLogging(settings.get('Logging', 'logFile'),
+             settings.get('Logging', 'logLevel'),
+             WPSClient.logFormat)
+
+Monitor().run()
@@ -0,0 +1,139 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the Coalescer module.
+'''
+
+import os, time, shutil, tempfile, threading, unittest
+from WPSClient import JobStore
+from WPSClient.Coalescer import Coalescer
+
+##########################################################
+
+class TestCoalescer(unittest.TestCase):
+
+    def setUp(self):
+
+        self.folder = tempfile.mkdtemp()
+        self.coalescer = Coalescer()
+        self.coalescer.enabled = True
+        self.coalescer.maxAge = 600
+        self.coalescer.publishTimeout = 600
+
+        # The job store shared by the process is replaced by one in the
+        # temporary folder
+        self.savedStore = JobStore.store
+        JobStore.store = JobStore.JobStore(os.path.join(self.folder, "jobs.db"))
+        JobStore.store.enabled = True
+        if JobStore.store.connection is None:
+            JobStore.store.open()
+
+    def tearDown(self):
+
+        JobStore.store.close()
+        JobStore.store = self.savedStore
+        shutil.rmtree(self.folder, True)
+
+    def testJoin(self):
+
+        self.assertEqual(self.coalescer.join("key"), None)
+        self.coalescer.resolve("key", "http://a")
+        self.assertEqual(self.coalescer.join("key"), "http://a")
+        self.assertEqual(self.coalescer.join(None), None)
+
+    def testJoinWaits(self):
+
+        self.assertEqual(self.coalescer.join("key"), None)
+        results = []
+        follower = threading.Thread(target=lambda: results.append(self.coalescer.join("key")))
+        follower.start()
+        time.sleep(0.05)
+        self.assertEqual(results, [])
+        self.coalescer.resolve("key", "http://a")
+        follower.join(5)
+        self.assertEqual(results, ["http://a"])
+
+    def testAbandon(self):
+
+        self.assertEqual(self.coalescer.join("key"), None)
+        self.coalescer.abandon("key")
+        self.assertEqual(self.coalescer.join("key"), None)
+
+    def testExpired(self):
+
+        self.coalescer.join("key")
+        self.coalescer.resolve("key", "http://a")
+        self.coalescer.maxAge = -1
+        self.assertEqual(self.coalescer.join("key"), None)
+
+    def testRelease(self):
+
+        self.coalescer.join("key")
+        self.coalescer.resolve("key", "http://a")
+        self.coalescer.release("http://a")
+        self.assertEqual(self.coalescer.entries, {})
+        self.assertEqual(self.coalescer.join("key"), None)
+
+    def testJoinOtherProcess(self):
+
+        store = JobStore.store
+        store.save("http://a", "p1", "buffer", requestKey = "key")
+        store.claim("http://a", "other")
+        self.assertEqual(self.coalescer.join("key"), "http://a")
+
+    def testClaimPublication(self):
+
+        self.assertEqual(self.coalescer.claimPublication("http://a"), (True, None))
+        mapFile = os.path.join(self.folder, "a.map")
+        open(mapFile, "w").close()
+        self.coalescer.published("http://a", mapFile)
+        self.assertEqual(self.coalescer.claimPublication("http://a", attached = True), (False, mapFile))
+        # Clients that did not attach publish again
+        self.assertEqual(self.coalescer.claimPublication("http://a"), (True, None))
+
+    def testClaimPublicationInProgress(self):
+
+        self.assertEqual(self.coalescer.claimPublication("http://a"), (True, None))
+        results = []
+        follower = threading.Thread(target=lambda: results.append(
+            self.coalescer.claimPublication("http://a")))
+        follower.start()
+        time.sleep(0.05)
+        self.assertEqual(results, [])
+        mapFile = os.path.join(self.folder, "a.map")
+        open(mapFile, "w").close()
+        self.coalescer.published("http://a", mapFile)
+        follower.join(5)
+        self.assertEqual(results, [(False, mapFile)])
+
+    def testClaimPublicationFailed(self):
+
+        self.coalescer.claimPublication("http://a")
+        self.coalescer.published("http://a", None, False)
+        self.assertEqual(self.coalescer.claimPublication("http://a", attached = True), (True, None))
+
+    def testDisabled(self):
+
+        self.coalescer.enabled = False
+        self.assertEqual(self.coalescer.join("key"), None)
+        self.coalescer.resolve("key", "http://a")
+        self.assertEqual(self.coalescer.join("key"), None)
+        self.assertEqual(self.coalescer.claimPublication("http://a", attached = True), (True, None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the JobStore module.
+'''
+
+import os, shutil, tempfile, unittest
+from WPSClient.JobStore import JobStore
+
+##########################################################
+
+class TestJobStore(unittest.TestCase):
+
+    def setUp(self):
+
+        self.folder = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.folder, "jobs.db"))
+        self.store.enabled = True
+        self.store.leaseTime = 120
+        if self.store.connection is None:
+            self.store.open()
+
+    def tearDown(self):
+
+        self.store.close()
+        shutil.rmtree(self.folder, True)
+
+    def testSaveAndGet(self):
+
+        self.store.save("http://a", "p1", "buffer", outputs = {"out": u"T\xedtulo", "other": None})
+        record = self.store.get("http://a")
+        self.assertEqual(record["processName"], "buffer")
+        self.assertEqual(record["state"], JobStore.RUNNING)
+        self.assertEqual(record["outputs"], {"out": "T\xc3\xadtulo", "other": None})
+        self.assertEqual(self.store.get("http://b"), None)
+
+    def testUpdate(self):
+
+        self.store.save("http://a", "p1", "buffer")
+        self.store.update("http://a", state = JobStore.PUBLISHED, mapFile = "/a.map")
+        record = self.store.get("http://a")
+        self.assertEqual((record["state"], record["mapFile"]), (JobStore.PUBLISHED, "/a.map"))
+        self.assertRaises(ValueError, self.store.update, "http://a", unknown = 1)
+
+    def testClaim(self):
+
+        self.store.save("http://a", "p1", "buffer")
+        self.assertTrue(self.store.claim("http://a", "one"))
+        self.assertTrue(self.store.claim("http://a", "one"))
+        self.assertFalse(self.store.claim("http://a", "two"))
+        self.assertEqual(self.store.get("http://a")["owner"], "one")
+
+    def testClaimExpired(self):
+
+        self.store.save("http://a", "p1", "buffer")
+        self.store.leaseTime = -1
+        self.assertTrue(self.store.claim("http://a", "one"))
+        self.assertTrue(self.store.claim("http://a", "two"))
+
+    def testClaimFinished(self):
+
+        self.store.save("http://a", "p1", "buffer", state = JobStore.PUBLISHED)
+        self.assertFalse(self.store.claim("http://a", "one"))
+
+    def testRenewAndRelease(self):
+
+        self.store.save("http://a", "p1", "buffer")
+        self.store.save("http://b", "p2", "buffer")
+        self.store.claim("http://a", "one")
+        self.store.claim("http://b", "one")
+        lease = self.store.get("http://a")["lease"]
+
+        self.assertEqual(self.store.renew("one"), 2)
+        self.assertTrue(self.store.get("http://a")["lease"] >= lease)
+        self.assertEqual(self.store.release("one"), 2)
+        self.assertEqual(self.store.get("http://a")["owner"], None)
+        self.assertTrue(self.store.claim("http://a", "two"))
+
+    def testFindActive(self):
+
+        self.store.save("http://a", "p1", "buffer", requestKey = "key")
+        # Executions not leased to a live JobManager are not joined
+        self.assertEqual(self.store.findActive("key"), None)
+        self.store.claim("http://a", "one")
+        self.assertEqual(self.store.findActive("key")["statusURL"], "http://a")
+        self.store.update("http://a", state = JobStore.PUBLISHED)
+        self.assertEqual(self.store.findActive("key"), None)
+
+    def testUnfinishedAndPurge(self):
+
+        self.store.save("http://a", "p1", "buffer")
+        self.store.save("http://b", "p2", "buffer", state = JobStore.ERROR)
+        self.assertEqual([r["statusURL"] for r in self.store.getUnfinished()], ["http://a"])
+        self.assertEqual(self.store.countByState(), {JobStore.RUNNING: 1, JobStore.ERROR: 1})
+        self.assertEqual(self.store.purge(-1), 1)
+        self.assertEqual(self.store.get("http://b"), None)
+
+if __name__ == "__main__":
+    unittest.main()
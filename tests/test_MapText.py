@@ -0,0 +1,119 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the MapText module.
+'''
+
+import unittest
+from WPSClient import MapText
+
+MAP = """MAP
+  NAME "test"
+  EXTENT 0 0 10 10
+  WEB
+    METADATA
+      "wms_title" "test"
+    END
+  END
+  # LAYER in a comment
+  LAYER
+    NAME "roads"
+    TYPE LINE
+    CLASS
+      NAME "class"
+      STYLE
+        SYMBOL "circle"
+      END
+    END
+  END
+END
+"""
+
+##########################################################
+
+class TestMapText(unittest.TestCase):
+
+    def setUp(self):
+
+        self.lines = MAP.splitlines(True)
+
+    def testTokenize(self):
+
+        self.assertEqual(MapText.tokenize('  NAME "a b" # comment\n'), ["NAME", '"a b"'])
+        self.assertEqual(MapText.tokenize("# LAYER\n"), [])
+
+    def testParse(self):
+
+        root = MapText.parse(self.lines)
+        self.assertEqual([block.keyword for block in root.children], ["MAP"])
+        mapBlock = root.children[0]
+        self.assertEqual((mapBlock.start, mapBlock.end), (0, 19))
+        self.assertEqual([block.keyword for block in mapBlock.children], ["WEB", "LAYER"])
+
+        layer = mapBlock.find("LAYER")[0]
+        self.assertEqual((layer.start, layer.end), (9, 18))
+        # SYMBOL followed by a value is a parameter, not a block
+        style = layer.find("CLASS")[0].find("STYLE")[0]
+        self.assertEqual(style.children, [])
+
+    def testGetValue(self):
+
+        mapBlock = MapText.parse(self.lines).children[0]
+        layer = mapBlock.find("LAYER")[0]
+        self.assertEqual(MapText.getValue(self.lines, mapBlock, "NAME"), "test")
+        # Parameters of nested blocks are not those of the block
+        self.assertEqual(MapText.getValue(self.lines, layer, "NAME"), "roads")
+        self.assertEqual(MapText.getValues(self.lines, mapBlock, "EXTENT"), ["0", "0", "10", "10"])
+        self.assertEqual(MapText.getValue(self.lines, mapBlock, "UNITS"), None)
+
+    def testSetValue(self):
+
+        mapBlock = MapText.parse(self.lines).children[0]
+        self.assertTrue(MapText.setValue(self.lines, mapBlock, "NAME", 'new "name"'))
+        self.assertEqual(self.lines[1], '  NAME "new \\"name\\""\n')
+        self.assertFalse(MapText.setValue(self.lines, mapBlock, "UNITS", "meters"))
+
+        self.assertTrue(MapText.setValues(self.lines, mapBlock, "EXTENT", ["1", "2", "3", "4"]))
+        self.assertEqual(self.lines[2], "  EXTENT 1 2 3 4\n")
+
+    def testInsertValues(self):
+
+        layer = MapText.parse(self.lines).children[0].find("LAYER")[0]
+        MapText.insertValues(self.lines, layer, "EXTENT", ["0", "0", "1", "1"])
+        self.assertEqual(self.lines[10], "    EXTENT 0 0 1 1\n")
+
+        layer = MapText.parse(self.lines).children[0].find("LAYER")[0]
+        self.assertEqual(MapText.getValues(self.lines, layer, "EXTENT"), ["0", "0", "1", "1"])
+        self.assertEqual(layer.end, 19)
+
+    def testSetMetadata(self):
+
+        metadata = MapText.parse(self.lines).children[0].find("WEB")[0].find("METADATA")[0]
+        self.assertTrue(MapText.setMetadata(self.lines, metadata, "WMS_TITLE", "other"))
+        self.assertEqual(self.lines[5], '      "wms_title" "other"\n')
+        self.assertFalse(MapText.setMetadata(self.lines, metadata, "ows_title", "other"))
+
+    def testUnquote(self):
+
+        self.assertEqual(MapText.unquote('"a"'), "a")
+        self.assertEqual(MapText.unquote("'a'"), "a")
+        self.assertEqual(MapText.unquote('"'), '"')
+        self.assertEqual(MapText.unquote("a"), "a")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the MetadataCache module.
+'''
+
+import os, json, shutil, tempfile, unittest
+from WPSClient.MetadataCache import MetadataCache
+
+##########################################################
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.folder = tempfile.mkdtemp()
+        self.cache = MetadataCache()
+        self.cache.enabled = True
+        self.cache.suffix = ".meta.json"
+        self.cache.checksumType = ""
+        self.path = os.path.join(self.folder, "a.tif")
+        with open(self.path, "w") as f:
+            f.write("data")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.folder, True)
+
+    def touch(self, content = "data"):
+        """
+        Rewrites the data set with a later modification time.
+        """
+
+        stat = os.stat(self.path)
+        with open(self.path, "w") as f:
+            f.write(content)
+        os.utime(self.path, (stat.st_atime + 10, stat.st_mtime + 10))
+
+    def testStoreAndLoad(self):
+
+        self.assertEqual(self.cache.load(self.path), None)
+        self.cache.store(self.path, "raster", {"getEPSG": u"4326", "getBBox": [0, 1, 2, 3]},
+                         validators = {"ETag": '"1"'})
+        record = self.cache.load(self.path)
+        self.assertEqual(record["dataType"], "raster")
+        self.assertEqual(record["memo"], {"getEPSG": "4326", "getBBox": [0, 1, 2, 3]})
+        self.assertTrue(isinstance(record["memo"]["getEPSG"], str))
+        self.assertEqual(self.cache.getValidators(self.path), {"ETag": '"1"'})
+        self.assertEqual([name for name in os.listdir(self.folder) if name.endswith(".tmp")], [])
+
+    def testChangedFile(self):
+
+        self.cache.store(self.path, "raster", {})
+        self.touch("other data")
+        self.assertEqual(self.cache.load(self.path), None)
+        self.assertEqual(self.cache.getValidators(self.path), None)
+
+    def testChecksum(self):
+
+        self.cache.checksumType = "md5"
+        self.cache.store(self.path, "raster", {})
+        self.touch()
+        # Same content: the record is kept and its modification time updated
+        record = self.cache.load(self.path)
+        self.assertNotEqual(record, None)
+        with open(self.path + self.cache.suffix) as f:
+            self.assertEqual(json.load(f)["mtime"], os.stat(self.path).st_mtime)
+
+        self.touch("atad")
+        self.assertEqual(self.cache.load(self.path), None)
+
+    def testVersion(self):
+
+        self.cache.store(self.path, "raster", {})
+        with open(self.path + self.cache.suffix) as f:
+            record = json.load(f)
+        record["version"] = MetadataCache.VERSION + 1
+        with open(self.path + self.cache.suffix, "w") as f:
+            json.dump(record, f)
+        self.assertEqual(self.cache.load(self.path), None)
+
+    def testCorrupt(self):
+
+        with open(self.path + self.cache.suffix, "w") as f:
+            f.write("{")
+        self.assertEqual(self.cache.load(self.path), None)
+
+    def testMissingFile(self):
+
+        self.cache.store(os.path.join(self.folder, "missing.tif"), "raster", {})
+        self.assertEqual(os.listdir(self.folder), ["a.tif"])
+        self.assertEqual(self.cache.load(None), None)
+
+    def testDisabled(self):
+
+        self.cache.enabled = False
+        self.cache.store(self.path, "raster", {})
+        self.assertFalse(os.path.exists(self.path + self.cache.suffix))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the ProjectMap module.
+'''
+
+import os, shutil, tempfile, unittest
+from WPSClient import MapText
+from WPSClient.ProjectMap import ProjectMap
+
+MAP = """MAP
+  NAME "%s"
+  EXTENT %s
+  WEB
+    METADATA
+      "wms_title" "%s"
+    END
+  END
+%sEND
+"""
+
+LAYER = """  LAYER
+%s    TYPE RASTER
+    DATA "/data/%s.tif"
+  END
+"""
+
+##########################################################
+
+class TestProjectMap(unittest.TestCase):
+
+    def setUp(self):
+
+        self.folder = tempfile.mkdtemp()
+        self.project = ProjectMap("project", self.folder)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.folder, True)
+
+    def writeMap(self, processId, extent, names):
+        """
+        :param processId: string with the name of the map file
+        :param extent: string with the EXTENT of the map file
+        :param names: list with the names of the layers, None for a layer
+        without NAME
+        :returns: path to the map file written
+        """
+
+        layers = ""
+        for index in range(len(names)):
+            name = "" if names[index] is None else '    NAME "%s"\n' % names[index]
+            layers += LAYER % (name, index)
+        path = os.path.join(self.folder, processId + ".map")
+        with open(path, "w") as f:
+            f.write(MAP % (processId, extent, processId, layers))
+        return path
+
+    def getMap(self):
+        """
+        :returns: tuple with the lines of the project map file and its MAP block
+        """
+
+        with open(self.project.filePath()) as f:
+            lines = f.readlines()
+        return lines, MapText.parse(lines).children[0]
+
+    def testAddLayers(self):
+
+        names = self.project.addLayers("p1", self.writeMap("p1", "0 0 1 1", ["a", "b"]))
+        self.assertEqual(names, ["p1_a", "p1_b"])
+        self.assertEqual(self.project.getLayers(), ["p1_a", "p1_b"])
+
+        lines, mapBlock = self.getMap()
+        self.assertEqual(MapText.getValue(lines, mapBlock, "NAME"), "project")
+        self.assertEqual(mapBlock.find("LAYER"), [])
+        metadata = mapBlock.find("WEB")[0].find("METADATA")[0]
+        self.assertEqual(lines[metadata.start + 1].strip(), '"wms_title" "project"')
+
+        snippet = os.path.join(self.folder, "project.layers", "p1_a.map")
+        with open(snippet) as f:
+            layerLines = f.readlines()
+        layer = MapText.parse(layerLines).children[0]
+        self.assertEqual(MapText.getValue(layerLines, layer, "NAME"), "p1_a")
+        self.assertEqual(MapText.getValues(layerLines, layer, "EXTENT"), ["0.0", "0.0", "1.0", "1.0"])
+
+    def testAddLayersAgain(self):
+
+        path = self.writeMap("p1", "0 0 1 1", ["a"])
+        self.project.addLayers("p1", path)
+        self.project.addLayers("p1", path)
+        self.assertEqual(self.project.getLayers(), ["p1_a"])
+
+    def testLayerWithoutName(self):
+
+        names = self.project.addLayers("p1", self.writeMap("p1", "0 0 1 1", [None, "b"]))
+        self.assertEqual(names, ["p1_layer1", "p1_b"])
+
+    def testExtent(self):
+
+        self.project.addLayers("p1", self.writeMap("p1", "0 0 1 1", ["a"]))
+        self.project.addLayers("p2", self.writeMap("p2", "-5 0 1 9", ["a"]))
+        lines, mapBlock = self.getMap()
+        self.assertEqual(MapText.getValues(lines, mapBlock, "EXTENT"), ["-5.0", "0.0", "1.0", "9.0"])
+
+        self.assertEqual(self.project.removeLayers("p2"), ["p2_a"])
+        lines, mapBlock = self.getMap()
+        self.assertEqual(MapText.getValues(lines, mapBlock, "EXTENT"), ["0.0", "0.0", "1.0", "1.0"])
+
+    def testRemoveLayers(self):
+
+        self.project.addLayers("p1", self.writeMap("p1", "0 0 1 1", ["a", "b"]))
+        self.project.addLayers("p10", self.writeMap("p10", "0 0 1 1", ["a"]))
+
+        self.assertEqual(self.project.removeLayers("p1"), ["p1_a", "p1_b"])
+        self.assertEqual(self.project.getLayers(), ["p10_a"])
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "project.layers", "p1_a.map")))
+        self.assertEqual(self.project.removeLayers("p1"), [])
+        self.assertEqual([name for name in os.listdir(self.folder) if name.endswith(".tmp")], [])
+
+    def testRemoveLayersWithoutMap(self):
+
+        self.assertEqual(self.project.removeLayers("p1"), [])
+        self.assertEqual(self.project.getLayers(), [])
+
+if __name__ == "__main__":
+    unittest.main()
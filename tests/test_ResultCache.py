@@ -0,0 +1,101 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the ResultCache module.
+'''
+
+import os, time, shutil, tempfile, unittest
+from WPSClient.ResultCache import ResultCache
+
+##########################################################
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.folder = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.folder, "results.db"))
+        self.cache.enabled = True
+        self.cache.processes = []
+        self.cache.ttl = 3600
+        self.cache.maxEntries = 1000
+        self.mapFile = os.path.join(self.folder, "a.map")
+        open(self.mapFile, "w").close()
+
+    def tearDown(self):
+
+        if self.cache.connection is not None:
+            self.cache.connection.close()
+        shutil.rmtree(self.folder, True)
+
+    def testKey(self):
+
+        key = self.cache.getKey("http://server", "buffer", [("b", "1"), ("a", " x&amp;y ")], {"out": "Out"})
+        self.assertEqual(key, self.cache.getKey("http://server", "buffer",
+                                                [("a", "x&y"), ("b", "1")], {"out": "Out"}))
+        self.assertNotEqual(key, self.cache.getKey("http://server", "buffer",
+                                                   [("a", "x&y"), ("b", "1")], {"out": "Out"}, 4326))
+        self.assertEqual(self.cache.getKey("http://server", "buffer", [("a", 1)], {}), None)
+
+    def testLazyOpen(self):
+
+        self.assertEqual(self.cache.connection, None)
+        self.assertEqual(self.cache.get("key"), None)
+        self.assertTrue(os.path.exists(self.cache.path))
+
+    def testStoreAndGet(self):
+
+        self.cache.store("key", "http://server", "buffer", "http://status", self.mapFile)
+        self.assertEqual(self.cache.get("key"), ("http://status", self.mapFile))
+
+        os.remove(self.mapFile)
+        self.assertEqual(self.cache.get("key"), None)
+
+    def testExpired(self):
+
+        self.cache.store("key", "http://server", "buffer", "http://status", self.mapFile)
+        self.cache.ttl = -1
+        self.assertEqual(self.cache.get("key"), None)
+
+    def testMaxEntries(self):
+
+        self.cache.maxEntries = 1
+        self.cache.store("a", "http://server", "buffer", "http://a", self.mapFile)
+        time.sleep(0.01)
+        self.cache.store("b", "http://server", "buffer", "http://b", self.mapFile)
+        self.assertEqual(self.cache.get("a"), None)
+        self.assertEqual(self.cache.get("b"), ("http://b", self.mapFile))
+
+    def testDiscard(self):
+
+        self.cache.store("a", "http://server", "buffer", "http://a", self.mapFile)
+        self.cache.store("b", "http://server", "buffer", "http://b", self.mapFile)
+        self.cache.discard(self.mapFile, lambda statusURL: statusURL == "http://a")
+        self.assertEqual(self.cache.get("a"), None)
+        self.assertEqual(self.cache.get("b"), ("http://b", self.mapFile))
+
+    def testAllows(self):
+
+        self.cache.processes = ["buffer"]
+        self.assertTrue(self.cache.allows("buffer"))
+        self.assertFalse(self.cache.allows("sum"))
+        self.cache.enabled = False
+        self.assertFalse(self.cache.allows("buffer"))
+
+if __name__ == "__main__":
+    unittest.main()
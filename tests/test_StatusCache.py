@@ -0,0 +1,125 @@
+# coding: utf-8
+'''
+Copyright 2010 - 2019 Luxembourg Institute of Science and Technology.
+
+Licenced under the EUPL, Version 1.1 or – as soon they will be approved by the
+European Commission - subsequent versions of the EUPL (the "Licence");
+You may not use this work except in compliance with the Licence.
+You may obtain a copy of the Licence at:
+
+http://ec.europa.eu/idabc/eupl
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the Licence is distributed on an "AS IS" basis, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the Licence for the
+specific language governing permissions and limitations under the Licence.
+
+Created on Oct 17, 2026
+
+Unit tests of the StatusCache module.
+'''
+
+import time, unittest
+from WPSClient.StatusCache import StatusCache
+
+##########################################################
+
+class Response:
+    """
+    Stands for a requests Response object.
+    """
+
+    def __init__(self, headers, status_code = 200):
+
+        self.headers = headers
+        self.status_code = status_code
+
+class Execution:
+    """
+    Stands for an OWSLib WPSExecution object.
+    """
+
+    def __init__(self):
+
+        self.errors = []
+        self.dataInputs = []
+        self.processOutputs = []
+
+##########################################################
+
+class TestStatusCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.cache = StatusCache()
+        self.cache.enabled = True
+        self.cache.maxEntries = 2
+        self.cache.maxAge = 3600
+
+    def store(self, url):
+
+        self.cache.store(url, Response({"ETag": '"%s"' % url}), Execution())
+
+    def testHeaders(self):
+
+        self.cache.store("a", Response({"ETag": '"1"', "Last-Modified": "Mon"}), Execution())
+        self.assertEqual(self.cache.getHeaders("a"),
+                         {"If-None-Match": '"1"', "If-Modified-Since": "Mon"})
+        self.assertEqual(self.cache.getHeaders("b"), {})
+
+    def testWithoutValidators(self):
+
+        self.cache.store("a", Response({}), Execution())
+        self.cache.store("b", Response({"ETag": '"1"'}, 500), Execution())
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def testExecutionCopy(self):
+
+        execution = Execution()
+        self.cache.store("a", Response({"ETag": '"1"'}), execution)
+        copy = self.cache.getExecution("a")
+        self.assertFalse(copy is execution)
+        copy.processOutputs.append(None)
+        self.assertEqual(execution.processOutputs, [])
+
+    def testEvictLeastRecentlyUsed(self):
+
+        self.store("a")
+        self.store("b")
+        self.cache.getHeaders("a")
+        self.store("c")
+        self.assertEqual(list(self.cache.entries), ["a", "c"])
+
+    def testEvictExpired(self):
+
+        self.store("a")
+        self.cache.maxAge = 0.01
+        time.sleep(0.02)
+        self.assertEqual(self.cache.getHeaders("a"), {})
+        self.store("b")
+        time.sleep(0.02)
+        self.store("c")
+        self.assertEqual(list(self.cache.entries), ["c"])
+
+    def testNoEntries(self):
+
+        self.store("a")
+        self.cache.maxEntries = 0
+        self.store("b")
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def testDiscard(self):
+
+        self.store("a")
+        self.cache.discard("a")
+        self.cache.discard("b")
+        self.assertEqual(self.cache.getExecution("a"), None)
+
+    def testDisabled(self):
+
+        self.cache.enabled = False
+        self.store("a")
+        self.assertEqual(self.cache.getHeaders("a"), {})
+
+if __name__ == "__main__":
+    unittest.main()